@@ -1,19 +1,19 @@
 from flask import Flask
 
-# Routes
-from routes.summarize import summarize_bp
-from routes.quiz import quiz_bp
-from routes.analytics import analytics_bp
-from routes.certificate import certificate_bp
 
-# DB
-from db.database import engine, Base, SessionLocal
+def create_app():
+    # Routes
+    from routes.summarize import summarize_bp
+    from routes.quiz import quiz_bp
+    from routes.analytics import analytics_bp
+    from routes.certificate import certificate_bp
 
-# IMPORTANT: ensure all models are imported
-from models import quiz_attempt, certificate  # noqa: F401
+    # DB
+    from db.database import engine, Base, SessionLocal
 
+    # IMPORTANT: ensure all models are imported
+    from models import quiz_attempt, certificate  # noqa: F401
 
-def create_app():
     print("CREATING FLASK APP")
 
     app = Flask(__name__)
@@ -46,7 +46,10 @@ def create_app():
     return app
 
 
-app = create_app()
+# Spawned worker processes (e.g. the PDF extraction pool) re-import this
+# module as __mp_main__: they must not build the app or touch the database
+if __name__ != "__mp_main__":
+    app = create_app()
 
 if __name__ == "__main__":
     print("FLASK STARTING")
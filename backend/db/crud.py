@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from db.models import QuizAttempt, Certificate
+from db.models import QuizAttempt, Certificate, QuestionBankItem, QuestionBankServed
 
 
 # ------------------------------------------------
@@ -54,3 +54,44 @@ def create_or_update_certificate(
     db.commit()
     db.refresh(new_cert)
     return new_cert, "created"
+
+
+# ------------------------------------------------
+# QUESTION BANK
+# ------------------------------------------------
+def get_bank_questions(db: Session, doc_fingerprint: str):
+    return (
+        db.query(QuestionBankItem)
+        .filter_by(doc_fingerprint=doc_fingerprint, validated=True)
+        .all()
+    )
+
+
+def add_bank_questions(db: Session, items: list):
+    rows = [QuestionBankItem(**item) for item in items]
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+
+def get_served_question_ids(db: Session, user_id: str, doc_fingerprint: str) -> set:
+    rows = (
+        db.query(QuestionBankServed.question_id)
+        .filter_by(user_id=user_id, doc_fingerprint=doc_fingerprint)
+        .all()
+    )
+    return {str(row.question_id) for row in rows}
+
+
+def mark_questions_served(db: Session, user_id: str, doc_fingerprint: str, question_ids: list):
+    already = get_served_question_ids(db, user_id, doc_fingerprint)
+    db.add_all([
+        QuestionBankServed(
+            user_id=user_id,
+            question_id=question_id,
+            doc_fingerprint=doc_fingerprint
+        )
+        for question_id in question_ids
+        if str(question_id) not in already
+    ])
+    db.commit()
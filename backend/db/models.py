@@ -125,6 +125,58 @@ class QuestionResponse(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+# ============================================================
+# QUESTION BANK (REUSABLE MCQS PER DOCUMENT / CONCEPT / LEVEL)
+# ============================================================
+class QuestionBankItem(Base):
+    __tablename__ = "question_bank"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    doc_fingerprint = Column(String(32), nullable=False, index=True)
+    concept = Column(String(200), nullable=False)
+
+    difficulty = Column(
+        String(20),
+        CheckConstraint("difficulty IN ('beginner', 'intermediate', 'advanced')"),
+        nullable=False
+    )
+
+    mcq_payload = Column(JSONB, nullable=False)
+
+    # Quality flags: where the MCQ came from and whether it passed validation
+    source = Column(String(20), nullable=False)       # llm_batch | llm_single
+    validated = Column(Boolean, nullable=False, default=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class QuestionBankServed(Base):
+    __tablename__ = "question_bank_served"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id"),
+        nullable=False
+    )
+
+    question_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("question_bank.id"),
+        nullable=False
+    )
+
+    doc_fingerprint = Column(String(32), nullable=False)
+
+    served_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "question_id", name="uq_user_question"),
+    )
+
+
 # ============================================================
 # CERTIFICATE (HIGHEST SCORE POLICY)
 # ============================================================
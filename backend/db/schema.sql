@@ -40,3 +40,36 @@ CREATE TABLE certificates (
     UNIQUE (student_id, topic)
 );
 
+CREATE TABLE question_bank (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+
+    doc_fingerprint VARCHAR(32) NOT NULL,
+    concept VARCHAR(200) NOT NULL,
+
+    difficulty VARCHAR(20)
+        CHECK (difficulty IN ('beginner', 'intermediate', 'advanced')) NOT NULL,
+
+    mcq_payload JSONB NOT NULL,
+
+    source VARCHAR(20) NOT NULL,
+    validated BOOLEAN NOT NULL DEFAULT TRUE,
+
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_question_bank_doc ON question_bank (doc_fingerprint);
+
+CREATE TABLE question_bank_served (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+
+    user_id UUID NOT NULL REFERENCES users (id),
+    question_id UUID NOT NULL REFERENCES question_bank (id),
+    doc_fingerprint VARCHAR(32) NOT NULL,
+
+    served_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    UNIQUE (user_id, question_id)
+);
+
+CREATE INDEX idx_question_bank_served_user_doc
+    ON question_bank_served (user_id, doc_fingerprint);
@@ -1,3 +1,5 @@
+import uuid
+
 from flask import Blueprint, request, jsonify
 from sqlalchemy.orm import Session
 
@@ -5,14 +7,48 @@ from db.session import SessionLocal
 from db.models import Quiz, QuizAttempt
 
 from services.quiz_generator import generate_quiz_from_summary
+from services.quiz_jobs import quiz_jobs
 from services.quiz_validator import validate_quiz_attempt
+from utils.deadline import QUIZ_DEADLINE, Deadline
 from utils.text_preprocessing import extract_text_from_input
 from services.quiz_validator import validate_quiz_attempt
 quiz_bp = Blueprint("quiz", __name__, url_prefix="/api/quiz")
 
 
 # ============================================================
-# 1️⃣ GENERATE QUIZ (TEXT / FILE → QUIZ + SAVE SNAPSHOT)
+# QUIZ JOB (runs on the job queue, persists the Quiz snapshot)
+# ============================================================
+def _generate_and_store(quiz_id: str, user_id: str, mode: str, text: str) -> dict:
+    quiz_payload = generate_quiz_from_summary(
+        summary=text,
+        mode=mode,
+        user_id=user_id,
+        deadline=Deadline(QUIZ_DEADLINE)  # starts when the job runs
+    )
+
+    db: Session = SessionLocal()
+    try:
+        quiz = Quiz(
+            id=uuid.UUID(quiz_id),
+            user_id=user_id,
+            summary_mode=mode,
+            summary_source="input_text",
+            quiz_payload=quiz_payload
+        )
+        db.add(quiz)
+        db.commit()
+    finally:
+        db.close()
+        SessionLocal.remove()  # worker threads get their own scoped session
+
+    return {
+        "quiz_id": quiz_id,
+        "quiz": quiz_payload
+    }
+
+
+# ============================================================
+# 1️⃣ GENERATE QUIZ (TEXT / FILE → JOB → QUIZ SNAPSHOT)
 # ============================================================
 @quiz_bp.route("/", methods=["POST"])
 def generate_quiz():
@@ -22,10 +58,15 @@ def generate_quiz():
     - file (optional)
     - mode (basic | detailed | conceptual)
     - user_id (required)
+    - wait (optional, "true" → generate inline and return the quiz)
+
+    Default: enqueues generation and returns 202 with a job_id to poll
+    at GET /api/quiz/jobs/<job_id>.
     """
 
     user_id = request.form.get("user_id")
     mode = request.form.get("mode", "conceptual")
+    wait = request.form.get("wait", "").lower() in {"1", "true", "yes"}
 
     if not user_id:
         return jsonify({"error": "user_id is required"}), 400
@@ -41,29 +82,67 @@ def generate_quiz():
     if not text:
         return jsonify({"error": "No input text provided"}), 400
 
+    # Job id doubles as the Quiz id, so a finished job can be found in
+    # the DB even from another worker process
+    job_id = str(uuid.uuid4())
+
+    if wait:
+        try:
+            return jsonify(_generate_and_store(job_id, user_id, mode, text)), 200
+        except Exception as e:
+            return jsonify({"error": f"Quiz generation failed: {e}"}), 500
+
+    quiz_jobs.submit(_generate_and_store, job_id, user_id, mode, text, job_id=job_id)
+
+    return jsonify({
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/api/quiz/jobs/{job_id}"
+    }), 202
+
+
+@quiz_bp.route("/jobs/<job_id>", methods=["GET"])
+def get_quiz_job(job_id):
+    """
+    Status of a quiz job: queued | running | succeeded | failed.
+
+    Job records live in memory, in the worker process that ran the job.
+    Any other process (after a restart, or behind a multi-worker server)
+    only sees succeeded jobs, through their Quiz row; queued, running
+    and failed jobs are a 404 there. Multi-worker deployments need
+    sticky routing for polling, or wait=true on generation.
+    """
+    job = quiz_jobs.get(job_id)
+
+    if job is not None:
+        response = {
+            "job_id": job_id,
+            "status": job["status"]
+        }
+        if job["status"] == "succeeded":
+            response.update(job["result"])
+        elif job["status"] == "failed":
+            response["error"] = f"Quiz generation failed: {job['error']}"
+        return jsonify(response), 200
+
+    # Not in this process (restart / other worker): look for the snapshot.
+    # Only successful jobs write one, so failures are not visible here
     try:
-        quiz_payload = generate_quiz_from_summary(
-            summary=text,
-            mode=mode
-        )
-    except Exception as e:
-        return jsonify({"error": f"Quiz generation failed: {e}"}), 500
+        quiz_id = uuid.UUID(job_id)
+    except ValueError:
+        return jsonify({"error": "Unknown job"}), 404
 
     db: Session = SessionLocal()
     try:
-        quiz = Quiz(
-            user_id=user_id,
-            mode=mode,
-            summary_source="input_text",
-            quiz_payload=quiz_payload
-        )
-        db.add(quiz)
-        db.commit()
-        db.refresh(quiz)
+        quiz = db.get(Quiz, quiz_id)
+        if quiz is None:
+            return jsonify({"error": "Unknown job"}), 404
 
         return jsonify({
-            "quiz_id": str(quiz.id),
-            "quiz": quiz_payload
+            "job_id": job_id,
+            "status": "succeeded",
+            "quiz_id": job_id,
+            "quiz": quiz.quiz_payload
         }), 200
     finally:
         db.close()
@@ -1,100 +1,260 @@
-from pydoc import text
-from urllib import response
-from flask import Blueprint, request, jsonify
+import json
 
-from services.summarizer.abstractive import explain
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+
+from services.summarizer.abstractive import explain, explain_stream
 from services.summarizer.extractive import extractive_summary
 from services.summarizer.conceptual import get_conceptual_summary
-from services.summarizer.cache_loader import load_cached_document
-from utils.text_preprocessing import extract_text_from_input
-from utils.doc_fingerprint import generate_doc_id
+from services.summarizer.map_reduce import condense
+from services.summarizer.cache_loader import (
+    find_cached_doc_id,
+    load_cached_document,
+    remember_raw_fingerprint,
+    save_cached_summary
+)
+from services.summarizer.near_duplicate import (
+    minhash_signature,
+    near_duplicate_index,
+    remember_signature
+)
+from services.ingestion.upload import UploadBuffer
+from utils.text_preprocessing import SUPPORTED_EXTENSIONS, extract_text_from_input
+from utils.doc_fingerprint import generate_doc_id, raw_fingerprint
+from utils.deadline import SUMMARIZE_DEADLINE, Deadline
 
 summarize_bp = Blueprint("summarize", __name__)
 
+# Degraded outputs are served but never written back to the cache
+UNCACHEABLE_SOURCES = {"fallback", "none"}
 
-@summarize_bp.route("/", methods=["POST"])
-def summarize():
-    mode = request.form.get("mode", "").lower()
 
-    if mode not in {"basic", "detailed", "overview"}:
-        return jsonify({"error": "Invalid mode"}), 400
+def _cached_response(mode: str, doc_id: str, cached: dict, summary_data: dict) -> dict:
+    response = {
+        "mode": mode,
+        "doc_id": doc_id,
+        **summary_data,
+        "cached": True
+    }
+
+    if mode == "overview":
+        concepts = cached.get("concepts", {})
+        response["concepts"] = concepts.get("list", concepts.get("key_concepts"))
+        response["concept_source"] = concepts.get("source")
+        response["concept_confidence"] = concepts.get("confidence")
+
+    return response
 
-    # ---------------- CACHE CHECK ----------------
-    cached = load_cached_document(doc_id)
 
-    if cached:
-        summary_data = cached.get("summaries", {}).get(mode)
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
-        if not summary_data:
-            return jsonify({"error": "Summary mode not available in cache"}), 400
 
-        response = {
-            "mode": mode,
-            **summary_data,
-            "cached": True
+def _stream_response(events) -> Response:
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # let proxies flush each event
         }
+    )
+
+
+def _cached_summary(mode: str, doc_id: str):
+    cached = load_cached_document(doc_id)
+    summary_data = (cached or {}).get("summaries", {}).get(mode)
+
+    if not summary_data:
+        return None
+    return _cached_response(mode, doc_id, cached, summary_data)
 
-        if mode == "overview":
-            concepts = cached.get("concepts", {})
-            response["concepts"] = concepts.get("key_concepts")
-            response["concept_source"] = concepts.get("source")
-            response["concept_confidence"] = concepts.get("confidence")
 
-        return jsonify(response)
+def _respond(response: dict, stream: bool):
+    if stream:
+        return _stream_response(iter([_sse("done", response)]))
+    return jsonify(response)
+
+
+def _open_upload(text, file):
+    """
+    Buffers a supported upload once (text input wins, like extraction).
+    """
+    if (text and text.strip()) or file is None:
+        return None
+    if not (file.filename or "").lower().endswith(SUPPORTED_EXTENSIONS):
+        return None
+    return UploadBuffer(file)
+
+
+def _cacheable(response: dict, llm_output: dict) -> bool:
+    """
+    Only full-quality summaries are cached: no fallback output and no
+    map-reduce chunk that degraded to its fallback.
+    """
+    return (
+        llm_output.get("source") not in UNCACHEABLE_SOURCES
+        and not response.get("degraded_chunks")
+    )
+
+
+def _write_back(doc_id: str, mode: str, llm_output: dict, concept_data, raw_id, signature) -> None:
+    save_cached_summary(doc_id, mode, llm_output, concept_data, raw_id)
+    remember_signature(doc_id, signature)
+
+
+def _stream_summary(
+    explain_input: str,
+    mode: str,
+    response: dict,
+    doc_id: str,
+    concept_data,
+    raw_id=None,
+    signature=None,
+    deadline=None
+):
+    """
+    SSE stream: `token` events as they arrive, then one `done` event with
+    the same payload the blocking endpoint returns.
+    """
+    for event in explain_stream(explain_input, mode, deadline):
+        if event["type"] == "token":
+            yield _sse("token", {"text": event["text"]})
+            continue
 
+        llm_output = {k: v for k, v in event.items() if k != "type"}
+        response.update(llm_output)
+        if response.get("degraded_chunks"):
+            response["confidence"] = "low"
+
+        # Cache first: the client may disconnect as soon as it has `done`,
+        # which closes this generator at the yield
+        if _cacheable(response, llm_output) and not llm_output.get("truncated"):
+            _write_back(doc_id, mode, llm_output, concept_data, raw_id, signature)
+
+        yield _sse("done", response)
+
+
+@summarize_bp.route("/", methods=["POST"])
+def summarize():
+    mode = request.form.get("mode", "").lower()
+    stream = request.form.get("stream", "").lower() in {"1", "true", "yes"}
 
+    # ⏱ One budget for every LLM call this request makes
+    deadline = Deadline(SUMMARIZE_DEADLINE)
+
+    if mode not in {"basic", "detailed", "overview"}:
+        return jsonify({"error": "Invalid mode"}), 400
+
+    raw_text = request.form.get("text")
+    raw_id = None
 
     # --------------- INPUT EXTRACTION ------------
     try:
+        upload = _open_upload(raw_text, request.files.get("file"))
+    except OSError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        # ⚡ Byte-identical re-upload → serve the cache without parsing
+        if upload is not None:
+            raw_id = raw_fingerprint(upload.iter_chunks())
+            known_doc_id = find_cached_doc_id(raw_id)
+            if known_doc_id:
+                response = _cached_summary(mode, known_doc_id)
+                if response:
+                    return _respond(response, stream)
+
         text = extract_text_from_input(
-            text=request.form.get("text"),
-            file=request.files.get("file")
+            text=raw_text,
+            file=upload if upload is not None else request.files.get("file")
         )
-    
+
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
+    finally:
+        if upload is not None:
+            upload.close()
+
     if not text:
         return jsonify({"error": "No input text provided"}), 400
 
+    # ✅ AUTO doc_id generation (user never provides it)
+    doc_id = generate_doc_id(text)
+
+    # ---------------- CACHE CHECK ----------------
+    response = _cached_summary(mode, doc_id)
+    if response:
+        remember_raw_fingerprint(doc_id, raw_id)
+        return _respond(response, stream)
+
+    # ---------------- NEAR-DUPLICATE CHECK ----------------
+    # e.g. the same lecture re-exported with a different footer
+    signature = minhash_signature(text)
+    match = near_duplicate_index.find(signature, exclude=doc_id)
+
+    if match:
+        near_doc_id, similarity = match
+        response = _cached_summary(mode, near_doc_id)
+        if response:
+            response["doc_id"] = doc_id
+            response["near_duplicate_of"] = near_doc_id
+            response["similarity"] = round(similarity, 3)
+            return _respond(response, stream)
+
+    # ---------------- LIVE SUMMARY ----------------
     response = {
         "mode": mode,
+        "doc_id": doc_id,
         "cached": False
     }
-    # ✅ AUTO doc_id generation (user never provides it)
-    doc_id = generate_doc_id(text)
+    concept_data = None
 
     # ---------------- BASIC ----------------
     if mode == "basic":
-        llm_output = explain(text, mode="basic")
-        response.update(llm_output)
+        explain_input = text
 
     # --------------- DETAILED --------------
     elif mode == "detailed":
-        extracted = extractive_summary(text, ratio=0.35)
-        if not extracted:
-            return jsonify(
-                {"error": "Extractive summarization failed"},
-                500
-            )
-
-        llm_output = explain(extracted, mode="detailed")
-        response.update(llm_output)
+        explain_input = extractive_summary(text, ratio=0.35)
+        if not explain_input:
+            return jsonify({"error": "Extractive summarization failed"}), 500
 
     # --------------- OVERVIEW --------------
-    # OVERVIEW
     else:
-        concept_data = get_conceptual_summary(text)
+        concept_data = get_conceptual_summary(text, deadline=deadline)
         concepts = concept_data.get("key_concepts", [])
 
         if not concepts:
             return jsonify({"error": "Concept extraction failed"}), 500
 
-        concept_text = "Key concepts:\n" + "\n".join(f"- {c}" for c in concepts)
-        llm_output = explain(concept_text, mode="overview")
-
-        response.update(llm_output)
+        explain_input = "Key concepts:\n" + "\n".join(f"- {c}" for c in concepts)
         response["concepts"] = concepts
         response["concept_source"] = concept_data.get("source")
         response["concept_confidence"] = concept_data.get("confidence")
+
+    # Large inputs: map-reduce chunk summaries down to one prompt
+    if mode != "overview":
+        explain_input, map_meta = condense(explain_input, mode, deadline=deadline)
+        if map_meta["reduce_rounds"]:
+            response.update(map_meta)
+
+    if stream:
+        return _stream_response(
+            _stream_summary(
+                explain_input, mode, response, doc_id, concept_data, raw_id, signature,
+                deadline
+            )
+        )
+
+    llm_output = explain(explain_input, mode=mode, deadline=deadline)
+    response.update(llm_output)
+
+    if response.get("degraded_chunks"):
+        response["confidence"] = "low"
+
+    # ---------------- WRITE-BACK ----------------
+    if _cacheable(response, llm_output):
+        _write_back(doc_id, mode, llm_output, concept_data, raw_id, signature)
+
     return jsonify(response)
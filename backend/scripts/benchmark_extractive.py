@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services.summarizer.extractive import SCORERS, extractive_summary
+
+
+DEFAULT_SIZES = [100, 500, 1000, 2500, 5000, 10000]
+
+VOCABULARY = (
+    "cell membrane protein enzyme substrate energy glucose oxygen carbon "
+    "nucleus gene chromosome mitosis meiosis ribosome transcription "
+    "translation mutation selection population species habitat climate "
+    "photosynthesis respiration chlorophyll nitrogen water transport "
+    "diffusion osmosis gradient receptor hormone signal neuron synapse"
+).split()
+
+
+# ============================================================
+# SYNTHETIC DOCUMENTS (deterministic, topic-clustered)
+# ============================================================
+def make_document(sentences: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    topics = [rng.sample(VOCABULARY, 8) for _ in range(max(1, sentences // 50))]
+
+    lines = []
+    for i in range(sentences):
+        topic = topics[i % len(topics)]
+        words = [rng.choice(topic if rng.random() < 0.7 else VOCABULARY)
+                 for _ in range(rng.randint(6, 18))]
+        lines.append(" ".join(words).capitalize() + ".")
+    return " ".join(lines)
+
+
+def _time_once(text: str, scorer: str) -> float:
+    started = time.perf_counter()
+    extractive_summary(text, corpus_idf=False, scorer=scorer)
+    return time.perf_counter() - started
+
+
+def run(sizes=None, repeat: int = 3) -> list:
+    sizes = sizes or DEFAULT_SIZES
+    results = []
+
+    print(f"{'sentences':>10} " + " ".join(f"{name + ' ms':>14}" for name in SCORERS))
+    for size in sizes:
+        text = make_document(size)
+        row = {"sentences": size}
+        for scorer in SCORERS:
+            best = min(_time_once(text, scorer) for _ in range(repeat))
+            row[scorer] = round(best * 1000, 1)
+        results.append(row)
+        print(f"{size:>10} " + " ".join(f"{row[name]:>14}" for name in SCORERS))
+
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extractive scorer latency vs document size")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+        help="document sizes in sentences"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="best-of-N timing")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run(args.sizes, args.repeat)
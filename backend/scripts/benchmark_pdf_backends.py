@@ -0,0 +1,125 @@
+import os
+import sys
+import time
+import argparse
+import resource
+import multiprocessing as mp
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services.ingestion.pdf_loader import available_backends, iter_pdf_pages
+
+
+FIXTURE_DIR = os.path.join(BACKEND_DIR, "data", "fixtures", "pdf")
+
+FIXTURE_SENTENCE = (
+    "Photosynthesis converts light energy into chemical energy stored in glucose, "
+    "while cellular respiration releases that energy as ATP. "
+)
+
+
+# ============================================================
+# FIXTURE CORPUS
+# ============================================================
+def generate_fixtures(directory: str = FIXTURE_DIR, documents: int = 5, pages: int = 40) -> None:
+    """
+    Writes a deterministic PDF corpus (requires PyMuPDF).
+    """
+    import fitz
+
+    os.makedirs(directory, exist_ok=True)
+
+    for d in range(documents):
+        doc = fitz.open()
+        for p in range(pages):
+            page = doc.new_page()
+            body = f"Document {d} page {p}\n" + FIXTURE_SENTENCE * 30
+            page.insert_textbox(fitz.Rect(40, 40, 560, 800), body, fontsize=9)
+        doc.save(os.path.join(directory, f"fixture_{d:02d}.pdf"))
+        doc.close()
+
+
+def list_fixtures(directory: str) -> list:
+    return sorted(
+        os.path.join(directory, f)
+        for f in os.listdir(directory)
+        if f.lower().endswith(".pdf")
+    )
+
+
+# ============================================================
+# MEASUREMENT (one fresh process per backend → clean peak RSS)
+# ============================================================
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _measure(backend: str, paths: list, repeat: int, queue) -> None:
+    baseline = _peak_rss_mb()
+    pages = chars = 0
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for path in paths:
+            with open(path, "rb") as f:
+                data = f.read()
+            for page_text in iter_pdf_pages(data, backend=backend, max_pages=0, max_chars=0):
+                pages += 1
+                chars += len(page_text)
+    elapsed = time.perf_counter() - started
+
+    queue.put({
+        "backend": backend,
+        "pages": pages,
+        "chars": chars,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(pages / elapsed, 1) if elapsed else 0.0,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "rss_delta_mb": round(_peak_rss_mb() - baseline, 1)
+    })
+
+
+def run(directory: str = FIXTURE_DIR, repeat: int = 3) -> list:
+    paths = list_fixtures(directory)
+    if not paths:
+        raise SystemExit(f"No PDFs in {directory} (use --generate)")
+
+    ctx = mp.get_context("spawn")
+    results = []
+
+    for backend in available_backends():
+        queue = ctx.Queue()
+        worker = ctx.Process(target=_measure, args=(backend, paths, repeat, queue))
+        worker.start()
+        results.append(queue.get())
+        worker.join()
+
+    print(f"Corpus: {len(paths)} files × {repeat} runs ({directory})")
+    print(f"{'backend':<10} {'pages':>7} {'sec':>8} {'pages/s':>9} {'peak MB':>9} {'Δ MB':>7}")
+    for r in results:
+        print(
+            f"{r['backend']:<10} {r['pages']:>7} {r['seconds']:>8} "
+            f"{r['pages_per_sec']:>9} {r['peak_rss_mb']:>9} {r['rss_delta_mb']:>7}"
+        )
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare PDF extraction backends")
+    parser.add_argument("--corpus", default=FIXTURE_DIR, help="directory of PDF fixtures")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the corpus")
+    parser.add_argument(
+        "--generate", action="store_true",
+        help="(re)create the deterministic fixture corpus first"
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.generate:
+        generate_fixtures(args.corpus)
+    run(args.corpus, args.repeat)
@@ -0,0 +1,137 @@
+import os
+import sys
+import time
+import argparse
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services.summarizer.segmentation import SEGMENTERS
+from utils.text_preprocessing import SUPPORTED_EXTENSIONS, extract_text_from_input
+
+
+RAW_DIR = os.path.join(BACKEND_DIR, "data", "raw")
+REFERENCE = "punkt"
+
+SAMPLE_TEXT = (
+    "Dr. Rivera opened the lecture on cellular respiration. Glycolysis splits "
+    "one glucose molecule into two pyruvate molecules, e.g. in muscle cells "
+    "during a sprint. Does it need oxygen? No! It runs in the cytoplasm. "
+    "The Krebs cycle, described by H. Krebs in 1937, yields 2.5 ATP per NADH "
+    "on average. \"Remember the numbers,\" she said. Fig. 3 shows the electron "
+    "transport chain.\n\nSummary of key points\nOxidative phosphorylation makes "
+    "most of the ATP. "
+)
+
+
+# ============================================================
+# CORPUS
+# ============================================================
+def load_corpus(directory: str) -> list:
+    texts = []
+
+    if os.path.isdir(directory):
+        for name in sorted(os.listdir(directory)):
+            if not name.lower().endswith(SUPPORTED_EXTENSIONS):
+                continue
+            try:
+                with open(os.path.join(directory, name), "rb") as f:
+                    texts.append(extract_text_from_input(file=f))
+            except Exception as e:
+                print(f"Skipping {name}: {e}")
+
+    # Built-in sample when no corpus is available
+    return texts or [SAMPLE_TEXT * 200]
+
+
+# ============================================================
+# MEASUREMENT
+# ============================================================
+def boundaries(text: str, sentences: list) -> set:
+    """
+    Character offsets where sentences end (comparable across segmenters).
+    """
+    offsets, position = set(), 0
+    for sentence in sentences:
+        found = text.find(sentence, position)
+        if found < 0:
+            continue
+        position = found + len(sentence)
+        offsets.add(position)
+    return offsets
+
+
+def agreement(predicted: set, reference: set) -> dict:
+    hits = len(predicted & reference)
+    precision = hits / len(predicted) if predicted else 0.0
+    recall = hits / len(reference) if reference else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if hits else 0.0
+    return {"precision": round(precision, 3), "recall": round(recall, 3), "f1": round(f1, 3)}
+
+
+def _time_segmenter(segment, texts: list, repeat: int):
+    outputs = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        outputs = [segment(text) for text in texts]
+    elapsed = time.perf_counter() - started
+    return outputs, elapsed
+
+
+def run(directory: str = RAW_DIR, repeat: int = 3) -> list:
+    texts = load_corpus(directory)
+    chars = sum(len(t) for t in texts)
+
+    outputs, results = {}, []
+
+    for name, segment in SEGMENTERS.items():
+        try:
+            segmented, elapsed = _time_segmenter(segment, texts, repeat)
+        except LookupError:
+            print(f"{name}: unavailable (model data not installed)")
+            continue
+
+        sentences = sum(len(s) for s in segmented)
+        outputs[name] = segmented
+        results.append({
+            "segmenter": name,
+            "sentences": sentences,
+            "seconds": round(elapsed, 3),
+            "sentences_per_sec": round(sentences * repeat / elapsed, 1) if elapsed else 0.0
+        })
+
+    reference = outputs.get(REFERENCE)
+    for result in results:
+        if reference is None:
+            continue
+        predicted, expected = set(), set()
+        for doc, (mine, theirs) in enumerate(zip(outputs[result["segmenter"]], reference)):
+            predicted |= {(doc, o) for o in boundaries(texts[doc], mine)}
+            expected |= {(doc, o) for o in boundaries(texts[doc], theirs)}
+        result.update(agreement(predicted, expected))
+
+    print(f"Corpus: {len(texts)} texts, {chars} chars × {repeat} runs")
+    print(f"{'segmenter':<10} {'sentences':>10} {'sec':>8} {'sent/s':>10} {'P':>6} {'R':>6} {'F1':>6}")
+    for r in results:
+        print(
+            f"{r['segmenter']:<10} {r['sentences']:>10} {r['seconds']:>8} "
+            f"{r['sentences_per_sec']:>10} {r.get('precision', '-'):>6} "
+            f"{r.get('recall', '-'):>6} {r.get('f1', '-'):>6}"
+        )
+    if reference is None:
+        print(f"(agreement needs the '{REFERENCE}' segmenter)")
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description=f"Compare sentence segmenters (agreement vs {REFERENCE})"
+    )
+    parser.add_argument("--corpus", default=RAW_DIR, help="directory of PDF/TXT/DOCX files")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the corpus")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run(args.corpus, args.repeat)
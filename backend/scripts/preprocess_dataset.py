@@ -1,63 +1,205 @@
 import os
-import json
-from datetime import datetime
 import sys
-from backend.services.summarizer.abstractive import explain
-from backend.services.summarizer.conceptual import get_conceptual_summary
-from backend.utils.text_preprocessing import extract_text_from_input
-from utils.doc_fingerprint import generate_doc_id
-
+import time
+import argparse
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_ROOT = os.path.dirname(BACKEND_DIR)
 sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, BACKEND_DIR)
+
+from services.llm.response_cache import llm_cache
+from services.summarizer.abstractive import explain
+from services.summarizer.conceptual import get_conceptual_summary, get_concepts_spacy_batch
+from services.summarizer.extractive import extractive_summary, extractive_summary_batch
+from services.summarizer.idf_model import (
+    IDF_MODEL_FILE,
+    DocumentFrequencies,
+    build_idf_model,
+    load_document_frequencies
+)
+from services.summarizer.map_reduce import summarize_long
+from services.summarizer.cache_loader import DATA_DIR, INDEX_FILE, DocumentIndex
+from services.summarizer.near_duplicate import (
+    NearDuplicateIndex,
+    minhash_signature,
+    near_duplicate_path
+)
+from services.ingestion.upload import UploadBuffer
+from utils.text_preprocessing import extract_text_from_input
+from utils.doc_fingerprint import generate_doc_id, raw_fingerprint
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-DATA_DIR = os.path.join(BASE_DIR, "data")
 
 RAW_DIR = os.path.join(DATA_DIR, "raw")
 PROCESSED_DIR = os.path.join(DATA_DIR, "processed")
-INDEX_FILE = os.path.join(DATA_DIR, "index.json")
+
+SUPPORTED_EXTENSIONS = (".pdf", ".txt", ".docx")
+DEFAULT_WORKERS = int(os.getenv("PREPROCESS_WORKERS", "4"))
+EXTRACTIVE_RATIO = 0.35
+FALLBACK_SOURCES = {"fallback", "spacy", "none"}
 
 
 os.makedirs(PROCESSED_DIR, exist_ok=True)
 
+# doc_ids currently being processed (identical files under different names)
+_in_flight = set()
+_in_flight_lock = threading.Lock()
 
-def load_index():
-    if not os.path.exists(INDEX_FILE):
-        return {}
-    with open(INDEX_FILE, "r") as f:
-        return json.load(f)
+# MinHash signatures next to index.json (served to /api/summarize)
+near_duplicates = NearDuplicateIndex(near_duplicate_path(DATA_DIR))
 
+# Corpus df counts behind the IDF model; run() loads them and every
+# document stored in the run is added (no re-extraction of the corpus)
+corpus_counts = DocumentFrequencies()
 
-def save_index(index):
-    with open(INDEX_FILE, "w") as f:
-        json.dump(index, f, indent=2)
 
+# ============================================================
+# PROGRESS
+# ============================================================
+class ProgressReport:
+    """
+    Thread-safe counters + throughput for a preprocessing run.
+    """
 
-def preprocess_file(filename, index):
-    doc_id = generate_doc_id(text)
+    def __init__(self, total: int):
+        self.total = total
+        self.started = time.monotonic()
+        self.counts = {"processed": 0, "skipped": 0, "empty": 0, "failed": 0}
+        self.llm_outputs = 0
+        self.llm_fallbacks = 0
+        self._lock = threading.Lock()
+
+        # Provider calls / cache hits are read from the response cache
+        # counters (documents are summarized concurrently)
+        self._cache_start = llm_cache.stats()
+
+    def record(self, filename: str, result: dict) -> None:
+        with self._lock:
+            self.counts[result["status"]] += 1
+            self.llm_outputs += result.get("llm_outputs", 0)
+            self.llm_fallbacks += result.get("llm_fallbacks", 0)
+            done = sum(self.counts.values())
+            rate = self._docs_per_min()
+
+        detail = f" ({result['error']})" if result.get("error") else ""
+        print(
+            f"[{done}/{self.total}] {filename} → {result['status']}{detail} "
+            f"| {rate:.1f} docs/min"
+        )
+
+    def _docs_per_min(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.counts["processed"] / elapsed * 60 if elapsed > 0 else 0.0
+
+    def summary(self) -> dict:
+        cache = llm_cache.stats()
+        with self._lock:
+            return {
+                **self.counts,
+                "llm_calls": cache["calls"] - self._cache_start["calls"],
+                "llm_cache_hits": cache["hits"] - self._cache_start["hits"],
+                "llm_outputs": self.llm_outputs,
+                "llm_fallbacks": self.llm_fallbacks,
+                "elapsed_sec": round(time.monotonic() - self.started, 1),
+                "docs_per_min": round(self._docs_per_min(), 2)
+            }
+
+
+# ============================================================
+# SINGLE FILE
+# ============================================================
+def load_document(filename: str, index: DocumentIndex, force: bool = False) -> dict:
+    """
+    Extracts + fingerprints one raw file.
+
+    status "pending" carries text/doc_id; anything else is final.
+    """
     raw_path = os.path.join(RAW_DIR, filename)
-    processed_path = os.path.join(PROCESSED_DIR, f"{doc_id}.json")
 
-    print(f"Processing: {filename}")
+    # 1️⃣ Fingerprint raw bytes, then extract text
+    with open(raw_path, "rb") as f, UploadBuffer(f) as buffer:
+        raw_id = raw_fingerprint(buffer.iter_chunks())
+
+        # Unchanged file → skip without parsing
+        known_doc_id = index.find_by_raw_fingerprint(raw_id)
+        if not force and known_doc_id and index.get(known_doc_id) is not None:
+            return {"status": "skipped", "doc_id": known_doc_id}
 
-    # 1️⃣ Extract text
-    text = extract_text_from_input(text=None, file=open(raw_path, "rb"))
+        text = extract_text_from_input(text=None, file=buffer)
     if not text:
-        print(f"Skipping empty file: {filename}")
-        return
+        return {"status": "empty"}
 
-    # 2️⃣ Summaries
-    basic = explain(text, mode="basic")
-    detailed = explain(text, mode="detailed")
+    # 2️⃣ Skip by content fingerprint (renamed copies are not re-processed)
+    doc_id = generate_doc_id(text)
+    if not force and index.get(doc_id) is not None:
+        return {"status": "skipped", "doc_id": doc_id}
 
-    concept_data = get_conceptual_summary(text)
+    return {
+        "status": "pending",
+        "filename": filename,
+        "raw_path": raw_path,
+        "text": text,
+        "doc_id": doc_id,
+        "raw_fingerprint": raw_id
+    }
+
+
+def preprocess_file(filename: str, index: DocumentIndex, force: bool = False) -> dict:
+    document = load_document(filename, index, force=force)
+    if document["status"] != "pending":
+        return document
+
+    return summarize_document(document, index)
+
+
+def summarize_document(document: dict, index: DocumentIndex, concept_data: dict = None) -> dict:
+    doc_id = document["doc_id"]
+
+    with _in_flight_lock:
+        if doc_id in _in_flight:
+            return {"status": "skipped", "doc_id": doc_id}
+        _in_flight.add(doc_id)
+
+    try:
+        return _summarize_and_store(
+            document["filename"], document["raw_path"], document["text"],
+            doc_id, index, concept_data, document.get("raw_fingerprint"),
+            document.get("extractive")
+        )
+    finally:
+        with _in_flight_lock:
+            _in_flight.discard(doc_id)
+
+
+def _summarize_and_store(
+    filename: str,
+    raw_path: str,
+    text: str,
+    doc_id: str,
+    index: DocumentIndex,
+    concept_data: dict = None,
+    raw_id: str = None,
+    extractive: str = None
+) -> dict:
+    # 3️⃣ Summaries (detailed explains the extractive summary, like /api/summarize)
+    if extractive is None:
+        extractive = extractive_summary(text, ratio=EXTRACTIVE_RATIO)
+
+    basic = summarize_long(text, mode="basic")
+    detailed = summarize_long(extractive or text, mode="detailed")
+
+    local_concepts = concept_data is not None
+    if concept_data is None:
+        concept_data = get_conceptual_summary(text)
     concepts = concept_data.get("key_concepts", [])
 
     overview_input = "Key concepts:\n" + "\n".join(f"- {c}" for c in concepts)
     overview = explain(overview_input, mode="overview")
 
-    # 3️⃣ Build processed object
+    # 4️⃣ Build processed object
     processed = {
         "doc_id": doc_id,
         "source_file": filename,
@@ -77,28 +219,209 @@ def preprocess_file(filename, index):
         }
     }
 
-    # 4️⃣ Save processed output
-    with open(processed_path, "w") as f:
-        json.dump(processed, f, indent=2)
-
-    # 5️⃣ Update index
-    index[doc_id] = {
+    # 5️⃣ Save + checkpoint index (atomic write-rename per file)
+    index.save_document(doc_id, processed, entry={
         "raw_path": raw_path,
-        "processed_path": processed_path
+        "source_file": filename,
+        "raw_fingerprint": raw_id
+    })
+    near_duplicates.add(doc_id, minhash_signature(text))
+    corpus_counts.add(text, doc_id)
+
+    # spaCy concepts are only a fallback when an LLM was asked first
+    results = [basic, detailed, overview] + ([] if local_concepts else [concept_data])
+    fallbacks = sum(1 for result in results if result.get("source") in FALLBACK_SOURCES)
+
+    return {
+        "status": "processed",
+        "doc_id": doc_id,
+        "llm_outputs": len(results) - fallbacks,
+        "llm_fallbacks": fallbacks
+    }
+
+
+def _safe(fn, *args) -> dict:
+    try:
+        return fn(*args)
+    except Exception as e:
+        return {"status": "failed", "error": str(e)}
+
+
+# ============================================================
+# BATCH
+# ============================================================
+def list_raw_files(raw_dir: str = None) -> list:
+    raw_dir = raw_dir or RAW_DIR
+    if not os.path.isdir(raw_dir):
+        return []
+    return sorted(
+        f for f in os.listdir(raw_dir)
+        if f.lower().endswith(SUPPORTED_EXTENSIONS)
+    )
+
+
+def _run_with_local_concepts(executor, files, index, force, report) -> None:
+    """
+    Extract all files first, run spaCy and extractive scoring once over
+    the batch, then summarize with the precomputed inputs.
+    """
+    futures = {
+        executor.submit(_safe, load_document, filename, index, force): filename
+        for filename in files
+    }
+
+    pending, seen = [], set()
+    for future in as_completed(futures):
+        result = future.result()
+        if result["status"] == "pending" and result["doc_id"] not in seen:
+            seen.add(result["doc_id"])
+            pending.append(result)
+        elif result["status"] == "pending":
+            report.record(futures[future], {"status": "skipped", "doc_id": result["doc_id"]})
+        else:
+            report.record(futures[future], result)
+
+    texts = [doc["text"] for doc in pending]
+    concept_batch = get_concepts_spacy_batch(texts)
+
+    # One vectorized TF-IDF pass for every document's detailed input
+    for doc, extractive in zip(pending, extractive_summary_batch(texts, EXTRACTIVE_RATIO)):
+        doc["extractive"] = extractive
+
+    futures = {
+        executor.submit(_safe, summarize_document, doc, index, concept_data): doc["filename"]
+        for doc, concept_data in zip(pending, concept_batch)
     }
+    for future in as_completed(futures):
+        report.record(futures[future], future.result())
+
+
+# ============================================================
+# CORPUS IDF MODEL
+# ============================================================
+def iter_corpus_texts(index: DocumentIndex):
+    """
+    Re-extracts the raw file of every indexed document, one at a time.
+    """
+    for doc_id, entry in index.entries().items():
+        raw_path = entry.get("raw_path")
+        if not raw_path or not os.path.exists(raw_path):
+            continue
+        try:
+            with open(raw_path, "rb") as f:
+                yield doc_id, extract_text_from_input(text=None, file=f)
+        except Exception as e:
+            print(f"IDF corpus: skipping {doc_id}: {e}")
+
+
+def _save_idf_model(model, path: str) -> int:
+    if model is None:
+        print("IDF model: no indexed documents with text, skipped")
+        return 0
+
+    model.save(path)
+    print(f"IDF model: {len(model)} terms from {model.n_docs} documents → {path}")
+    return model.n_docs
+
+
+def rebuild_idf_model(index: DocumentIndex, path: str = IDF_MODEL_FILE) -> int:
+    """
+    Full rebuild: re-extracts every indexed raw file (--rebuild-idf, or
+    a model saved without df counts).
+    """
+    return _save_idf_model(build_idf_model(iter_corpus_texts(index)), path)
+
+
+def update_idf_model(path: str = IDF_MODEL_FILE) -> int:
+    """
+    Incremental: saved counts plus the documents stored in this run.
+
+    Documents deleted or changed since they were counted keep their old
+    df contribution until the next --rebuild-idf.
+    """
+    return _save_idf_model(corpus_counts.model(), path)
+
+
+def run(
+    workers: int = DEFAULT_WORKERS,
+    force: bool = False,
+    local_concepts: bool = False,
+    rebuild_idf: bool = False
+) -> dict:
+    global corpus_counts
+
+    index = DocumentIndex(INDEX_FILE)
+    files = list_raw_files()
+
+    saved_counts = load_document_frequencies(IDF_MODEL_FILE)
+    # Saved counts cover the indexed corpus (an empty index needs none)
+    counts_complete = saved_counts is not None or len(index) == 0
+    corpus_counts = saved_counts or DocumentFrequencies()
+    report = ProgressReport(total=len(files))
+
+    print(f"Preprocessing {len(files)} files with {workers} workers")
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        if local_concepts:
+            _run_with_local_concepts(executor, files, index, force, report)
+        else:
+            futures = {
+                executor.submit(_safe, preprocess_file, filename, index, force): filename
+                for filename in files
+            }
+            for future in as_completed(futures):
+                report.record(futures[future], future.result())
+
+    # Fold this run's journal appends back into index.json / minhash_index.json
+    index.compact()
+    near_duplicates.compact()
+
+    summary = report.summary()
+    print(
+        "Preprocessing complete. "
+        f"processed={summary['processed']} skipped={summary['skipped']} "
+        f"empty={summary['empty']} failed={summary['failed']} | "
+        f"{summary['docs_per_min']} docs/min | "
+        f"LLM calls={summary['llm_calls']} cache hits={summary['llm_cache_hits']} "
+        f"(fallbacks={summary['llm_fallbacks']}) | "
+        f"{summary['elapsed_sec']}s"
+    )
 
+    # Corpus changed (or asked to) → refresh IDF statistics for extractive scoring
+    if rebuild_idf or (summary["processed"] and not counts_complete):
+        rebuild_idf_model(index)
+    elif summary["processed"]:
+        update_idf_model()
 
-def run():
-    index = load_index()
+    return summary
 
-    for file in os.listdir(RAW_DIR):
-        if file.lower().endswith((".pdf", ".txt", ".docx")):
-            if os.path.splitext(file)[0] not in index:
-                preprocess_file(file, index)
 
-    save_index(index)
-    print("Preprocessing complete.")
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute summaries for data/raw")
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS,
+        help="files processed concurrently (default: PREPROCESS_WORKERS or 4)"
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="re-process documents already present in the index"
+    )
+    parser.add_argument(
+        "--local-concepts", action="store_true",
+        help="extract concepts with one batched spaCy pass instead of cloud LLMs"
+    )
+    parser.add_argument(
+        "--rebuild-idf", action="store_true",
+        help="rebuild the corpus IDF model even if no new documents were processed"
+    )
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    run()
+    args = parse_args()
+    run(
+        workers=args.workers,
+        force=args.force,
+        local_concepts=args.local_concepts,
+        rebuild_idf=args.rebuild_idf
+    )
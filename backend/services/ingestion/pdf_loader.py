@@ -1,12 +1,331 @@
-import fitz  # PyMuPDF
+import io
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from importlib.util import find_spec
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
-    doc = fitz.open(stream=file_bytes, filetype="pdf")
-    pages = []
+from services.ingestion.upload import in_memory_spool
+from utils.text_preprocessing import PDF_MAX_CHARS, PDF_MAX_PAGES, apply_page_budget
 
-    for page in doc:
-        text = page.get_text()
-        if text.strip():
-            pages.append(text)
+# ============================================================
+# PDF INGESTION ENGINE
+#
+# One entry point, pluggable backends:
+#
+# 1️⃣ PyMuPDF  (fastest, preferred when installed)
+# 2️⃣ PyPDF2   (pure Python fallback)
+#
+# PDF_BACKEND forces a backend by name.
+#
+# `source` may be raw bytes, a filesystem path, or a binary file object.
+# ============================================================
 
-    return "\n".join(pages)
+PDF_BACKEND = os.getenv("PDF_BACKEND", "").lower() or None
+BACKEND_PREFERENCE = ["pymupdf", "pypdf2"]
+
+# Multi-process extraction (opt-in): 0/1 workers = single process
+PDF_PARALLEL_WORKERS = int(os.getenv("PDF_PARALLEL_WORKERS", "0"))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+
+PDF_BACKENDS: Dict[str, Dict[str, Callable]] = {}
+
+
+def register_backend(
+    name: str,
+    module: str,
+    iter_pages: Callable,
+    page_count: Callable
+) -> None:
+    """
+    iter_pages(source, start, stop) -> Iterator[str]
+    page_count(source) -> int
+    """
+    PDF_BACKENDS[name] = {
+        "module": module,
+        "iter_pages": iter_pages,
+        "page_count": page_count
+    }
+
+
+def available_backends() -> List[str]:
+    ordered = BACKEND_PREFERENCE + [n for n in PDF_BACKENDS if n not in BACKEND_PREFERENCE]
+    return [
+        name for name in ordered
+        if name in PDF_BACKENDS and find_spec(PDF_BACKENDS[name]["module"]) is not None
+    ]
+
+
+def get_backend(name: Optional[str] = None) -> str:
+    name = name or PDF_BACKEND
+    available = available_backends()
+
+    if name:
+        if name not in available:
+            raise ValueError(f"PDF backend '{name}' is not available")
+        return name
+
+    if not available:
+        raise ValueError("No PDF backend installed (PyMuPDF or PyPDF2 required)")
+
+    return available[0]
+
+
+def _as_stream(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, "rb")
+    source.seek(0)
+    return source
+
+
+# ============================================================
+# BACKEND: PyMuPDF
+# ============================================================
+
+def _zero_copy_view(source) -> Optional[memoryview]:
+    """
+    Buffer over a file object's bytes without reading them into a copy:
+    BytesIO's own buffer, or an mmap of a real file. None otherwise.
+
+    PyMuPDF keeps a reference to the stream it was opened with, so the
+    view (and its mmap) stays alive until the document is released.
+    """
+    if isinstance(source, io.BytesIO):
+        return source.getbuffer()
+    if in_memory_spool(source):
+        return None
+
+    try:
+        fd = source.fileno()
+        if os.fstat(fd).st_size == 0:
+            return None
+        return memoryview(mmap.mmap(fd, 0, access=mmap.ACCESS_READ))
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        return None
+
+
+def _open_pymupdf(source):
+    import fitz  # PyMuPDF
+
+    if isinstance(source, (str, os.PathLike)):
+        return fitz.open(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=source, filetype="pdf")
+
+    view = _zero_copy_view(source)
+    if view is not None:
+        return fitz.open(stream=view, filetype="pdf")
+
+    source.seek(0)
+    return fitz.open(stream=source.read(), filetype="pdf")
+
+
+def _pymupdf_iter_pages(source, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+    doc = _open_pymupdf(source)
+    try:
+        stop = doc.page_count if stop is None else min(stop, doc.page_count)
+        for number in range(start, stop):
+            yield doc.load_page(number).get_text()
+    finally:
+        doc.close()
+
+
+def _pymupdf_page_count(source) -> int:
+    doc = _open_pymupdf(source)
+    try:
+        return doc.page_count
+    finally:
+        doc.close()
+
+
+# ============================================================
+# BACKEND: PyPDF2
+# ============================================================
+
+def _pypdf2_iter_pages(source, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+    from PyPDF2 import PdfReader
+
+    stream = _as_stream(source)
+    try:
+        reader = PdfReader(stream)
+        stop = len(reader.pages) if stop is None else min(stop, len(reader.pages))
+        for number in range(start, stop):
+            yield reader.pages[number].extract_text() or ""
+    finally:
+        if stream is not source:
+            stream.close()
+
+
+def _pypdf2_page_count(source) -> int:
+    from PyPDF2 import PdfReader
+
+    stream = _as_stream(source)
+    try:
+        return len(PdfReader(stream).pages)
+    finally:
+        if stream is not source:
+            stream.close()
+
+
+register_backend("pymupdf", "fitz", _pymupdf_iter_pages, _pymupdf_page_count)
+register_backend("pypdf2", "PyPDF2", _pypdf2_iter_pages, _pypdf2_page_count)
+
+
+# ============================================================
+# PUBLIC API
+# ============================================================
+
+def count_pages(source, backend: Optional[str] = None) -> int:
+    return PDF_BACKENDS[get_backend(backend)]["page_count"](source)
+
+
+def iter_pdf_pages(
+    source,
+    backend: Optional[str] = None,
+    max_pages: Optional[int] = PDF_MAX_PAGES,
+    max_chars: Optional[int] = PDF_MAX_CHARS
+) -> Iterator[str]:
+    """
+    Yields page texts lazily from the preferred backend, within budgets.
+    """
+    iter_pages = PDF_BACKENDS[get_backend(backend)]["iter_pages"]
+    stop = max_pages if max_pages else None
+
+    yield from apply_page_budget(iter_pages(source, 0, stop), max_pages, max_chars)
+
+
+def extract_text_from_pdf(
+    source,
+    backend: Optional[str] = None,
+    max_pages: Optional[int] = PDF_MAX_PAGES,
+    max_chars: Optional[int] = PDF_MAX_CHARS
+) -> str:
+    return "\n".join(iter_pdf_pages(source, backend, max_pages, max_chars))
+
+
+# ============================================================
+# MULTI-PROCESS EXTRACTION
+#
+# The page range is split into contiguous slices; each worker opens the
+# same file by path (PyMuPDF maps it, nothing is pickled but the path)
+# and returns its slice's page texts, which are reassembled in order.
+# ============================================================
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_workers = 0
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Long-lived pool so worker start-up is paid once, not per upload.
+
+    The pool only grows: a call asking for fewer workers just submits
+    fewer slices. A replaced pool finishes its in-flight extractions
+    before shutting down (in the background).
+
+    Spawned workers re-import the main module; app.py guards its
+    module-level app creation for that reason.
+    """
+    global _process_pool, _process_pool_workers
+
+    with _process_pool_lock:
+        if _process_pool is None or workers > _process_pool_workers:
+            retired = _process_pool
+            _process_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=mp.get_context("spawn")
+            )
+            _process_pool_workers = workers
+
+            if retired is not None:
+                threading.Thread(
+                    target=retired.shutdown,
+                    kwargs={"wait": True},
+                    name="pdf-pool-retire",
+                    daemon=True
+                ).start()
+        return _process_pool
+
+
+def _extract_page_range(task: Tuple[str, str, int, int]) -> List[str]:
+    path, backend, start, stop = task
+    return list(PDF_BACKENDS[backend]["iter_pages"](path, start, stop))
+
+
+def _split_range(total: int, parts: int) -> List[Tuple[int, int]]:
+    size, extra = divmod(total, parts)
+    ranges, start = [], 0
+    for i in range(parts):
+        stop = start + size + (1 if i < extra else 0)
+        if stop > start:
+            ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def _spool_to_path(source) -> Tuple[str, bool]:
+    """
+    Returns (path, is_temporary) for any supported source.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source), False
+
+    tmp = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+    with tmp:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            tmp.write(source)
+        else:
+            source.seek(0)
+            shutil.copyfileobj(source, tmp)
+    return tmp.name, True
+
+
+def iter_pdf_pages_parallel(
+    source,
+    workers: int = PDF_PARALLEL_WORKERS,
+    backend: Optional[str] = None,
+    max_pages: Optional[int] = PDF_MAX_PAGES,
+    max_chars: Optional[int] = PDF_MAX_CHARS,
+    min_pages: int = PDF_PARALLEL_MIN_PAGES
+) -> Iterator[str]:
+    """
+    Like iter_pdf_pages, but spreads pages over a process pool.
+
+    Falls back to single-process extraction for small documents
+    (< min_pages) or when workers <= 1.
+    """
+    backend = get_backend(backend)
+
+    if workers <= 1:
+        yield from iter_pdf_pages(source, backend, max_pages, max_chars)
+        return
+
+    path, is_temporary = _spool_to_path(source)
+    try:
+        total = count_pages(path, backend)
+        if max_pages:
+            total = min(total, max_pages)
+
+        if total < min_pages:
+            yield from iter_pdf_pages(path, backend, max_pages, max_chars)
+            return
+
+        tasks = [
+            (path, backend, start, stop)
+            for start, stop in _split_range(total, workers)
+        ]
+        slices = _get_process_pool(workers).map(_extract_page_range, tasks)
+
+        pages = (page_text for slice_texts in slices for page_text in slice_texts)
+        yield from apply_page_budget(pages, max_pages, max_chars)
+
+    finally:
+        if is_temporary:
+            os.remove(path)
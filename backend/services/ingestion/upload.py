@@ -0,0 +1,201 @@
+import codecs
+import io
+import mmap
+import os
+import tempfile
+from typing import Iterator, List, Optional
+
+# ============================================================
+# UPLOAD BUFFER
+#
+# Uploads are read once and exposed to every parser as a buffer:
+#
+# 1️⃣ Backed by a real file (rolled-over spooled temp file, open()'d path)
+#    → memory-mapped in place, nothing is copied
+#    (a spooled file still in memory is read, never forced to disk)
+# 2️⃣ Small in-memory streams (<= UPLOAD_SPOOL_THRESHOLD)
+#    → read into one bytes object
+# 3️⃣ Large in-memory streams
+#    → spooled to a named temp file in chunks, then memory-mapped
+#
+# Parsers take `path` when there is one (PyMuPDF / python-docx open
+# it themselves), else `view` / `open()`.
+# ============================================================
+
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", str(4 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Tried in order after UTF-8; latin-1 never fails, so decoding always succeeds
+TEXT_FALLBACK_ENCODINGS = ["cp1252", "latin-1"]
+
+
+def in_memory_spool(stream) -> bool:
+    """
+    True for a SpooledTemporaryFile still held in memory: asking it for
+    fileno() would force a rollover to disk.
+    """
+    return getattr(stream, "_rolled", True) is False
+
+
+def _fileno(stream) -> Optional[int]:
+    if in_memory_spool(stream):
+        return None
+    try:
+        return stream.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+
+class UploadBuffer:
+    """
+    Read-only, single-copy view of an uploaded file.
+
+    Accepts a Werkzeug FileStorage, any binary file object, or raw bytes.
+    Use as a context manager (or call close()) to release the mapping and
+    any temp file.
+    """
+
+    def __init__(self, file, spool_threshold: int = UPLOAD_SPOOL_THRESHOLD):
+        self.path: Optional[str] = None
+        self.filename: Optional[str] = getattr(file, "filename", None)
+        self._data = b""
+        self._mmap: Optional[mmap.mmap] = None
+        self._temp_path: Optional[str] = None
+
+        if isinstance(file, (bytes, bytearray, memoryview)):
+            self._data = bytes(file)
+            return
+
+        stream = getattr(file, "stream", file)  # FileStorage wraps the real stream
+        name = getattr(stream, "name", None)
+
+        if isinstance(name, str) and os.path.isfile(name):
+            self.path = name
+            self.filename = self.filename or os.path.basename(name)
+
+        fd = _fileno(stream)
+        if fd is not None:
+            self._map_fd(fd)
+            return
+
+        self._read_stream(stream, spool_threshold)
+
+    # ---------------- construction ----------------
+
+    def _map_fd(self, fd: int) -> None:
+        if os.fstat(fd).st_size > 0:
+            self._mmap = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+
+    def _read_stream(self, stream, spool_threshold: int) -> None:
+        if hasattr(stream, "seek"):
+            stream.seek(0)
+
+        chunks: List[bytes] = []
+        size = 0
+
+        while True:
+            chunk = stream.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > spool_threshold:
+                self._spool(chunks, stream)
+                return
+
+        self._data = b"".join(chunks)
+
+    def _spool(self, head: List[bytes], stream) -> None:
+        tmp = tempfile.NamedTemporaryFile(suffix=".upload", delete=False)
+        self._temp_path = self.path = tmp.name
+
+        with tmp:
+            for chunk in head:
+                tmp.write(chunk)
+            head.clear()
+            while True:
+                chunk = stream.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                tmp.write(chunk)
+
+        with open(self._temp_path, "rb") as f:
+            self._map_fd(f.fileno())  # the mapping outlives the descriptor
+
+    # ---------------- access ----------------
+
+    @property
+    def size(self) -> int:
+        return len(self._mmap) if self._mmap is not None else len(self._data)
+
+    @property
+    def view(self) -> memoryview:
+        return memoryview(self._mmap if self._mmap is not None else self._data)
+
+    def open(self):
+        """
+        Seekable binary file object over the buffer (no copy).
+        """
+        if self._mmap is not None:
+            self._mmap.seek(0)
+            return self._mmap
+        return io.BytesIO(self._data)
+
+    def source(self):
+        """
+        Best input for the PDF engine: a path if there is one, else the view.
+        """
+        return self.path or self.view
+
+    def iter_chunks(self, size: int = UPLOAD_CHUNK_SIZE) -> Iterator[memoryview]:
+        view = self.view
+        for start in range(0, len(view), size):
+            yield view[start:start + size]
+
+    # ---------------- cleanup ----------------
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # a parser still holds a view; freed with it
+            self._mmap = None
+        if self._temp_path:
+            try:
+                os.remove(self._temp_path)
+            except OSError:
+                pass
+            self._temp_path = self.path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ============================================================
+# TEXT DECODING
+# ============================================================
+
+def _decode_chunks(buffer: UploadBuffer, encoding: str) -> str:
+    decoder = codecs.getincrementaldecoder(encoding)(errors="strict")
+    parts = [decoder.decode(chunk) for chunk in buffer.iter_chunks()]
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+def decode_text(buffer: UploadBuffer) -> str:
+    """
+    Decodes the buffer as UTF-8 (BOM tolerated), falling back to
+    TEXT_FALLBACK_ENCODINGS. Each attempt re-scans the buffer, never the
+    upload stream.
+    """
+    for encoding in ["utf-8-sig"] + TEXT_FALLBACK_ENCODINGS:
+        try:
+            return _decode_chunks(buffer, encoding)
+        except UnicodeDecodeError:
+            continue
+
+    return ""
@@ -0,0 +1,347 @@
+import asyncio
+import json
+import os
+import queue
+import threading
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Union
+
+import httpx
+
+from services.llm.providers import LLM_CONNECT_TIMEOUT
+
+# ============================================================
+# ASYNC OLLAMA CLIENT
+#
+# asyncio-native client for the local / offline provider:
+#
+# - one pooled httpx.AsyncClient per process (keep-alive connections)
+# - a semaphore sized to the server's parallelism (OLLAMA_NUM_PARALLEL),
+#   so extra requests wait here instead of queueing inside Ollama
+# - every request carries keep_alive, keeping the model loaded between
+#   requests (no reload latency); preload() pins it ahead of time
+# - streaming tokens and concurrent generate_many()
+# - failures raise OllamaError with a kind the caller can act on
+#
+# Flask routes and worker threads are synchronous: generate_sync() and
+# stream_sync() run coroutines on one background event loop.
+# ============================================================
+
+OLLAMA_URL = os.getenv("OLLAMA_URL")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL")
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "120"))        # seconds, per request
+OLLAMA_NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))  # match the server setting
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+
+
+class OllamaError(RuntimeError):
+    """
+    kind: config | connect | timeout | http | model | protocol
+    """
+
+    RETRYABLE = {"connect", "timeout"}
+
+    def __init__(
+        self,
+        message: str,
+        kind: str,
+        status: Optional[int] = None,
+        model: Optional[str] = None
+    ):
+        super().__init__(message)
+        self.kind = kind
+        self.status = status
+        self.model = model
+
+    @property
+    def retryable(self) -> bool:
+        return self.kind in self.RETRYABLE or (self.status or 0) >= 500
+
+    def as_dict(self) -> Dict:
+        return {
+            "error": str(self),
+            "kind": self.kind,
+            "status": self.status,
+            "model": self.model,
+            "retryable": self.retryable
+        }
+
+
+def _error_message(response: httpx.Response) -> str:
+    try:
+        return response.json().get("error") or response.text
+    except ValueError:
+        return response.text or f"HTTP {response.status_code}"
+
+
+class AsyncOllamaClient:
+    def __init__(
+        self,
+        base_url: Optional[str] = OLLAMA_URL,
+        model: Optional[str] = OLLAMA_MODEL,
+        parallel: int = OLLAMA_NUM_PARALLEL,
+        keep_alive: str = OLLAMA_KEEP_ALIVE,
+        timeout: float = OLLAMA_TIMEOUT,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.base_url = (base_url or "").rstrip("/")
+        self.model = model
+        self.parallel = max(1, parallel)
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(self.parallel)
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.base_url and self.model)
+
+    def _http(self) -> httpx.AsyncClient:
+        if not self.configured:
+            raise OllamaError("Ollama is not configured", kind="config")
+
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=LLM_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=self.parallel,
+                    max_keepalive_connections=self.parallel
+                ),
+                transport=self._transport
+            )
+        return self._client
+
+    def _payload(self, prompt: str, stream: bool, format: Optional[str], options: Optional[Dict]) -> Dict:
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": self.keep_alive
+        }
+        if format:
+            payload["format"] = format
+        if options:
+            payload["options"] = options
+        return payload
+
+    def _timeout(self, timeout: Optional[float]) -> httpx.Timeout:
+        read = self.timeout if timeout is None else min(self.timeout, timeout)
+        return httpx.Timeout(read, connect=min(LLM_CONNECT_TIMEOUT, read))
+
+    def _translate(self, e: Exception) -> OllamaError:
+        if isinstance(e, OllamaError):
+            return e
+        if isinstance(e, httpx.TimeoutException):
+            return OllamaError(f"Ollama timed out: {e}", kind="timeout", model=self.model)
+        if isinstance(e, httpx.TransportError):
+            return OllamaError(f"Ollama unreachable: {e}", kind="connect", model=self.model)
+        return OllamaError(f"Ollama request failed: {e}", kind="protocol", model=self.model)
+
+    def _check_status(self, response: httpx.Response, message: str) -> None:
+        if response.status_code < 400:
+            return
+        kind = "model" if response.status_code == 404 else "http"
+        raise OllamaError(message, kind=kind, status=response.status_code, model=self.model)
+
+    def _check_line(self, data: Dict) -> None:
+        if data.get("error"):
+            raise OllamaError(data["error"], kind="model", model=self.model)
+
+    # ---------------- REQUESTS ----------------
+
+    async def generate(
+        self,
+        prompt: str,
+        timeout: Optional[float] = None,
+        format: Optional[str] = None,
+        options: Optional[Dict] = None
+    ) -> str:
+        """
+        Full completion text (stripped). Raises OllamaError.
+
+        timeout bounds the whole call, including the wait for a slot.
+        """
+        if timeout is None:
+            return await self._generate(prompt, None, format, options)
+
+        try:
+            return await asyncio.wait_for(
+                self._generate(prompt, timeout, format, options), timeout
+            )
+        except asyncio.TimeoutError as e:
+            raise OllamaError(
+                f"Ollama timed out after {timeout:.1f}s", kind="timeout", model=self.model
+            ) from e
+
+    async def _generate(
+        self,
+        prompt: str,
+        timeout: Optional[float],
+        format: Optional[str],
+        options: Optional[Dict]
+    ) -> str:
+        async with self._semaphore:
+            try:
+                response = await self._http().post(
+                    "/api/generate",
+                    json=self._payload(prompt, False, format, options),
+                    timeout=self._timeout(timeout)
+                )
+                self._check_status(response, _error_message(response))
+                data = response.json()
+            except (httpx.HTTPError, ValueError) as e:
+                raise self._translate(e) from e
+
+        self._check_line(data)
+        return data.get("response", "").strip()
+
+    async def stream(
+        self,
+        prompt: str,
+        timeout: Optional[float] = None,
+        format: Optional[str] = None,
+        options: Optional[Dict] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yields generated pieces as they arrive. Raises OllamaError.
+        """
+        async with self._semaphore:
+            try:
+                async with self._http().stream(
+                    "POST",
+                    "/api/generate",
+                    json=self._payload(prompt, True, format, options),
+                    timeout=self._timeout(timeout)
+                ) as response:
+                    if response.status_code >= 400:
+                        await response.aread()
+                        self._check_status(response, _error_message(response))
+
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+
+                        data = json.loads(line)
+                        self._check_line(data)
+
+                        piece = data.get("response", "")
+                        if piece:
+                            yield piece
+
+                        if data.get("done"):
+                            break
+            except (httpx.HTTPError, ValueError) as e:
+                raise self._translate(e) from e
+
+    async def generate_many(
+        self,
+        prompts: List[str],
+        timeout: Optional[float] = None,
+        format: Optional[str] = None
+    ) -> List[Union[str, OllamaError]]:
+        """
+        Runs prompts concurrently (bounded by the semaphore).
+
+        Results are aligned with prompts; failed items are OllamaError.
+        """
+        results = await asyncio.gather(
+            *(self.generate(prompt, timeout, format) for prompt in prompts),
+            return_exceptions=True
+        )
+        return [
+            r if isinstance(r, (str, OllamaError)) else self._translate(r)
+            for r in results
+        ]
+
+    async def preload(self) -> None:
+        """
+        Loads the model and pins it for keep_alive (empty prompt).
+        """
+        try:
+            response = await self._http().post(
+                "/api/generate",
+                json={"model": self.model, "keep_alive": self.keep_alive}
+            )
+            self._check_status(response, _error_message(response))
+        except httpx.HTTPError as e:
+            raise self._translate(e) from e
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# ============================================================
+# SYNC BRIDGE (one background event loop per process)
+# ============================================================
+
+class _LoopThread:
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever,
+                    name="ollama-loop",
+                    daemon=True
+                ).start()
+            return self._loop
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop())
+
+
+_loop_thread = _LoopThread()
+
+# Process-wide client used by the summarizer and quiz generator
+ollama = AsyncOllamaClient()
+
+
+def generate_sync(
+    prompt: str,
+    timeout: Optional[float] = None,
+    format: Optional[str] = None,
+    options: Optional[Dict] = None,
+    client: Optional[AsyncOllamaClient] = None
+) -> str:
+    client = client or ollama
+    return _loop_thread.submit(client.generate(prompt, timeout, format, options)).result()
+
+
+def stream_sync(
+    prompt: str,
+    timeout: Optional[float] = None,
+    client: Optional[AsyncOllamaClient] = None
+) -> Iterator[str]:
+    """
+    Blocking iterator over stream(); closing it early cancels the request.
+    """
+    client = client or ollama
+    pieces: queue.Queue = queue.Queue()
+
+    async def pump():
+        try:
+            async for piece in client.stream(prompt, timeout):
+                pieces.put(("token", piece))
+            pieces.put(("done", None))
+        except Exception as e:
+            pieces.put(("error", e))
+
+    future = _loop_thread.submit(pump())
+    try:
+        while True:
+            kind, value = pieces.get()
+            if kind == "done":
+                return
+            if kind == "error":
+                raise value
+            yield value
+    finally:
+        future.cancel()
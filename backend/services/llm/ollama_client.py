@@ -1,34 +1,50 @@
-import requests
-import json
-import os
+from typing import Iterator
 
-OLLAMA_URL = os.getenv("OLLAMA_URL")
-OLLAMA_MODEL = os.getenv("OLLAMA_MODEL")
-TIMEOUT = 120
+from services.llm.ollama_async import (
+    OLLAMA_MODEL,
+    OllamaError,
+    generate_sync,
+    ollama,
+    stream_sync
+)
 
+# Blocking facade over the async Ollama client (services/llm/ollama_async).
+# OLLAMA_MODEL and ollama are re-exported for the summarizer and quiz generator.
 
-def ollama_generate(prompt: str) -> str:
+
+def ollama_complete(
+    prompt: str,
+    timeout: float | None = None,
+    format: str | None = None,
+    options: dict | None = None
+) -> str:
     """
     Sends a prompt to Ollama and returns generated text.
-    Safe, blocking, no streaming.
+    Raises OllamaError (kind: config / connect / timeout / http / model / protocol).
     """
+    return generate_sync(prompt, timeout=timeout, format=format, options=options)
 
-    payload = {
-        "model": OLLAMA_MODEL,
-        "prompt": prompt,
-        "stream": False
-    }
 
+def ollama_generate(prompt: str, timeout: float | None = None) -> str:
+    """
+    Sends a prompt to Ollama and returns generated text.
+    Safe, blocking, no streaming: errors are logged and "" is returned.
+
+    timeout (seconds) caps the default timeout, e.g. to a request
+    deadline's remaining budget.
+    """
     try:
-        response = requests.post(
-            f"{OLLAMA_URL}/api/generate",
-            json=payload,
-            timeout=TIMEOUT
-        )
-        response.raise_for_status()
-        data = response.json()
-        return data.get("response", "").strip()
-
-    except Exception as e:
+        return ollama_complete(prompt, timeout=timeout)
+    except OllamaError as e:
         print("Ollama failed:", e)
         return ""
+
+
+def ollama_generate_stream(prompt: str, timeout: float | None = None) -> Iterator[str]:
+    """
+    Streams generated text from Ollama piece by piece.
+
+    Unlike ollama_generate, errors are raised (OllamaError) so callers can
+    fail over to another provider before anything has been emitted.
+    """
+    yield from stream_sync(prompt, timeout=timeout)
@@ -0,0 +1,167 @@
+import os
+import threading
+from typing import Callable, Dict, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ============================================================
+# PROVIDER REGISTRY
+#
+# One long-lived client per provider, created on first use and
+# shared by the summarizer, concept extractor and quiz generator, so
+# HTTP connection pools and TLS sessions are reused across requests.
+# (Ollama has its own async client: services/llm/ollama_async.)
+#
+# Getters return None when the provider is not configured (no API
+# key / SDK missing); callers treat that as "provider unavailable".
+# ============================================================
+
+LLM_HTTP_TIMEOUT = float(os.getenv("LLM_HTTP_TIMEOUT", "60"))        # seconds, per request
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))  # seconds
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "10"))                # keep-alive connections per provider
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+
+_clients: Dict[str, object] = {}
+_lock = threading.Lock()
+
+
+def _get_or_create(name: str, factory: Callable[[], object]):
+    client = _clients.get(name)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(name)
+        if client is None:
+            try:
+                client = factory()
+            except Exception as e:
+                print(f"[{name}] client unavailable:", e)
+                client = None
+            if client is not None:
+                _clients[name] = client
+
+    return client
+
+
+def _http_client():
+    import httpx
+
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=LLM_POOL_SIZE,
+            max_keepalive_connections=LLM_POOL_SIZE
+        ),
+        timeout=httpx.Timeout(LLM_HTTP_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+    )
+
+
+# ============================================================
+# FACTORIES
+# ============================================================
+
+def _make_openai():
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return None
+
+    from openai import OpenAI
+    return OpenAI(
+        api_key=api_key,
+        http_client=_http_client(),
+        max_retries=LLM_MAX_RETRIES
+    )
+
+
+def _make_groq():
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        return None
+
+    from openai import OpenAI  # Groq is OpenAI-compatible
+    return OpenAI(
+        base_url=GROQ_BASE_URL,
+        api_key=api_key,
+        http_client=_http_client(),
+        max_retries=LLM_MAX_RETRIES
+    )
+
+
+def _make_mistral():
+    api_key = os.getenv("MISTRAL_API_KEY")
+    if not api_key:
+        return None
+
+    from mistralai import Mistral
+    return Mistral(
+        api_key=api_key,
+        client=_http_client(),
+        timeout_ms=int(LLM_HTTP_TIMEOUT * 1000)
+    )
+
+
+def _make_gemini():
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        return None
+
+    from google import genai
+    from google.genai import types
+    return genai.Client(
+        api_key=api_key,
+        http_options=types.HttpOptions(timeout=int(LLM_HTTP_TIMEOUT * 1000))
+    )
+
+
+# ============================================================
+# PUBLIC API
+# ============================================================
+
+def gemini_config(timeout: Optional[float] = None):
+    """
+    Per-request config carrying a timeout (seconds) for google-genai
+    generate_content calls, or None to keep the client default.
+    """
+    if timeout is None:
+        return None
+
+    from google.genai import types
+    return types.GenerateContentConfig(
+        http_options=types.HttpOptions(timeout=max(1, int(timeout * 1000)))
+    )
+
+
+def get_openai_client():
+    return _get_or_create("openai", _make_openai)
+
+
+def get_groq_client():
+    return _get_or_create("groq", _make_groq)
+
+
+def get_mistral_client():
+    return _get_or_create("mistral", _make_mistral)
+
+
+def get_gemini_client():
+    return _get_or_create("gemini", _make_gemini)
+
+
+def close_all() -> None:
+    """
+    Closes pooled connections (tests / worker shutdown).
+    """
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+
+    for client in clients:
+        close = getattr(client, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception:
+                pass
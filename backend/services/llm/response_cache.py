@@ -0,0 +1,370 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+# ============================================================
+# LLM RESPONSE CACHE
+#
+# Content-addressed: key = sha256(provider, model, prompt, params)
+#
+# 1️⃣ In-process LRU  (hot tier, per worker)
+# 2️⃣ SQLite on disk  (shared across workers and restarts)
+#
+# Only raw completion text is cached; callers parse it as before.
+# ============================================================
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.join(BACKEND_DIR, "data", "llm_cache.sqlite3")
+)
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600)))    # seconds
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))  # disk tier
+LLM_CACHE_MEMORY_SIZE = int(os.getenv("LLM_CACHE_MEMORY_SIZE", "512"))    # LRU tier
+LLM_CACHE_RECOUNT_EVERY = 1000  # disk writes between exact row counts (other workers write too)
+
+
+def make_cache_key(
+    provider: str,
+    model: str,
+    prompt: str,
+    params: Optional[Dict] = None
+) -> str:
+    """
+    Stable key: same provider/model/prompt/params → same key.
+    """
+    payload = json.dumps(
+        {
+            "provider": provider,
+            "model": model,
+            "prompt": prompt,
+            "params": params or {}
+        },
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ============================================================
+# BACKENDS
+# ============================================================
+
+class MemoryLRUBackend:
+    """
+    Bounded in-process LRU with per-entry expiry.
+    """
+
+    def __init__(self, max_entries: int = LLM_CACHE_MEMORY_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[float]) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """
+    Single-file on-disk tier.
+
+    - Expired rows are dropped on read
+    - Least-recently-accessed rows are evicted past max_entries
+
+    The row count is tracked per write (recounted every
+    LLM_CACHE_RECOUNT_EVERY writes), so eviction only runs when the
+    table is over max_entries and only deletes the excess, oldest first
+    via the accessed_at index.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)"
+            )
+            self._rows = self._count_rows()
+        self._writes = 0
+
+    def _count_rows(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._rows -= 1
+                return None
+
+            self._conn.execute(
+                "UPDATE llm_cache SET accessed_at = ? WHERE key = ?",
+                (now, key)
+            )
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[float]) -> None:
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        with self._lock, self._conn:
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO llm_cache (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now)
+            ).rowcount
+            if not inserted:
+                self._conn.execute(
+                    "UPDATE llm_cache SET value = ?, expires_at = ?, accessed_at = ? WHERE key = ?",
+                    (value, expires_at, now, key)
+                )
+
+            self._writes += 1
+            if self._writes % LLM_CACHE_RECOUNT_EVERY == 0:
+                self._rows = self._count_rows()
+            else:
+                self._rows += inserted
+
+            excess = self._rows - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    """
+                    DELETE FROM llm_cache WHERE key IN (
+                        SELECT key FROM llm_cache
+                        ORDER BY accessed_at, rowid
+                        LIMIT ?
+                    )
+                    """,
+                    (excess,)
+                )
+                self._rows -= excess
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._rows = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+# ============================================================
+# TWO-TIER CACHE
+# ============================================================
+
+class ResponseCache:
+    """
+    LRU in front of an optional persistent backend, with hit/miss counters.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        memory_size: int = LLM_CACHE_MEMORY_SIZE,
+        ttl: Optional[float] = LLM_CACHE_TTL,
+        enabled: bool = True
+    ):
+        self.memory = MemoryLRUBackend(memory_size)
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0,
+            "calls": 0  # provider calls made by get_or_call (cache misses)
+        }
+
+    def _count(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self._counters[name] += 1
+
+    def get(
+        self,
+        provider: str,
+        model: str,
+        prompt: str,
+        params: Optional[Dict] = None
+    ) -> Optional[str]:
+        if not self.enabled:
+            return None
+
+        key = make_cache_key(provider, model, prompt, params)
+
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("hits", "memory_hits")
+            return value
+
+        if self.backend is not None:
+            try:
+                value = self.backend.get(key)
+            except Exception as e:
+                print("LLM cache read failed:", e)
+                value = None
+
+            if value is not None:
+                self.memory.set(key, value, self.ttl)
+                self._count("hits", "disk_hits")
+                return value
+
+        self._count("misses")
+        return None
+
+    def set(
+        self,
+        provider: str,
+        model: str,
+        prompt: str,
+        value: str,
+        params: Optional[Dict] = None
+    ) -> None:
+        if not self.enabled or value is None:
+            return
+
+        key = make_cache_key(provider, model, prompt, params)
+        self.memory.set(key, value, self.ttl)
+
+        if self.backend is not None:
+            try:
+                self.backend.set(key, value, self.ttl)
+            except Exception as e:
+                print("LLM cache write failed:", e)
+
+        self._count("writes")
+
+    def get_or_call(
+        self,
+        provider: str,
+        model: str,
+        prompt: str,
+        call: Callable[[], str],
+        params: Optional[Dict] = None,
+        validate: Optional[Callable[[str], bool]] = None,
+        use_cache: bool = True
+    ) -> str:
+        """
+        Returns the cached completion, or runs `call` and caches its result.
+
+        `validate` guards the write: responses that fail it (bad JSON,
+        answer mismatch, ...) are returned but never cached.
+
+        use_cache=False always calls (a fresh variant is wanted, e.g. new
+        question-bank MCQs) and leaves the cache untouched.
+        """
+        if not use_cache:
+            self._count("calls")
+            return call()
+
+        cached = self.get(provider, model, prompt, params)
+        if cached is not None:
+            return cached
+
+        self._count("calls")
+        value = call()
+
+        should_store = True
+        if validate is not None:
+            try:
+                should_store = bool(validate(value))
+            except Exception:
+                should_store = False
+
+        if should_store:
+            self.set(provider, model, prompt, value, params)
+
+        return value
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_rate"] = round(counters["hits"] / lookups, 3) if lookups else 0.0
+        counters["memory_entries"] = len(self.memory)
+        return counters
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.backend is not None:
+            self.backend.clear()
+
+
+def _build_default_cache() -> ResponseCache:
+    backend = None
+    if LLM_CACHE_ENABLED:
+        try:
+            backend = SQLiteCacheBackend(LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES)
+        except Exception as e:
+            print("LLM disk cache unavailable, using memory only:", e)
+
+    return ResponseCache(
+        backend=backend,
+        memory_size=LLM_CACHE_MEMORY_SIZE,
+        ttl=LLM_CACHE_TTL,
+        enabled=LLM_CACHE_ENABLED
+    )
+
+
+# Process-wide cache shared by summarizer, concept extractor and quiz generator
+llm_cache = _build_default_cache()
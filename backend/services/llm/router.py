@@ -0,0 +1,366 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+# ============================================================
+# LLM ROUTER
+#
+# Shared routing layer for the provider fallback chains
+# (summarizer: Gemini → GPT → Ollama, concepts: Groq → Mistral, ...).
+#
+# Per provider, over a rolling window of recent calls:
+# - latency p50 / p95 and error rate
+# - circuit breaker: closed → open (after consecutive failures or a
+#   high error rate) → half-open (one probe after the cooldown)
+#
+# Per call:
+# 1️⃣ order healthy providers by p50 (configured order breaks ties and
+#    is kept until a provider has enough samples)
+# 2️⃣ skip providers whose circuit is open — no timeout is paid
+# 3️⃣ hedge: if the running call exceeds its latency budget, fire the
+#    next provider too; the first acceptable answer wins
+#
+# Threads cannot be cancelled: an abandoned (hedged / timed-out) call
+# keeps its worker until the provider's own timeout ends it, so every
+# candidate must carry one. Hedges are only fired while at most half
+# of the workers are busy, leaving the rest for first attempts.
+# ============================================================
+
+LLM_ROUTER_WINDOW = int(os.getenv("LLM_ROUTER_WINDOW", "50"))            # calls kept per provider
+LLM_ROUTER_MIN_SAMPLES = int(os.getenv("LLM_ROUTER_MIN_SAMPLES", "5"))   # before latency reorders
+LLM_ROUTER_WORKERS = int(os.getenv("LLM_ROUTER_WORKERS", "32"))
+
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "3"))           # consecutive
+LLM_BREAKER_ERROR_RATE = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))   # over the window
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))        # seconds open
+
+# Hedge budget: p95 of the running provider, clamped to [min, default];
+# the default applies until there are enough samples. 0 disables hedging.
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "8"))
+LLM_HEDGE_MIN = float(os.getenv("LLM_HEDGE_MIN", "1"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class ProvidersExhausted(RuntimeError):
+    """
+    Every candidate failed, was rejected or had its circuit open.
+    """
+
+    def __init__(self, errors: Dict[str, str]):
+        self.errors = errors
+        super().__init__(
+            "; ".join(f"{name}: {error}" for name, error in errors.items())
+            or "no providers available"
+        )
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# ============================================================
+# PROVIDER HEALTH
+# ============================================================
+
+class ProviderHealth:
+    def __init__(
+        self,
+        window: int = LLM_ROUTER_WINDOW,
+        failure_threshold: int = LLM_BREAKER_FAILURES,
+        error_rate: float = LLM_BREAKER_ERROR_RATE,
+        cooldown: float = LLM_BREAKER_COOLDOWN,
+        min_samples: int = LLM_ROUTER_MIN_SAMPLES,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate
+        self.cooldown = cooldown
+        self.min_samples = min_samples
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=window)  # successful calls only
+        self._outcomes: deque = deque(maxlen=window)   # True = success
+        self._consecutive_failures = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self.clock() - self._opened_at >= self.cooldown:
+            return HALF_OPEN
+        return self._state
+
+    def acquire(self) -> bool:
+        """
+        True if a call may be sent now (claims the single half-open probe).
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._state == OPEN:
+                self._state = HALF_OPEN
+                return True
+            return False
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+            self._outcomes.append(True)
+            self._consecutive_failures = 0
+            self._state = CLOSED
+
+    def record_rejected(self) -> None:
+        """
+        The call worked but its result was rejected: neither a failure
+        nor a latency sample. A half-open probe is released so the next
+        call can probe again.
+        """
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._state = OPEN  # cooldown already elapsed → half-open
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._outcomes.append(False)
+            self._consecutive_failures += 1
+
+            if (
+                self._state == HALF_OPEN
+                or self._consecutive_failures >= self.failure_threshold
+                or (
+                    len(self._outcomes) >= self.min_samples
+                    and self._error_rate() >= self.error_rate_threshold
+                )
+            ):
+                self._state = OPEN
+                self._opened_at = self.clock()
+
+    def _error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def latency(self, q: float) -> Optional[float]:
+        """
+        Latency percentile, or None until there are enough samples.
+        """
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            return _percentile(list(self._latencies), q)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            latencies = list(self._latencies)
+            return {
+                "state": self._current_state(),
+                "calls": len(self._outcomes),
+                "error_rate": round(self._error_rate(), 3),
+                "p50": _percentile(latencies, 0.5),
+                "p95": _percentile(latencies, 0.95)
+            }
+
+
+# ============================================================
+# ROUTER
+# ============================================================
+
+class LLMRouter:
+    def __init__(
+        self,
+        hedge_after: float = LLM_HEDGE_AFTER,
+        hedge_min: float = LLM_HEDGE_MIN,
+        max_workers: int = LLM_ROUTER_WORKERS,
+        clock: Callable[[], float] = time.monotonic,
+        **health_options
+    ):
+        self.hedge_after = hedge_after
+        self.hedge_min = hedge_min
+        self.max_workers = max(1, max_workers)
+        self.clock = clock
+        self._health_options = dict(health_options, clock=clock)
+
+        self._providers: Dict[str, ProviderHealth] = {}
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="llm-router"
+        )
+
+    def health(self, name: str) -> ProviderHealth:
+        with self._lock:
+            health = self._providers.get(name)
+            if health is None:
+                health = self._providers[name] = ProviderHealth(**self._health_options)
+            return health
+
+    def order(self, names: List[str]) -> List[str]:
+        """
+        Closed circuits first. Providers with enough samples swap places
+        among themselves by p50 (fastest first); providers without keep
+        their configured position.
+        """
+        rank = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+        p50s = {name: self.health(name).latency(0.5) for name in names}
+
+        sampled = [i for i, name in enumerate(names) if p50s[name] is not None]
+        by_latency = sorted(sampled, key=lambda i: (p50s[names[i]], i))
+        positioned = list(names)
+        for position, i in zip(sampled, by_latency):
+            positioned[position] = names[i]
+
+        return sorted(positioned, key=lambda name: rank[self.health(name).state])
+
+    def hedge_budget(self, name: str) -> Optional[float]:
+        if self.hedge_after <= 0:
+            return None
+        p95 = self.health(name).latency(0.95)
+        if p95 is None:
+            return self.hedge_after
+        return min(self.hedge_after, max(self.hedge_min, p95))
+
+    def _timed(self, name: str, fn: Callable, accept: Optional[Callable]) -> Tuple[bool, object]:
+        """
+        Runs one call and records its outcome (also when the caller has
+        stopped waiting). Returns (accepted, result).
+        """
+        health = self.health(name)
+        started = self.clock()
+        try:
+            result = fn()
+        except Exception:
+            health.record_failure()
+            raise
+
+        if accept is not None and not accept(result):
+            health.record_rejected()
+            return False, result
+
+        health.record_success(self.clock() - started)
+        return True, result
+
+    def _submit(self, name: str, fn: Callable, accept: Optional[Callable]):
+        with self._lock:
+            self._in_flight += 1
+        future = self._executor.submit(self._timed, name, fn, accept)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, _future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def record(self, name: str, started: float, success: Optional[bool]) -> None:
+        """
+        Outcome of a call made outside call() (e.g. a stream) after
+        health(name).acquire(): True, False (failure) or None (no usable
+        result, or abandoned by the caller).
+        """
+        health = self.health(name)
+        if success is None:
+            health.record_rejected()
+        elif success:
+            health.record_success(self.clock() - started)
+        else:
+            health.record_failure()
+
+    def can_hedge(self) -> bool:
+        """
+        False once half of the workers are busy (abandoned calls included).
+        """
+        with self._lock:
+            return self._in_flight < max(1, self.max_workers // 2)
+
+    def call(
+        self,
+        candidates: List[Tuple[str, Callable]],
+        accept: Optional[Callable] = None,
+        timeout: Optional[float] = None
+    ) -> Tuple[str, object]:
+        """
+        Runs candidates [(provider, fn)] with routing + hedging.
+
+        Returns (provider, result) for the first result accepted by
+        accept(result) (default: any). A rejected result neither counts
+        against the provider's health nor as a latency sample. Raises
+        ProvidersExhausted.
+
+        timeout bounds the whole call; calls still running keep going in
+        the background (until their own timeout) and are recorded when
+        they finish.
+        """
+        calls = dict(candidates)
+        queue = self.order([name for name, _ in candidates])
+        errors: Dict[str, str] = {}
+        pending: Dict = {}
+        deadline = None if timeout is None else self.clock() + timeout
+
+        def launch() -> Optional[str]:
+            while queue:
+                name = queue.pop(0)
+                if self.health(name).acquire():
+                    pending[self._submit(name, calls[name], accept)] = name
+                    return name
+                errors[name] = "circuit open"
+            return None
+
+        running = launch()
+        while pending:
+            wait_for = self.hedge_budget(running) if queue else None
+            if deadline is not None:
+                remaining = max(0.0, deadline - self.clock())
+                wait_for = remaining if wait_for is None else min(wait_for, remaining)
+
+            done, _ = wait(list(pending), timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            if not done:
+                if deadline is not None and self.clock() >= deadline:
+                    for future, name in pending.items():
+                        future.cancel()  # only helps if it has not started yet
+                        errors[name] = "timed out"
+                    break
+                # 🔀 hedge: the running call is over budget (and workers are free)
+                if self.can_hedge():
+                    running = launch() or running
+                continue
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    accepted, result = future.result()
+                except Exception as e:
+                    print(f"[LLM ROUTER] {name} failed:", e)
+                    errors[name] = str(e) or type(e).__name__
+                    continue
+
+                if accepted:
+                    return name, result
+                errors[name] = "rejected"
+
+            if not pending:
+                running = launch()
+
+        raise ProvidersExhausted(errors)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            providers = dict(self._providers)
+        return {name: health.snapshot() for name, health in providers.items()}
+
+
+# Process-wide router shared by the summarizer and quiz generator
+llm_router = LLMRouter()
@@ -0,0 +1,349 @@
+import os
+import random
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+# ============================================================
+# QUESTION BANK
+#
+# Validated MCQs are kept per (document fingerprint, concept, difficulty)
+# and reused across users studying the same document:
+#
+# 1️⃣ draw     — serve stored MCQs, never one a user has already seen
+# 2️⃣ top up   — the caller generates only the slots the bank missed
+# 3️⃣ refill   — slots running low are regenerated in the background
+#
+# Template fallbacks are never stored (quality flag `validated`).
+#
+# Backends:
+# - db      question_bank / question_bank_served tables (default with DATABASE_URL)
+# - memory  per-process dicts, bounded (development / tests)
+# - off     bank disabled
+# ============================================================
+
+QUESTION_BANK_BACKEND = os.getenv(
+    "QUESTION_BANK_BACKEND",
+    "db" if os.getenv("DATABASE_URL") else "memory"
+).lower()
+
+# Unseen variants per slot below which a background refill is queued
+QUESTION_BANK_REFILL_MIN = int(os.getenv("QUESTION_BANK_REFILL_MIN", "1"))
+
+# Memory store bounds: oldest questions per document, least recently
+# used documents and (user, document) served sets are evicted
+QUESTION_BANK_MEMORY_PER_DOC = int(os.getenv("QUESTION_BANK_MEMORY_PER_DOC", "500"))
+QUESTION_BANK_MEMORY_DOCS = int(os.getenv("QUESTION_BANK_MEMORY_DOCS", "1000"))
+QUESTION_BANK_MEMORY_SERVED = int(os.getenv("QUESTION_BANK_MEMORY_SERVED", "10000"))
+
+BANKABLE_SOURCES = {"llm_batch", "llm_single"}
+
+Slot = Tuple[str, str]  # (concept, difficulty)
+
+
+def _slot_key(concept: str, difficulty: str) -> Tuple[str, str]:
+    return concept.strip().lower(), difficulty
+
+
+def _question_key(mcq: Dict) -> str:
+    return " ".join(str(mcq.get("question", "")).lower().split())
+
+
+# ============================================================
+# STORES
+# ============================================================
+
+class MemoryQuestionStore:
+    """
+    Bounded per-process store:
+
+    - at most max_per_doc questions per document (oldest evicted first)
+    - at most max_docs documents (least recently used evicted)
+    - at most max_served (user, document) served sets (LRU), each keeping
+      its max_per_doc most recently served ids
+    """
+
+    def __init__(
+        self,
+        max_per_doc: int = QUESTION_BANK_MEMORY_PER_DOC,
+        max_docs: int = QUESTION_BANK_MEMORY_DOCS,
+        max_served: int = QUESTION_BANK_MEMORY_SERVED
+    ):
+        self.max_per_doc = max(1, max_per_doc)
+        self.max_docs = max(1, max_docs)
+        self.max_served = max(1, max_served)
+
+        self._lock = threading.Lock()
+        self._questions: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._served: "OrderedDict[Tuple[str, str], Dict[str, None]]" = OrderedDict()  # ordered sets
+
+    def questions(self, doc_fingerprint: str) -> List[Dict]:
+        with self._lock:
+            if doc_fingerprint not in self._questions:
+                return []
+            self._questions.move_to_end(doc_fingerprint)
+            return list(self._questions[doc_fingerprint])
+
+    def add(self, doc_fingerprint: str, items: List[Dict]) -> List[str]:
+        with self._lock:
+            stored = self._questions.setdefault(doc_fingerprint, [])
+            self._questions.move_to_end(doc_fingerprint)
+
+            ids = []
+            for item in items:
+                ids.append(str(uuid.uuid4()))
+                stored.append({"id": ids[-1], **item})
+
+            del stored[:-self.max_per_doc]
+            while len(self._questions) > self.max_docs:
+                self._questions.popitem(last=False)
+            return ids
+
+    def served_ids(self, user_id: str, doc_fingerprint: str) -> Set[str]:
+        with self._lock:
+            return set(self._served.get((user_id, doc_fingerprint), ()))
+
+    def mark_served(self, user_id: str, doc_fingerprint: str, question_ids: List[str]) -> None:
+        key = (user_id, doc_fingerprint)
+        with self._lock:
+            served = self._served.setdefault(key, {})
+            self._served.move_to_end(key)
+
+            for question_id in question_ids:
+                served.pop(question_id, None)
+                served[question_id] = None
+
+            for stale in list(served)[:-self.max_per_doc]:
+                del served[stale]
+            while len(self._served) > self.max_served:
+                self._served.popitem(last=False)
+
+
+class DatabaseQuestionStore:
+    """
+    question_bank tables through db.crud (SQLAlchemy is imported lazily).
+    """
+
+    def _session(self):
+        from db.session import SessionLocal
+        return SessionLocal()
+
+    def questions(self, doc_fingerprint: str) -> List[Dict]:
+        from db.crud import get_bank_questions
+
+        db = self._session()
+        try:
+            return [
+                {
+                    "id": str(row.id),
+                    "concept": row.concept,
+                    "difficulty": row.difficulty,
+                    "mcq": row.mcq_payload,
+                    "source": row.source,
+                    "validated": row.validated
+                }
+                for row in get_bank_questions(db, doc_fingerprint)
+            ]
+        finally:
+            db.close()
+
+    def add(self, doc_fingerprint: str, items: List[Dict]) -> List[str]:
+        from db.crud import add_bank_questions
+
+        db = self._session()
+        try:
+            rows = add_bank_questions(db, [
+                {
+                    "doc_fingerprint": doc_fingerprint,
+                    "concept": item["concept"],
+                    "difficulty": item["difficulty"],
+                    "mcq_payload": item["mcq"],
+                    "source": item["source"],
+                    "validated": item["validated"]
+                }
+                for item in items
+            ])
+            return [str(row.id) for row in rows]
+        finally:
+            db.close()
+
+    def served_ids(self, user_id: str, doc_fingerprint: str) -> Set[str]:
+        from db.crud import get_served_question_ids
+
+        db = self._session()
+        try:
+            return get_served_question_ids(db, user_id, doc_fingerprint)
+        finally:
+            db.close()
+
+    def mark_served(self, user_id: str, doc_fingerprint: str, question_ids: List[str]) -> None:
+        from db.crud import mark_questions_served
+
+        db = self._session()
+        try:
+            mark_questions_served(
+                db, user_id, doc_fingerprint, [uuid.UUID(q) for q in question_ids]
+            )
+        finally:
+            db.close()
+
+
+# ============================================================
+# BANK
+# ============================================================
+
+class QuestionBank:
+    def __init__(self, store):
+        self.store = store
+        self._refilling: Set[str] = set()
+        self._refill_lock = threading.Lock()
+
+    def draw(
+        self,
+        doc_fingerprint: str,
+        slots: List[Slot],
+        user_id: Optional[str] = None
+    ) -> Tuple[List[Optional[Dict]], List[Slot]]:
+        """
+        Fills slots from the bank.
+
+        Returns a list aligned with `slots` (None where the bank had no
+        unseen MCQ) and the slots whose unseen pool is now running low.
+        """
+        served = self.store.served_ids(user_id, doc_fingerprint) if user_id else set()
+
+        pools: Dict[Tuple[str, str], List[Dict]] = {}
+        for item in self.store.questions(doc_fingerprint):
+            if item.get("validated") and item["id"] not in served:
+                pools.setdefault(_slot_key(item["concept"], item["difficulty"]), []).append(item)
+
+        drawn: List[Optional[Dict]] = []
+        for concept, difficulty in slots:
+            pool = pools.get(_slot_key(concept, difficulty))
+            if not pool:
+                drawn.append(None)
+                continue
+
+            item = pool.pop(random.randrange(len(pool)))
+            mcq = dict(item["mcq"])
+            mcq["options"] = random.sample(mcq["options"], len(mcq["options"]))
+            mcq["bank_id"] = item["id"]
+            mcq["source"] = "bank"
+            drawn.append(mcq)
+
+        # Only slots the bank could serve; misses are topped up (and
+        # stored) by the caller right away
+        low = [
+            slot for slot in dict.fromkeys(
+                slot for slot, mcq in zip(slots, drawn) if mcq is not None
+            )
+            if len(pools.get(_slot_key(*slot), [])) < QUESTION_BANK_REFILL_MIN
+        ]
+
+        return drawn, low
+
+    def add(self, doc_fingerprint: str, generated: List[Tuple[str, str, Dict]]) -> int:
+        """
+        Stores validated LLM MCQs; template fallbacks are skipped, and so
+        are questions the document's bank already holds (same text).
+
+        MCQs get their `bank_id` set in place (the existing one for a
+        duplicate), so they can be marked as served to the user who
+        received them.
+        """
+        candidates = [
+            (concept, difficulty, mcq)
+            for concept, difficulty, mcq in generated
+            if mcq and mcq.get("source") in BANKABLE_SOURCES
+        ]
+        if not candidates:
+            return 0
+
+        known = {
+            _question_key(item["mcq"]): item["id"]
+            for item in self.store.questions(doc_fingerprint)
+        }
+        bankable = []
+        for concept, difficulty, mcq in candidates:
+            key = _question_key(mcq)
+            if key in known:
+                if known[key]:
+                    mcq["bank_id"] = known[key]
+                continue
+            known[key] = None  # repeated within this batch: store once
+            bankable.append((concept, difficulty, mcq))
+        if not bankable:
+            return 0
+
+        ids = self.store.add(doc_fingerprint, [
+            {
+                "concept": concept,
+                "difficulty": difficulty,
+                "mcq": {k: v for k, v in mcq.items() if k not in ("bank_id", "source")},
+                "source": mcq["source"],
+                "validated": True
+            }
+            for concept, difficulty, mcq in bankable
+        ])
+        for (_, _, mcq), bank_id in zip(bankable, ids):
+            mcq["bank_id"] = bank_id
+        return len(bankable)
+
+    def mark_served(self, user_id: Optional[str], doc_fingerprint: str, mcqs: List[Dict]) -> None:
+        ids = [mcq["bank_id"] for mcq in mcqs if mcq and mcq.get("bank_id")]
+        if user_id and ids:
+            self.store.mark_served(user_id, doc_fingerprint, ids)
+
+    def schedule_refill(
+        self,
+        doc_fingerprint: str,
+        slots: List[Slot],
+        generate: Callable[[List[Slot]], List[Dict]],
+        submit: Callable
+    ) -> bool:
+        """
+        Queues one background refill per document (skipped if one is running).
+
+        generate(slots) must return MCQs aligned with slots.
+        """
+        if not slots:
+            return False
+
+        with self._refill_lock:
+            if doc_fingerprint in self._refilling:
+                return False
+            self._refilling.add(doc_fingerprint)
+
+        def refill():
+            try:
+                mcqs = generate(slots)
+                return self.add(doc_fingerprint, [
+                    (concept, difficulty, mcq)
+                    for (concept, difficulty), mcq in zip(slots, mcqs)
+                ])
+            finally:
+                with self._refill_lock:
+                    self._refilling.discard(doc_fingerprint)
+
+        try:
+            submit(refill)
+        except Exception:
+            with self._refill_lock:
+                self._refilling.discard(doc_fingerprint)
+            raise
+        return True
+
+
+def _make_store():
+    if QUESTION_BANK_BACKEND == "off":
+        return None
+    if QUESTION_BANK_BACKEND == "db":
+        return DatabaseQuestionStore()
+    return MemoryQuestionStore()
+
+
+_store = _make_store()
+
+# Process-wide bank used by the quiz generator (None when disabled)
+question_bank = QuestionBank(_store) if _store is not None else None
@@ -2,25 +2,173 @@ import os
 import json
 import random
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Tuple
 from dotenv import load_dotenv
 
-# ---------- LLM CLIENTS ----------
-from openai import OpenAI          # Used for Groq (OpenAI-compatible)
-from mistralai import Mistral      # Secondary fallback
+from services.llm.ollama_client import OLLAMA_MODEL, ollama, ollama_complete
+from services.llm.providers import get_groq_client, get_mistral_client
+from services.llm.response_cache import llm_cache
+from services.llm.router import ProvidersExhausted, llm_router
+from services.question_bank import QuestionBank, question_bank
+from services.quiz_jobs import refill_jobs
+from utils.deadline import Deadline, call_timeout, is_expired
+from utils.doc_fingerprint import generate_doc_id
 
 load_dotenv()
 
-# Groq (PRIMARY)
-groq_client = OpenAI(
-    base_url="https://api.groq.com/openai/v1",
-    api_key=os.getenv("GROQ_API_KEY")
-)
+# ---------- LLM CLIENTS ----------
+# Groq (PRIMARY) and Mistral (SECONDARY) come from the shared provider
+# registry; both are None when their API key is not configured.
+# Ollama (LOCAL / OFFLINE) goes through the async client when
+# OLLAMA_URL and OLLAMA_MODEL are set.
+
+# ---------- CONCURRENCY ----------
+# Upper bound on MCQ calls fanned out per quiz, and on calls in flight
+# against a single provider across all concurrent quizzes.
+MCQ_MAX_WORKERS = int(os.getenv("MCQ_MAX_WORKERS", "8"))
+GROQ_MAX_IN_FLIGHT = int(os.getenv("GROQ_MAX_IN_FLIGHT", "4"))
+
+_provider_slots = {
+    "groq": threading.BoundedSemaphore(GROQ_MAX_IN_FLIGHT)
+}
+
+# ---------- LLM CALL STATS ----------
+class LLMCallStats:
+    """
+    Thread-safe call / token counters reported in the quiz meta block.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def record(self, response) -> None:
+        usage = getattr(response, "usage", None)
+        with self._lock:
+            self.calls += 1
+            if usage is not None:
+                self.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+                self.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+
+    def as_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.prompt_tokens + self.completion_tokens
+            }
+
+
+# ---------- CACHED COMPLETIONS ----------
+GROQ_MODEL = "llama-3.3-70b-versatile"
+MISTRAL_MODEL = "mistral-small-latest"
+
+
+def _parses_as_json(content: str) -> bool:
+    json.loads(content)
+    return True
+
+
+def _groq_json_completion(
+    prompt: str,
+    temperature: float,
+    stats: LLMCallStats | None = None,
+    validate=_parses_as_json,
+    timeout: float | None = None,
+    use_cache: bool = True
+) -> str:
+    def call() -> str:
+        groq_client = get_groq_client()
+        if groq_client is None:
+            raise RuntimeError("Groq client not configured")
+
+        # Waiting for a slot counts against the same timeout
+        if not _provider_slots["groq"].acquire(timeout=timeout):
+            raise TimeoutError("no Groq slot within the timeout")
+        try:
+            response = groq_client.chat.completions.create(
+                model=GROQ_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+                response_format={"type": "json_object"},
+                **({"timeout": timeout} if timeout is not None else {})
+            )
+        finally:
+            _provider_slots["groq"].release()
+        if stats is not None:
+            stats.record(response)
+        return response.choices[0].message.content
+
+    return llm_cache.get_or_call(
+        "groq", GROQ_MODEL, prompt, call,
+        params={"temperature": temperature, "response_format": "json_object"},
+        validate=validate,
+        use_cache=use_cache
+    )
+
+
+def _mistral_completion(
+    prompt: str,
+    temperature: float,
+    stats: LLMCallStats | None = None,
+    json_mode: bool = False,
+    validate=_parses_as_json,
+    timeout: float | None = None,
+    use_cache: bool = True
+) -> str:
+    def call() -> str:
+        mistral_client = get_mistral_client()
+        if mistral_client is None:
+            raise RuntimeError("Mistral client not configured")
+
+        kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+        if timeout is not None:
+            kwargs["timeout_ms"] = int(timeout * 1000)
+        response = mistral_client.chat.complete(
+            model=MISTRAL_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            **kwargs
+        )
+        if stats is not None:
+            stats.record(response)
+        return response.choices[0].message.content
+
+    return llm_cache.get_or_call(
+        "mistral", MISTRAL_MODEL, prompt, call,
+        params={"temperature": temperature, "json_mode": json_mode},
+        validate=validate,
+        use_cache=use_cache
+    )
+
+
+def _ollama_json_completion(
+    prompt: str,
+    temperature: float,
+    validate=_parses_as_json,
+    timeout: float | None = None,
+    use_cache: bool = True
+) -> str:
+    def call() -> str:
+        return ollama_complete(
+            prompt,
+            timeout=timeout,
+            format="json",
+            options={"temperature": temperature}
+        )
+
+    return llm_cache.get_or_call(
+        "ollama", OLLAMA_MODEL, prompt, call,
+        params={"temperature": temperature, "format": "json"},
+        validate=validate,
+        use_cache=use_cache
+    )
 
-# Mistral (SECONDARY)
-mistral_client = Mistral(
-    api_key=os.getenv("MISTRAL_API_KEY")
-)
 
 # ---------- SHARED CLEANING ----------
 GENERIC_TERMS = {
@@ -42,7 +190,7 @@ def clean_concepts(concepts: List[str]) -> List[str]:
 
 
 # ---------- CONCEPT EXTRACTION (PRIMARY: GROQ) ----------
-def extract_concepts_groq(summary: str) -> List[str]:
+def extract_concepts_groq(summary: str, timeout: float | None = None) -> List[str]:
     prompt = f"""
 Extract academic concepts for assessment generation.
 
@@ -61,19 +209,12 @@ Format:
 Text:
 {summary}
 """
-    response = groq_client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0,
-        response_format={"type": "json_object"}
-    )
-
-    data = json.loads(response.choices[0].message.content)
+    data = json.loads(_groq_json_completion(prompt, temperature=0, timeout=timeout))
     return data.get("concepts", [])
 
 
 # ---------- CONCEPT EXTRACTION (SECONDARY: MISTRAL) ----------
-def extract_concepts_mistral(summary: str) -> List[str]:
+def extract_concepts_mistral(summary: str, timeout: float | None = None) -> List[str]:
     prompt = f"""
 Extract academic concepts for assessment generation.
 
@@ -90,13 +231,29 @@ Format:
 Text:
 {summary}
 """
-    response = mistral_client.chat.complete(
-        model="mistral-small-latest",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0
-    )
+    data = json.loads(_mistral_completion(prompt, temperature=0, timeout=timeout))
+    return data.get("concepts", [])
+
+
+# ---------- CONCEPT EXTRACTION (LOCAL: OLLAMA) ----------
+def extract_concepts_ollama(summary: str, timeout: float | None = None) -> List[str]:
+    prompt = f"""
+Extract academic concepts for assessment generation.
+
+Rules:
+- Concepts must appear in text
+- Canonical textbook terms
+- 1–3 words
+- No generic terms
+- JSON ONLY
+
+Format:
+{{ "concepts": [] }}
 
-    data = json.loads(response.choices[0].message.content)
+Text:
+{summary}
+"""
+    data = json.loads(_ollama_json_completion(prompt, temperature=0, timeout=timeout))
     return data.get("concepts", [])
 
 
@@ -114,23 +271,35 @@ def extract_noun_phrases(summary: str) -> List[str]:
 
 
 # ---------- ADAPTIVE CONCEPT EXTRACTION ----------
-def get_concepts_adaptive(summary: str, max_concepts: int = 8) -> List[str]:
+def get_concepts_adaptive(
+    summary: str,
+    max_concepts: int = 8,
+    deadline: Deadline | None = None
+) -> List[str]:
     """
-    Provider-agnostic, resilient extraction.
+    Provider-agnostic, resilient extraction (Groq / Mistral / Ollama through
+    the LLM router, then noun phrases — directly once the deadline is spent).
     """
-    extractors = [
-        extract_concepts_groq,
-        extract_concepts_mistral
-    ]
 
-    for extractor in extractors:
-        try:
-            concepts = extractor(summary)
-            concepts = clean_concepts(concepts)
-            if len(concepts) >= 3:
-                return concepts[:max_concepts]
-        except Exception as e:
-            print(f"[Extractor failed: {extractor.__name__}] {e}")
+    extractors = []
+    if get_groq_client():
+        extractors.append(("groq", lambda: extract_concepts_groq(summary, call_timeout(deadline))))
+    if get_mistral_client():
+        extractors.append(("mistral", lambda: extract_concepts_mistral(summary, call_timeout(deadline))))
+    if ollama.configured:
+        extractors.append(("ollama", lambda: extract_concepts_ollama(summary, call_timeout(deadline))))
+    if is_expired(deadline):
+        extractors = []
+
+    try:
+        _, concepts = llm_router.call(
+            extractors,
+            accept=lambda found: len(clean_concepts(found)) >= 3,
+            timeout=call_timeout(deadline)
+        )
+        return clean_concepts(concepts)[:max_concepts]
+    except ProvidersExhausted as e:
+        print(f"[Extractors failed] {e}")
 
     # FINAL fallback
     concepts = clean_concepts(extract_noun_phrases(summary))
@@ -180,19 +349,58 @@ def partition_concepts(
 
 
 # ---------- MCQ GENERATION (GROQ) ----------
-def llm_generate_mcq(concept: str, difficulty: str, summary: str) -> Dict:
-    difficulty_focus = {
-        "beginner": "definition or recognition",
-        "intermediate": "usage or relationship",
-        "advanced": "edge case or limitation"
+DIFFICULTY_FOCUS = {
+    "beginner": "definition or recognition",
+    "intermediate": "usage or relationship",
+    "advanced": "edge case or limitation"
+}
+
+
+def _is_valid_mcq(mcq: Dict, concept: str) -> bool:
+    """Answer must equal the concept and appear among the options."""
+    if not isinstance(mcq, dict) or mcq.get("answer") != concept:
+        return False
+    options = mcq.get("options")
+    return isinstance(options, list) and concept in options
+
+
+def _finalize_mcq(mcq: Dict, concept: str, difficulty: str, source: str) -> Dict:
+    random.shuffle(mcq["options"])
+    mcq["difficulty"] = difficulty
+    mcq["answer"] = concept
+    mcq["source"] = source  # llm_single | llm_batch | template (quality flag)
+    return mcq
+
+
+def _template_mcq(concept: str, difficulty: str) -> Dict:
+    opts = [concept, "Option A", "Option B", "Option C"]
+    random.shuffle(opts)
+    return {
+        "question": f"What best describes {concept}?",
+        "options": opts,
+        "answer": concept,
+        "difficulty": difficulty,
+        "source": "template"
     }
 
+
+def llm_generate_mcq(
+    concept: str,
+    difficulty: str,
+    summary: str,
+    stats: LLMCallStats | None = None,
+    deadline: Deadline | None = None,
+    use_cache: bool = True
+) -> Dict:
+    if is_expired(deadline):
+        return _template_mcq(concept, difficulty)
+
     prompt = f"""
 You are an expert educator writing MCQs.
 
 Rules:
 - Topic MUST be exactly: {concept}
-- Difficulty: {difficulty} ({difficulty_focus[difficulty]})
+- Difficulty: {difficulty} ({DIFFICULTY_FOCUS[difficulty]})
 - Correct answer MUST be exactly "{concept}"
 - 3 plausible distractors
 - Same grammatical form
@@ -206,48 +414,342 @@ Context:
 """
 
     try:
-        response = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
+        content = _groq_json_completion(
+            prompt,
             temperature=0.25,
-            response_format={"type": "json_object"}
+            stats=stats,
+            validate=lambda c: _is_valid_mcq(json.loads(c), concept),
+            timeout=call_timeout(deadline),
+            use_cache=use_cache
         )
 
-        mcq = json.loads(response.choices[0].message.content)
+        mcq = json.loads(content)
 
         if mcq.get("answer") != concept:
             raise ValueError("Answer mismatch")
 
-        random.shuffle(mcq["options"])
-        mcq["difficulty"] = difficulty
-        mcq["answer"] = concept
-        return mcq
+        return _finalize_mcq(mcq, concept, difficulty, "llm_single")
 
     except Exception as e:
         print(f"[MCQ FALLBACK] {concept} → {e}")
-        opts = [concept, "Option A", "Option B", "Option C"]
-        random.shuffle(opts)
-        return {
-            "question": f"What best describes {concept}?",
-            "options": opts,
-            "answer": concept,
-            "difficulty": difficulty
-        }
+        return _template_mcq(concept, difficulty)
+
+
+# ---------- BATCHED MCQ GENERATION (GROQ → MISTRAL → OLLAMA) ----------
+def _batch_mcq_prompt(concepts: List[str], difficulty: str, summary: str) -> str:
+    topics = "\n".join(f"{idx}. {c}" for idx, c in enumerate(concepts))
+    return f"""
+You are an expert educator writing MCQs.
+
+Write exactly one MCQ per numbered topic below, in the same order.
+
+Rules:
+- Difficulty: {difficulty} ({DIFFICULTY_FOCUS[difficulty]})
+- For each item, the correct answer MUST be exactly the topic text
+- The options MUST include the topic text plus 3 plausible distractors
+- Same grammatical form
+- JSON ONLY
+
+Topics:
+{topics}
+
+Format:
+{{"questions":[{{"index":0,"question":"","options":["<topic>","d1","d2","d3"],"answer":"<topic>"}}]}}
+
+Context:
+{summary[:800]}
+"""
+
+
+def _batch_mcq_groq(
+    prompt: str,
+    stats: LLMCallStats | None,
+    timeout: float | None = None,
+    use_cache: bool = True
+) -> List[Dict]:
+    content = _groq_json_completion(
+        prompt, temperature=0.25, stats=stats, timeout=timeout, use_cache=use_cache
+    )
+    return json.loads(content).get("questions", [])
+
+
+def _batch_mcq_mistral(
+    prompt: str,
+    stats: LLMCallStats | None,
+    timeout: float | None = None,
+    use_cache: bool = True
+) -> List[Dict]:
+    content = _mistral_completion(
+        prompt, temperature=0.25, stats=stats, json_mode=True, timeout=timeout,
+        use_cache=use_cache
+    )
+    return json.loads(content).get("questions", [])
+
+
+def _batch_mcq_ollama(
+    prompt: str,
+    stats: LLMCallStats | None,
+    timeout: float | None = None,
+    use_cache: bool = True
+) -> List[Dict]:
+    content = _ollama_json_completion(
+        prompt, temperature=0.25, timeout=timeout, use_cache=use_cache
+    )
+    return json.loads(content).get("questions", [])
+
+
+def _batch_generators() -> List:
+    generators = [_batch_mcq_groq, _batch_mcq_mistral]
+    if ollama.configured:
+        generators.append(_batch_mcq_ollama)
+    return generators
+
+
+def llm_generate_mcq_batch(
+    concepts: List[str],
+    difficulty: str,
+    summary: str,
+    stats: LLMCallStats | None = None,
+    deadline: Deadline | None = None,
+    use_cache: bool = True
+) -> List[Dict | None]:
+    """
+    Generates all MCQs of one level in a single request.
+
+    Returns a list aligned with `concepts`; items that failed validation
+    (or were missing from the response) are None so the caller can retry
+    them one by one.
+    """
+    if not concepts:
+        return []
+
+    prompt = _batch_mcq_prompt(concepts, difficulty, summary)
+
+    items: List[Dict] = []
+    for generator in _batch_generators():
+        if is_expired(deadline):
+            break
+        try:
+            items = generator(
+                prompt, stats, call_timeout(deadline), use_cache
+            )
+            break
+        except Exception as e:
+            print(f"[MCQ BATCH FAILED: {generator.__name__}] {difficulty} → {e}")
+
+    by_index = {}
+    for position, item in enumerate(items if isinstance(items, list) else []):
+        if not isinstance(item, dict):
+            continue
+        index = item.get("index", position)
+        if isinstance(index, int) and 0 <= index < len(concepts):
+            by_index.setdefault(index, item)
+
+    results: List[Dict | None] = []
+    for index, concept in enumerate(concepts):
+        item = by_index.get(index)
+        if item is not None and _is_valid_mcq(item, concept):
+            mcq = {
+                "question": item.get("question", ""),
+                "options": list(item["options"])
+            }
+            results.append(_finalize_mcq(mcq, concept, difficulty, "llm_batch"))
+        else:
+            results.append(None)
+
+    return results
+
+
+# ---------- CONCURRENT GENERATION ----------
+MCQ_BATCH_MODE = os.getenv("MCQ_BATCH_MODE", "true").lower() == "true"
+
+
+def generate_mcqs_concurrently(
+    slots: List[Tuple[str, str]],
+    summary: str,
+    max_workers: int = MCQ_MAX_WORKERS,
+    stats: LLMCallStats | None = None,
+    deadline: Deadline | None = None,
+    use_cache: bool = True
+) -> List[Dict]:
+    """
+    Fans out one MCQ call per (concept, difficulty) slot.
+
+    - Results come back in slot order, regardless of completion order
+    - Per-question fallback is handled inside llm_generate_mcq
+    """
+    if not slots:
+        return []
+
+    workers = max(1, min(max_workers, len(slots)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(
+            lambda slot: llm_generate_mcq(slot[0], slot[1], summary, stats, deadline, use_cache),
+            slots
+        ))
+
+
+def generate_mcqs_batched(
+    levels: Dict[str, List[str]],
+    summary: str,
+    stats: LLMCallStats | None = None,
+    deadline: Deadline | None = None,
+    use_cache: bool = True
+) -> Tuple[Dict[str, List[Dict]], int]:
+    """
+    One batched request per level (levels run concurrently), then
+    single-question calls only for the items that failed validation.
+
+    Returns the quiz levels and the number of single-call retries.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, len(levels))) as executor:
+        batches = dict(zip(levels, executor.map(
+            lambda level: llm_generate_mcq_batch(
+                levels[level], level, summary, stats, deadline, use_cache
+            ),
+            levels
+        )))
+
+    retry_slots = [
+        (concept, level)
+        for level, concepts in levels.items()
+        for concept, mcq in zip(concepts, batches[level])
+        if mcq is None
+    ]
+    retried = iter(generate_mcqs_concurrently(
+        retry_slots, summary, stats=stats, deadline=deadline, use_cache=use_cache
+    ))
+
+    quiz = {
+        level: [
+            mcq if mcq is not None else next(retried)
+            for mcq in batches[level]
+        ]
+        for level in levels
+    }
+    return quiz, len(retry_slots)
+
+
+# ---------- SLOT GENERATION ----------
+def generate_mcqs_for_slots(
+    slots: List[Tuple[str, str]],
+    summary: str,
+    batch: bool = MCQ_BATCH_MODE,
+    stats: LLMCallStats | None = None,
+    deadline: Deadline | None = None,
+    use_cache: bool = True
+) -> Tuple[List[Dict], int]:
+    """
+    MCQs aligned with (concept, difficulty) slots, plus single-call retries.
+
+    use_cache=False asks the providers for fresh MCQs: the question bank
+    needs new variants, not a replay of the prompt's cached response.
+    """
+    if not slots:
+        return [], 0
+
+    if not batch:
+        return generate_mcqs_concurrently(
+            slots, summary, stats=stats, deadline=deadline, use_cache=use_cache
+        ), 0
+
+    levels: Dict[str, List[str]] = {}
+    for concept, level in slots:
+        levels.setdefault(level, []).append(concept)
+
+    quiz, retried = generate_mcqs_batched(levels, summary, stats, deadline, use_cache)
+    by_level = {level: iter(mcqs) for level, mcqs in quiz.items()}
+    return [next(by_level[level]) for _, level in slots], retried
+
+
+def _bank_safe(fn, *args, default=None):
+    """Question bank problems never fail quiz generation."""
+    try:
+        return fn(*args)
+    except Exception as e:
+        print(f"[QUESTION BANK] {getattr(fn, '__name__', fn)} failed → {e}")
+        return default
 
 
 # ---------- PUBLIC API ----------
-def generate_quiz_from_summary(summary: str, mode: str = "conceptual") -> Dict:
+def generate_quiz_from_summary(
+    summary: str,
+    mode: str = "conceptual",
+    batch: bool = MCQ_BATCH_MODE,
+    user_id: str | None = None,
+    bank: QuestionBank | None = question_bank,
+    deadline: Deadline | None = None
+) -> Dict:
     """
     INPUT: summary text (basic / detailed / conceptual)
     OUTPUT: quiz aligned to summary
+
+    Slots are served from the question bank first (never repeating an
+    MCQ for the same user_id); only the rest reach the LLM, and their
+    validated MCQs are banked. Slots running low are refilled in the
+    background.
+
+    batch=True asks for each level's MCQs in one request and only falls
+    back to per-question calls for items that fail validation.
+
+    deadline bounds every LLM call; once it is spent, concepts come from
+    noun phrases and unfilled slots get template MCQs.
     """
-    concepts = get_concepts_adaptive(summary)
-    b, i, a = partition_concepts(concepts)
+    concepts = get_concepts_adaptive(summary, deadline=deadline)
+    levels = dict(zip(
+        ("beginner", "intermediate", "advanced"),
+        partition_concepts(concepts)
+    ))
+    slots = [
+        (concept, level)
+        for level, level_concepts in levels.items()
+        for concept in level_concepts
+    ]
+
+    stats = LLMCallStats()
+    doc_fingerprint = generate_doc_id(summary)
+
+    # 1️⃣ Question bank
+    drawn, low = [None] * len(slots), []
+    if bank is not None:
+        drawn, low = _bank_safe(
+            bank.draw, doc_fingerprint, slots, user_id, default=(drawn, low)
+        )
+
+    # 2️⃣ LLM top-up for the slots the bank could not fill (bypassing the
+    # response cache, which would replay MCQs the bank already holds)
+    missing = [slot for slot, mcq in zip(slots, drawn) if mcq is None]
+    generated, retried = generate_mcqs_for_slots(
+        missing, summary, batch, stats, deadline, use_cache=bank is None
+    )
+
+    refill_queued = False
+    if bank is not None:
+        _bank_safe(bank.add, doc_fingerprint, [
+            (concept, level, mcq) for (concept, level), mcq in zip(missing, generated)
+        ])
+
+    filled = iter(generated)
+    mcqs = [mcq if mcq is not None else next(filled) for mcq in drawn]
+
+    # 3️⃣ Per-user de-duplication + background refill
+    if bank is not None:
+        _bank_safe(bank.mark_served, user_id, doc_fingerprint, mcqs)
+        refill_queued = _bank_safe(
+            bank.schedule_refill,
+            doc_fingerprint,
+            low,
+            lambda refill_slots: generate_mcqs_for_slots(
+                refill_slots, summary, batch, use_cache=False
+            )[0],
+            refill_jobs.submit,
+            default=False
+        )
 
+    ordered = iter(mcqs)
     quiz = {
-        "beginner": [llm_generate_mcq(c, "beginner", summary) for c in b],
-        "intermediate": [llm_generate_mcq(c, "intermediate", summary) for c in i],
-        "advanced": [llm_generate_mcq(c, "advanced", summary) for c in a]
+        level: [next(ordered) for _ in level_concepts]
+        for level, level_concepts in levels.items()
     }
 
     return {
@@ -258,6 +760,18 @@ def generate_quiz_from_summary(summary: str, mode: str = "conceptual") -> Dict:
             "concepts": concepts,
             "n_concepts": len(concepts),
             "llm_primary": "groq",
-            "llm_fallback": "mistral"
+            "llm_fallback": "mistral",
+            "mcq_generation": {
+                "strategy": "batch" if batch else "single",
+                "single_call_retries": retried,
+                **stats.as_dict()
+            },
+            "question_bank": {
+                "enabled": bank is not None,
+                "served": len(slots) - len(missing),
+                "generated": len(missing),
+                "refill_queued": refill_queued
+            },
+            **({"deadline": deadline.as_dict()} if deadline is not None else {})
         }
     }
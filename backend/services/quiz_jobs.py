@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+# ============================================================
+# BACKGROUND JOBS
+#
+# In-process job queue: a thread pool runs the work (LLM calls are
+# I/O bound) and a dict keeps each job's status until it expires.
+#
+# Status flow: queued → running → succeeded | failed
+#
+# Results only live in this process; callers persist anything durable
+# themselves (quiz jobs write the Quiz snapshot under the job id).
+#
+# Question-bank refills get their own small queue so background work
+# never sits in front of the quiz jobs users are polling.
+# ============================================================
+
+QUIZ_JOB_WORKERS = int(os.getenv("QUIZ_JOB_WORKERS", "4"))
+REFILL_JOB_WORKERS = int(os.getenv("QUESTION_BANK_REFILL_WORKERS", "1"))
+QUIZ_JOB_TTL = int(os.getenv("QUIZ_JOB_TTL", "3600"))  # seconds a finished job is kept
+
+FINISHED = {"succeeded", "failed"}
+
+
+class JobQueue:
+    def __init__(
+        self,
+        max_workers: int = QUIZ_JOB_WORKERS,
+        ttl: int = QUIZ_JOB_TTL,
+        name: str = "job"
+    ):
+        self.ttl = ttl
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers),
+            thread_name_prefix=name
+        )
+        self._jobs: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args, job_id: Optional[str] = None, **kwargs) -> str:
+        """
+        Queues fn(*args, **kwargs) and returns its job id immediately.
+        """
+        job_id = job_id or str(uuid.uuid4())
+
+        with self._lock:
+            self._prune()
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": "queued",
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None
+            }
+
+        self._executor.submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job_id: str, fn: Callable, args, kwargs) -> None:
+        self._update(job_id, status="running", started_at=time.time())
+
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            print(f"[job {job_id}] failed:", e)
+            traceback.print_exc()
+            self._update(job_id, status="failed", error=str(e), finished_at=time.time())
+            return
+
+        self._update(job_id, status="succeeded", result=result, finished_at=time.time())
+
+    def _update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["status"] in FINISHED and job["finished_at"] < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Snapshot of the job, or None if unknown / expired.
+        """
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return counts
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+# Process-wide queue used by the quiz routes
+quiz_jobs = JobQueue()
+
+# Background question-bank refills (lower priority: fewer workers, separate queue)
+refill_jobs = JobQueue(max_workers=REFILL_JOB_WORKERS, name="refill")
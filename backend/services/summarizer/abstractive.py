@@ -1,37 +1,24 @@
-import os
-from typing import Optional, Dict
-from dotenv import load_dotenv
-from openai import OpenAI
+from typing import Callable, Dict, Iterator, List, Tuple
 
-from backend.services.llm.ollama_client import ollama_generate
-
-load_dotenv()
+from services.llm.ollama_client import OLLAMA_MODEL, ollama, ollama_complete, ollama_generate_stream
+from services.llm.providers import gemini_config, get_gemini_client, get_openai_client
+from services.llm.response_cache import llm_cache
+from services.llm.router import ProvidersExhausted, llm_router
+from utils.deadline import Deadline, call_timeout, is_expired
 
 # ============================================================
 # LLM POLICY — SUMMARIZER
 #
-# 1️⃣ Ollama  (local / offline / dev)
-# 2️⃣ GPT     (cloud primary)
-# 3️⃣ Gemini  (cloud fallback)
+# 1️⃣ Gemini  (cloud primary)
+# 2️⃣ GPT     (cloud secondary)
+# 3️⃣ Ollama  (local / offline / dev, when OLLAMA_URL + OLLAMA_MODEL are set)
 # 4️⃣ Extract (deterministic fallback)
+#
+# 1️⃣–3️⃣ go through the shared LLM router: the fastest healthy
+# provider is tried first, open circuits are skipped and a slow call
+# is hedged with the next provider.
 # ============================================================
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-openai_client: Optional[OpenAI] = None
-if OPENAI_API_KEY:
-    openai_client = OpenAI(api_key=OPENAI_API_KEY)
-
-gemini_client = None
-if GEMINI_API_KEY:
-    try:
-        from google import genai
-        gemini_client = genai.Client(api_key=GEMINI_API_KEY)
-    except Exception:
-        gemini_client = None
-
-
 # ============================================================
 # PROMPTS
 # ============================================================
@@ -67,33 +54,60 @@ RULES:
 # EXPLAIN (SINGLE SOURCE OF TRUTH)
 # ============================================================
 
-def explain(text: str, mode: str) -> Dict:
+# Router provider → (source label, confidence)
+EXPLAIN_PROVIDERS = {
+    "gemini": ("gemini", "medium"),
+    "openai": ("gpt", "high"),
+    "ollama": ("ollama", "medium"),
+}
+
+
+def _explain_candidates(
+    text: str,
+    mode: str,
+    deadline: Deadline | None = None
+) -> List[Tuple[str, Callable]]:
+    # Timeouts are read when a call starts (a hedged call gets less)
+
+    candidates = []
+    if get_gemini_client():
+        candidates.append(("gemini", lambda: _explain_gemini(text, mode, call_timeout(deadline))))
+    if get_openai_client():
+        candidates.append(("openai", lambda: _explain_openai(text, mode, call_timeout(deadline))))
+    if ollama.configured:
+        candidates.append(("ollama", lambda: _explain_ollama(text, mode, call_timeout(deadline))))
+    return candidates
+
+
+def explain(text: str, mode: str, deadline: Deadline | None = None) -> Dict:
     if not text or not text.strip():
         return {"text": "", "source": "none", "confidence": "low"}
 
-    # 1️⃣ GEMINI — PRIMARY
-    if gemini_client:
-        try:
-            return {
-                "text": _explain_gemini(text, mode),
-                "source": "gemini",
-                "confidence": "medium"
-            }
-        except Exception as e:
-            print("Gemini failed:", e)
+    # ⏱ Request budget spent → straight to the deterministic fallback
+    if is_expired(deadline):
+        return _fallback_explanation(text)
 
-    # 2️⃣ OPENAI — SECONDARY
-    if openai_client:
-        try:
-            return {
-                "text": _explain_openai(text, mode),
-                "source": "gpt",
-                "confidence": "high"
-            }
-        except Exception as e:
-            print("GPT failed:", e)
+    # 1️⃣–3️⃣ Gemini / GPT / Ollama — routed by health and latency
+    try:
+        provider, explanation = llm_router.call(
+            _explain_candidates(text, mode, deadline),
+            accept=bool,
+            timeout=call_timeout(deadline)
+        )
+        source, confidence = EXPLAIN_PROVIDERS[provider]
+        return {
+            "text": explanation,
+            "source": source,
+            "confidence": confidence
+        }
+    except ProvidersExhausted as e:
+        print("Summarizer providers failed:", e)
+
+    # 4️⃣ FINAL DETERMINISTIC FALLBACK
+    return _fallback_explanation(text)
 
-    # 3️⃣ FINAL DETERMINISTIC FALLBACK
+
+def _fallback_explanation(text: str) -> Dict:
     sentences = text.split(".")
     return {
         "text": ". ".join(sentences[:3]).strip() + "...",
@@ -102,27 +116,200 @@ def explain(text: str, mode: str) -> Dict:
     }
 
 
+# ============================================================
+# STREAMING EXPLAIN
+#
+# Same providers as explain(), in the router's current order (open
+# circuits skipped, half-open probes claimed); each stream's outcome
+# and duration feed the router's breaker and latency stats. Yields events:
+#   {"type": "token", "text": "..."}            (0..n)
+#   {"type": "done", "text": full, "source", "confidence"[, "truncated"]}
+#
+# A provider that fails before emitting anything is skipped; one that
+# fails mid-stream ends the stream with what was already sent.
+# ============================================================
+
+def explain_stream(text: str, mode: str, deadline: Deadline | None = None) -> Iterator[Dict]:
+    if not text or not text.strip():
+        yield {"type": "done", "text": "", "source": "none", "confidence": "low"}
+        return
+
+    streamers = {"gemini": _stream_gemini, "openai": _stream_openai, "ollama": _stream_ollama}
+    configured = [name for name, _ in _explain_candidates(text, mode)]
+
+    for provider in llm_router.order(configured):
+        if is_expired(deadline):
+            break
+        if not llm_router.health(provider).acquire():
+            continue
+        source, confidence = EXPLAIN_PROVIDERS[provider]
+        streamer = streamers[provider]
+        parts = []
+        started = llm_router.clock()
+        outcome = None  # stays None if the client goes away mid-stream
+        expired = False
+        # Read timeout = remaining budget, so a stalled stream ends in time
+        stream = streamer(text, mode, call_timeout(deadline))
+        try:
+            try:
+                for piece in stream:
+                    parts.append(piece)
+                    yield {"type": "token", "text": piece}
+
+                    # ⏱ budget spent mid-stream → end with what was sent
+                    if is_expired(deadline):
+                        expired = True
+                        break
+                outcome = True if parts and not expired else None
+            except Exception as e:
+                outcome = False
+                print(f"{source} stream failed:", e)
+        finally:
+            stream.close()
+            llm_router.record(provider, started, outcome)
+
+        if outcome is False or expired:
+            if not parts:
+                continue
+
+            yield {
+                "type": "done",
+                "text": "".join(parts).strip(),
+                "source": source,
+                "confidence": "low",
+                "truncated": True
+            }
+            return
+
+        if parts:
+            yield {
+                "type": "done",
+                "text": "".join(parts).strip(),
+                "source": source,
+                "confidence": confidence
+            }
+            return
+
+    fallback = _fallback_explanation(text)
+    yield {"type": "token", "text": fallback["text"]}
+    yield {"type": "done", **fallback}
+
+
 # ============================================================
 # PROVIDER-SPECIFIC HELPERS
 # ============================================================
 
-def _explain_openai(text: str, mode: str) -> str:
-    response = openai_client.chat.completions.create(
+OPENAI_PARAMS = {"temperature": 0, "max_tokens": 400}
+
+
+def _explain_openai(text: str, mode: str, timeout: float | None = None) -> str:
+    def call() -> str:
+        response = get_openai_client().chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": PROMPTS[mode]},
+                {"role": "user", "content": text}
+            ],
+            temperature=0,
+            max_tokens=400,
+            **({"timeout": timeout} if timeout is not None else {})
+        )
+        return response.choices[0].message.content.strip()
+
+    return llm_cache.get_or_call(
+        "openai", "gpt-4o-mini", PROMPTS[mode] + "\n\n" + text, call,
+        params=OPENAI_PARAMS,
+        validate=bool
+    )
+
+
+def _explain_ollama(text: str, mode: str, timeout: float | None = None) -> str:
+    prompt = _format_prompt(text, mode)
+    return llm_cache.get_or_call(
+        "ollama", OLLAMA_MODEL or "", prompt,
+        lambda: ollama_complete(prompt, timeout=timeout),
+        validate=bool
+    )
+
+
+def _explain_gemini(text: str, mode: str, timeout: float | None = None) -> str:
+    prompt = PROMPTS[mode] + "\n\n" + text
+
+    def call() -> str:
+        response = get_gemini_client().models.generate_content(
+            model="gemini-flash-latest",
+            contents=prompt,
+            config=gemini_config(timeout)
+        )
+        return response.text.strip()
+
+    return llm_cache.get_or_call(
+        "gemini", "gemini-flash-latest", prompt, call,
+        validate=bool
+    )
+
+
+# ============================================================
+# STREAMING HELPERS
+#
+# A cached completion is replayed as a single piece; a completed live
+# stream is written back under the same key as the blocking helpers.
+# ============================================================
+
+def _stream_openai(text: str, mode: str, timeout: float | None = None) -> Iterator[str]:
+    cache_prompt = PROMPTS[mode] + "\n\n" + text
+    cached = llm_cache.get("openai", "gpt-4o-mini", cache_prompt, OPENAI_PARAMS)
+    if cached:
+        yield cached
+        return
+
+    stream = get_openai_client().chat.completions.create(
         model="gpt-4o-mini",
         messages=[
             {"role": "system", "content": PROMPTS[mode]},
             {"role": "user", "content": text}
         ],
-        temperature=0,
-        max_tokens=400
+        stream=True,
+        **OPENAI_PARAMS,
+        **({"timeout": timeout} if timeout is not None else {})
     )
-    return response.choices[0].message.content.strip()
 
+    parts = []
+    for chunk in stream:
+        piece = chunk.choices[0].delta.content if chunk.choices else None
+        if piece:
+            parts.append(piece)
+            yield piece
+
+    full = "".join(parts).strip()
+    if full:
+        llm_cache.set("openai", "gpt-4o-mini", cache_prompt, full, OPENAI_PARAMS)
 
-def _explain_gemini(text: str, mode: str) -> str:
+
+def _stream_gemini(text: str, mode: str, timeout: float | None = None) -> Iterator[str]:
     prompt = PROMPTS[mode] + "\n\n" + text
-    response = gemini_client.models.generate_content(
+    cached = llm_cache.get("gemini", "gemini-flash-latest", prompt)
+    if cached:
+        yield cached
+        return
+
+    stream = get_gemini_client().models.generate_content_stream(
         model="gemini-flash-latest",
-        contents=prompt
+        contents=prompt,
+        config=gemini_config(timeout)
     )
-    return response.text.strip()
+
+    parts = []
+    for chunk in stream:
+        piece = getattr(chunk, "text", None)
+        if piece:
+            parts.append(piece)
+            yield piece
+
+    full = "".join(parts).strip()
+    if full:
+        llm_cache.set("gemini", "gemini-flash-latest", prompt, full)
+
+
+def _stream_ollama(text: str, mode: str, timeout: float | None = None) -> Iterator[str]:
+    yield from ollama_generate_stream(_format_prompt(text, mode), timeout=timeout)
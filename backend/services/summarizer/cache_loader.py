@@ -1,23 +1,425 @@
 import json
 import os
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
-INDEX_FILE = "backend/data/index.json"
+try:
+    import fcntl
+except ImportError:  # Windows: journal appends are only serialised per process
+    fcntl = None
 
+# Anchored on this file, not the working directory, so the app (run from
+# backend/) and scripts/preprocess_dataset.py share one data directory
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(BACKEND_DIR, "data"))
+INDEX_FILE = os.getenv("DOC_INDEX_FILE", os.path.join(DATA_DIR, "index.json"))
+PROCESSED_CACHE_SIZE = int(os.getenv("PROCESSED_CACHE_SIZE", "256"))
 
-def load_cached_document(doc_id: str):
-    if not doc_id or not os.path.exists(INDEX_FILE):
-        return None
+# Journal records folded back into the base JSON file per compaction
+JOURNAL_COMPACT_EVERY = int(os.getenv("JOURNAL_COMPACT_EVERY", "256"))
 
-    with open(INDEX_FILE, "r") as f:
-        index = json.load(f)
 
-    entry = index.get(doc_id)
-    if not entry:
-        return None
+def write_json_atomic(path: str, data) -> None:
+    """
+    Write-then-rename so readers never see a half-written file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
 
-    processed_path = entry.get("processed_path")
-    if not processed_path or not os.path.exists(processed_path):
+def _file_signature(path: str) -> Optional[tuple]:
+    try:
+        stat = os.stat(path)
+    except OSError:
         return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+@contextmanager
+def _file_lock(path: str):
+    if fcntl is None:
+        yield
+        return
+
+    with open(path + ".lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class JournaledMap:
+    """
+    key → value map persisted as a JSON base file plus an append-only
+    JSONL journal next to it (index.json → index.journal.jsonl).
+
+    - put() appends one line instead of rewriting the whole file
+    - every compact_every records the journal is folded into the base
+      file (write-then-rename) and replaced by an empty one
+    - refresh() re-reads the base only when it (or the journal's inode)
+      changes; otherwise it replays just the journal lines appended since
+      the last call, by this or any other process
+
+    merge=True updates dict values key by key instead of replacing them.
+    Not thread-safe: callers hold their own lock.
+    """
+
+    def __init__(self, path: str, merge: bool = False, compact_every: int = JOURNAL_COMPACT_EVERY):
+        self.path = path
+        self.journal_path = os.path.splitext(path)[0] + ".journal.jsonl"
+        self.merge = merge
+        self.compact_every = max(1, compact_every)
+
+        self.data: Dict = {}
+        self._base_signature: Optional[tuple] = None
+        self._journal_inode: Optional[int] = None
+        self._offset = 0
+        self._records = 0
+
+    def _apply(self, key: str, value) -> None:
+        if self.merge:
+            self.data[key] = {**self.data.get(key, {}), **value}
+        else:
+            self.data[key] = value
+
+    def _replay(self) -> List[str]:
+        try:
+            with open(self.journal_path, "rb") as f:
+                f.seek(self._offset)
+                chunk = f.read()
+        except OSError:
+            return []
+
+        # A line still being appended is picked up on the next call
+        end = chunk.rfind(b"\n") + 1
+        keys = []
+        for line in chunk[:end].splitlines():
+            try:
+                key, value = json.loads(line)
+            except (ValueError, TypeError):
+                continue
+            self._apply(key, value)
+            keys.append(key)
+
+        self._offset += end
+        self._records += len(keys)
+        return keys
+
+    def refresh(self) -> Tuple[bool, List[str]]:
+        """
+        (reloaded, changed_keys). reloaded means data was rebuilt from
+        the base file, so every key may have changed.
+        """
+        base = _file_signature(self.path)
+        journal = _file_signature(self.journal_path)
+        journal_inode = journal[2] if journal else None
+
+        if (
+            base != self._base_signature
+            or journal_inode != self._journal_inode
+            or (journal and journal[1] < self._offset)
+        ):
+            data = {}
+            if base is not None:
+                try:
+                    with open(self.path, "r") as f:
+                        data = json.load(f)
+                except (OSError, ValueError) as e:
+                    # Keep serving the last good copy if a writer is mid-update
+                    print(f"Reload of {self.path} failed:", e)
+                    return False, []
+
+            self.data = data
+            self._base_signature = base
+            self._journal_inode = journal_inode
+            self._offset = 0
+            self._records = 0
+            self._replay()
+            return True, list(self.data)
+
+        if journal and journal[1] > self._offset:
+            return False, self._replay()
+        return False, []
+
+    def put(self, key: str, value) -> Tuple[bool, List[str]]:
+        """
+        Appends one record; compacts once the journal is long enough.
+
+        Returns refresh() as of the write (it includes concurrent writes).
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.journal_path)), exist_ok=True)
+        line = json.dumps([key, value]) + "\n"
+
+        with _file_lock(self.journal_path):
+            with open(self.journal_path, "a") as f:
+                f.write(line)
+
+            changes = self.refresh()
+            if self._records >= self.compact_every:
+                self._compact()
+        return changes
+
+    def compact(self) -> Tuple[bool, List[str]]:
+        with _file_lock(self.journal_path):
+            changes = self.refresh()
+            if self._records:
+                self._compact()
+        return changes
+
+    def _compact(self) -> None:
+        write_json_atomic(self.path, self.data)
+
+        # A fresh (empty) journal file: readers see the inode change and reload
+        directory = os.path.dirname(os.path.abspath(self.journal_path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        os.close(fd)
+        os.replace(tmp_path, self.journal_path)
+
+        journal = _file_signature(self.journal_path)
+        self._base_signature = _file_signature(self.path)
+        self._journal_inode = journal[2] if journal else None
+        self._offset = 0
+        self._records = 0
+
+
+class DocumentIndex:
+    """
+    Long-lived view of index.json plus an LRU of processed documents.
+
+    - index.json is parsed once and re-parsed only when its mtime changes;
+      updates go to an append-only journal (see JournaledMap)
+    - processed documents are parsed once and kept until evicted
+      (or until their own file changes on disk)
+    - lookups by doc_id are dict lookups
+    """
+
+    def __init__(self, index_file: str = INDEX_FILE, cache_size: int = PROCESSED_CACHE_SIZE):
+        self.index_file = index_file
+        self.cache_size = cache_size
+
+        self._lock = threading.RLock()
+        self._index = JournaledMap(index_file, merge=True)
+        self._raw_ids: Dict[str, str] = {}
+        self._documents: "OrderedDict[str, tuple]" = OrderedDict()
+
+    # --------------------------------------------------
+    # INDEX
+    # --------------------------------------------------
+    def _refresh(self, changes: Optional[Tuple[bool, List[str]]] = None) -> None:
+        reloaded, changed = changes or self._index.refresh()
+        if reloaded:
+            self._raw_ids = {}
+        for doc_id in changed:
+            raw_id = self._index.data[doc_id].get("raw_fingerprint")
+            if raw_id:
+                self._raw_ids[raw_id] = doc_id
+
+    @property
+    def _entries(self) -> Dict[str, Dict]:
+        return self._index.data
+
+    def find_by_raw_fingerprint(self, raw_id: Optional[str]) -> Optional[str]:
+        """
+        doc_id previously extracted from byte-identical input, if any.
+        """
+        if not raw_id:
+            return None
+
+        with self._lock:
+            self._refresh()
+            return self._raw_ids.get(raw_id)
+
+    def get_entry(self, doc_id: str) -> Optional[Dict]:
+        if not doc_id:
+            return None
+
+        with self._lock:
+            self._refresh()
+            return self._entries.get(doc_id)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return self.get_entry(doc_id) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._entries)
+
+    def entries(self) -> Dict[str, Dict]:
+        """
+        Snapshot of all index entries (doc_id → entry).
+        """
+        with self._lock:
+            self._refresh()
+            return dict(self._entries)
+
+    # --------------------------------------------------
+    # PROCESSED DOCUMENTS
+    # --------------------------------------------------
+    def get(self, doc_id: str) -> Optional[Dict]:
+        entry = self.get_entry(doc_id)
+        if not entry:
+            return None
+
+        processed_path = entry.get("processed_path")
+        if not processed_path:
+            return None
+
+        try:
+            stat = os.stat(processed_path)
+        except OSError:
+            return None
+        mtime = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._documents.get(doc_id)
+            if cached and cached[0] == processed_path and cached[1] == mtime:
+                self._documents.move_to_end(doc_id)
+                return cached[2]
+
+        try:
+            with open(processed_path, "r") as f:
+                document = json.load(f)
+        except (OSError, ValueError) as e:
+            print("Processed document load failed:", e)
+            return None
+
+        with self._lock:
+            self._documents[doc_id] = (processed_path, mtime, document)
+            self._documents.move_to_end(doc_id)
+            while len(self._documents) > self.cache_size:
+                self._documents.popitem(last=False)
+
+        return document
+
+    # --------------------------------------------------
+    # WRITE-BACK
+    # --------------------------------------------------
+    @property
+    def processed_dir(self) -> str:
+        return os.path.join(os.path.dirname(self.index_file), "processed")
+
+    def put_entry(self, doc_id: str, entry: Dict) -> None:
+        """
+        Adds/updates one index entry (one journal append, not a rewrite).
+        """
+        with self._lock:
+            self._refresh(self._index.put(doc_id, entry))
+
+    def compact(self) -> None:
+        """
+        Folds the journal into index.json (end of a preprocessing run).
+        """
+        with self._lock:
+            self._refresh(self._index.compact())
+
+    def save_document(self, doc_id: str, document: Dict, entry: Optional[Dict] = None) -> str:
+        """
+        Persists a processed document and registers it in the index.
+        """
+        existing = self.get_entry(doc_id) or {}
+        processed_path = existing.get("processed_path") or os.path.join(
+            self.processed_dir, f"{doc_id}.json"
+        )
+
+        write_json_atomic(processed_path, document)
+
+        with self._lock:
+            self._documents.pop(doc_id, None)
+
+        self.put_entry(doc_id, {**(entry or {}), "processed_path": processed_path})
+        return processed_path
+
+    def save_summary(
+        self,
+        doc_id: str,
+        mode: str,
+        summary: Dict,
+        concept_data: Optional[Dict] = None,
+        entry: Optional[Dict] = None
+    ) -> None:
+        """
+        Merges one freshly computed summary mode into the document's cache.
+        """
+        with self._lock:
+            document = dict(self.get(doc_id) or {
+                "doc_id": doc_id,
+                "summaries": {},
+                "metadata": {
+                    "preprocessed": False,
+                    "created_at": datetime.utcnow().isoformat()
+                }
+            })
+
+            document["summaries"] = {**document.get("summaries", {}), mode: summary}
+
+            if concept_data:
+                document["concepts"] = {
+                    "list": concept_data.get("key_concepts", []),
+                    "source": concept_data.get("source"),
+                    "confidence": concept_data.get("confidence")
+                }
+
+            self.save_document(doc_id, document, entry)
+
+    def invalidate(self, doc_id: Optional[str] = None) -> None:
+        with self._lock:
+            if doc_id is None:
+                self._documents.clear()
+                self._index = JournaledMap(self.index_file, merge=True)
+                self._raw_ids = {}
+            else:
+                self._documents.pop(doc_id, None)
+
+
+# Process-wide index used by the summarize route
+document_index = DocumentIndex()
+
+
+def load_cached_document(doc_id: str):
+    return document_index.get(doc_id)
+
+
+def find_cached_doc_id(raw_id: Optional[str]) -> Optional[str]:
+    return document_index.find_by_raw_fingerprint(raw_id)
+
+
+def remember_raw_fingerprint(doc_id: str, raw_id: Optional[str]) -> None:
+    """
+    Aliases raw upload bytes to an already cached doc_id.
+    """
+    if not raw_id or find_cached_doc_id(raw_id) == doc_id:
+        return
+    try:
+        document_index.put_entry(doc_id, {"raw_fingerprint": raw_id})
+    except OSError as e:
+        print("Raw fingerprint write-back failed:", e)
+
 
-    with open(processed_path, "r") as f:
-        return json.load(f)
+def save_cached_summary(
+    doc_id: str,
+    mode: str,
+    summary: Dict,
+    concept_data: Optional[Dict] = None,
+    raw_id: Optional[str] = None
+) -> None:
+    entry = {"raw_fingerprint": raw_id} if raw_id else None
+    try:
+        document_index.save_summary(doc_id, mode, summary, concept_data, entry)
+    except OSError as e:
+        print("Summary cache write-back failed:", e)
@@ -1,16 +1,50 @@
 import os
 import json
+import threading
 from typing import List, Dict
 from dotenv import load_dotenv
 
+from services.llm.providers import gemini_config, get_gemini_client, get_openai_client
+from services.llm.response_cache import llm_cache
+from services.llm.router import ProvidersExhausted, llm_router
+from utils.deadline import Deadline, call_timeout, is_expired
+
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-def _get_concepts_openai(text: str) -> List[str]:
-    from openai import OpenAI
 
-    client = OpenAI(api_key=OPENAI_API_KEY)
+# ============================================================
+# SPACY PIPELINE (LOADED ONCE PER PROCESS)
+#
+# noun_chunks only needs POS tags + the dependency parse, so the
+# remaining components are excluded at load time.
+# ============================================================
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+SPACY_EXCLUDE = ["ner", "lemmatizer", "textcat", "senter"]
+SPACY_MAX_CONCEPTS = 10
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+
+def get_nlp():
+    """
+    Process-wide spaCy pipeline, initialised lazily on first use.
+    """
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                import spacy
+                _nlp = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+    return _nlp
+
+
+def _get_concepts_openai(text: str, timeout: float | None = None) -> List[str]:
+    client = get_openai_client()
+    if client is None:
+        raise RuntimeError("OpenAI client not configured")
 
     prompt = f"""
 Extract ONLY important domain concepts explicitly present in the text.
@@ -29,19 +63,26 @@ Text:
 {text}
 """
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0,
-        max_tokens=150
+    def call() -> str:
+        response = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0,
+            max_tokens=150,
+            **({"timeout": timeout} if timeout is not None else {})
+        )
+        return response.choices[0].message.content.strip()
+
+    content = llm_cache.get_or_call(
+        "openai", "gpt-4o-mini", prompt, call,
+        params={"temperature": 0, "max_tokens": 150},
+        validate=lambda c: "key_concepts" in json.loads(c)
     )
-
-    content = response.choices[0].message.content.strip()
     return json.loads(content)["key_concepts"]
-def _get_concepts_gemini(text: str) -> List[str]:
-    from google import genai
-
-    client = genai.Client(api_key=GEMINI_API_KEY)
+def _get_concepts_gemini(text: str, timeout: float | None = None) -> List[str]:
+    client = get_gemini_client()
+    if client is None:
+        raise RuntimeError("Gemini client not configured")
 
     prompt = f"""
 Extract domain-specific concepts explicitly mentioned in the text.
@@ -59,61 +100,88 @@ Text:
 {text}
 """
 
-    response = client.models.generate_content(
-        model="gemini-flash-latest",
-        contents=prompt
+    def call() -> str:
+        response = client.models.generate_content(
+            model="gemini-flash-latest",
+            contents=prompt,
+            config=gemini_config(timeout)
+        )
+        return response.text
+
+    content = llm_cache.get_or_call(
+        "gemini", "gemini-flash-latest", prompt, call,
+        validate=lambda c: "key_concepts" in json.loads(c)
     )
-
-    data = json.loads(response.text)
+    data = json.loads(content)
     return data["key_concepts"]
-def _get_concepts_spacy(text: str) -> List[str]:
-    import spacy
-
-    nlp = spacy.load("en_core_web_sm")
-    doc = nlp(text)
-
-    concepts = set()
+def _noun_chunk_concepts(doc) -> List[str]:
+    concepts = {}
 
     for chunk in doc.noun_chunks:
         if len(chunk.text.split()) > 1:
-            concepts.add(chunk.text.lower())
+            concepts.setdefault(chunk.text.lower(), None)
 
     return list(concepts)
-def get_conceptual_summary(text: str) -> Dict:
+
+
+def _get_concepts_spacy(text: str) -> List[str]:
+    return _noun_chunk_concepts(get_nlp()(text))
+
+
+def get_concepts_spacy_batch(
+    texts: List[str],
+    batch_size: int = 16,
+    n_process: int = 1
+) -> List[Dict]:
+    """
+    Local-only concept extraction for many documents via nlp.pipe.
+
+    Returns one get_conceptual_summary-shaped dict per input text.
+    """
+    results = []
+    docs = get_nlp().pipe(texts, batch_size=batch_size, n_process=n_process)
+
+    for doc in docs:
+        concepts = _noun_chunk_concepts(doc)
+        results.append({
+            "key_concepts": concepts[:SPACY_MAX_CONCEPTS],
+            "source": "spacy" if concepts else "none",
+            "confidence": "low"
+        })
+
+    return results
+
+
+def get_conceptual_summary(text: str, deadline: Deadline | None = None) -> Dict:
     if not text or not text.strip():
         return {"key_concepts": [], "source": "none", "confidence": "low"}
 
-    # 1️⃣ GEMINI — PRIMARY
+
+    # 1️⃣ GEMINI / 2️⃣ OPENAI — routed by health and latency
+    # (skipped once the request deadline is spent)
+    candidates = []
     if GEMINI_API_KEY:
-        try:
-            concepts = _get_concepts_gemini(text)
-            if concepts:
-                return {
-                    "key_concepts": concepts,
-                    "source": "gemini",
-                    "confidence": "high"
-                }
-        except Exception as e:
-            print("Gemini concept extraction failed:", e)
-
-    # 2️⃣ OPENAI — SECONDARY
+        candidates.append(("gemini", lambda: _get_concepts_gemini(text, call_timeout(deadline))))
     if OPENAI_API_KEY:
-        try:
-            concepts = _get_concepts_openai(text)
-            if concepts:
-                return {
-                    "key_concepts": concepts,
-                    "source": "openai",
-                    "confidence": "high"
-                }
-        except Exception as e:
-            print("OpenAI concept extraction failed:", e)
+        candidates.append(("openai", lambda: _get_concepts_openai(text, call_timeout(deadline))))
+    if is_expired(deadline):
+        candidates = []
+
+    try:
+        source, concepts = llm_router.call(candidates, accept=bool, timeout=call_timeout(deadline))
+        return {
+            "key_concepts": concepts,
+            "source": source,
+            "confidence": "high"
+        }
+    except ProvidersExhausted as e:
+        print("LLM concept extraction failed:", e)
 
     # 3️⃣ SPACY — FINAL FALLBACK
     try:
         concepts = _get_concepts_spacy(text)
         return {
-            "key_concepts": concepts[:10],
+            "key_concepts": concepts[:SPACY_MAX_CONCEPTS],
             "source": "spacy",
             "confidence": "low"
         }
@@ -1,63 +1,338 @@
-import nltk
+import os
 import numpy as np
-from typing import List
-from sklearn.feature_extraction.text import TfidfVectorizer
+from typing import Callable, Dict, List
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
 
-# Ensure tokenizer is available
-nltk.download("punkt", quiet=True)
-from nltk.tokenize import sent_tokenize
-def extractive_summary(text: str, ratio: float = 0.35) -> str:
+from services.summarizer.idf_model import get_idf_model
+from services.summarizer.segmentation import sent_tokenize
+
+
+# ============================================================
+# EXTRACTIVE SUMMARIZATION (TF-IDF sentence scoring)
+#
+# Single and batch calls share one pipeline: sentences of every document
+# go through one CountVectorizer fit, and TF-IDF is computed per document
+# row block (idf from that document's sentences only, as if it had its
+# own TfidfVectorizer), so a document's summary does not depend on what
+# it was batched with.
+#
+# Once preprocessing has built a corpus IDF model, scoring uses its
+# corpus-wide idf instead (terms outside the corpus get the maximum),
+# so short inputs still get meaningful term statistics.
+# ============================================================
+
+MIN_SENTENCE_WORDS = 5
+EXTRACTIVE_CORPUS_IDF = os.getenv("EXTRACTIVE_CORPUS_IDF", "true").lower() == "true"
+EXTRACTIVE_SCORER = os.getenv("EXTRACTIVE_SCORER", "tfidf").lower()
+
+TEXTRANK_NEIGHBOURS = 10      # edges kept per sentence
+TEXTRANK_BLOCK_ROWS = 512     # similarity rows computed at once
+TEXTRANK_EXACT_ROWS = int(os.getenv("TEXTRANK_EXACT_ROWS", "1000"))  # above: approximate graph
+TEXTRANK_HASH_TABLES = 32     # random-hyperplane orderings
+TEXTRANK_HASH_BITS = 16       # hyperplanes per ordering
+TEXTRANK_WINDOW = 4           # following sentences compared per ordering
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_MAX_ITER = 100
+TEXTRANK_TOLERANCE = 1e-6
+
+
+def _clean_sentences(text: str) -> List[str]:
+    if not text or not text.strip():
+        return []
+
+    # Filter very short / non-informative sentences
+    return [
+        s.strip() for s in sent_tokenize(text) if len(s.split()) >= MIN_SENTENCE_WORDS
+    ]
+
+
+def _select_top(scores: np.ndarray, k: int) -> np.ndarray:
     """
-    Performs extractive summarization using TF-IDF sentence scoring.
+    Indices of the k highest scores, in original order.
 
-    Args:
-        text (str): Input text
-        ratio (float): Proportion of sentences to keep (0.1 – 0.5 recommended)
+    O(n) via partition. Ties at the cut-off go to the later sentence,
+    as in a stable argsort()[::-1]. The original argsort()[::-1] (default,
+    unstable sort) only gave that order reliably on short inputs, where
+    NumPy falls back to insertion sort.
+    """
+    n = len(scores)
+    if k >= n:
+        return np.arange(n)
 
-    Returns:
-        str: Extracted important sentences in original order
+    kth = np.partition(scores, n - k)[n - k]
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)
+    ties = ties[len(ties) - (k - len(above)):]
+    return np.sort(np.concatenate([above, ties]))
+
+
+def _l2_rows(rows: np.ndarray, cols: np.ndarray, weights: np.ndarray, shape) -> sparse.csr_matrix:
+    norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=shape[0]))
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix((weights / norms[rows], (rows, cols)), shape=shape)
+
+
+def _block_tfidf_matrix(sentences: List[str], block_sizes: np.ndarray) -> sparse.csr_matrix:
     """
+    l2-normalised TF-IDF rows for all sentences, idf taken per block.
 
-    if not text or not text.strip():
-        return ""
+    Equivalent to TfidfVectorizer(stop_words="english") fitted on each
+    block separately (smooth idf, l2 rows).
+    """
+    block_of_row = np.repeat(np.arange(len(block_sizes)), block_sizes)
 
-    # Step 1: Sentence segmentation
-    sentences: List[str] = sent_tokenize(text)
+    try:
+        counts = CountVectorizer(stop_words="english").fit_transform(sentences).tocoo()
+    except ValueError:  # only stop words in the whole batch
+        return sparse.csr_matrix((len(sentences), 1))
 
-    # Step 2: Filter very short / non-informative sentences
-    clean_sentences = [
-        s.strip() for s in sentences if len(s.split()) >= 5
-    ]
+    rows, cols = counts.row, counts.col
+    row_blocks = block_of_row[rows]
 
-    if not clean_sentences:
-        return ""
+    # Document frequency of each term inside its own block
+    keys = row_blocks.astype(np.int64) * counts.shape[1] + cols
+    _, inverse, df = np.unique(keys, return_inverse=True, return_counts=True)
+    df = df[inverse]
 
-    # If text is already short, return as-is
-    if len(clean_sentences) <= 3:
-        return " ".join(clean_sentences)
+    n_docs = block_sizes[row_blocks]
+    idf = np.log((1 + n_docs) / (1 + df)) + 1
+
+    return _l2_rows(rows, cols, counts.data * idf, counts.shape)
+
+
+# ============================================================
+# SCORERS
+#
+# Each takes one document's l2-normalised TF-IDF rows and its sentences
+# and returns one score per sentence.
+#
+# 1️⃣ tfidf     summed TF-IDF / sqrt(length)  (default)
+# 2️⃣ centroid  cosine similarity to the document centroid
+# 3️⃣ textrank  PageRank over a top-k cosine similarity graph
+#               (approximate neighbours above TEXTRANK_EXACT_ROWS)
+# ============================================================
+
+def _score_tfidf(matrix: sparse.csr_matrix, sentences: List[str]) -> np.ndarray:
+    scores = np.asarray(matrix.sum(axis=1)).ravel()
+
+    # Normalize to avoid bias toward long sentences
+    lengths = np.array([len(s.split()) for s in sentences])
+    return scores / np.sqrt(lengths)
+
+
+def _score_centroid(matrix: sparse.csr_matrix, sentences: List[str]) -> np.ndarray:
+    centroid = np.asarray(matrix.mean(axis=0)).ravel()
+    norm = np.linalg.norm(centroid)
+    if norm == 0:
+        return np.zeros(matrix.shape[0])
+    return matrix @ (centroid / norm)
+
+
+def _top_k_graph(rows: np.ndarray, cols: np.ndarray, weights: np.ndarray, n: int, k: int) -> sparse.csr_matrix:
+    """
+    Keeps each row's k heaviest positive edges.
+    """
+    keep = weights > 0
+    rows, cols, weights = rows[keep], cols[keep], weights[keep]
+
+    # By row, heaviest first: cosine weights are in (0, 1], so one float
+    # key row + (1 - w) / 2 sorts like (row, -w) without a lexsort
+    order = np.argsort(rows + (1 - weights) / 2)
+    rows, cols, weights = rows[order], cols[order], weights[order]
+
+    row_starts = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n))[:-1]])
+    keep = np.arange(len(rows)) - row_starts[rows] < k
+    return sparse.csr_matrix((weights[keep], (rows[keep], cols[keep])), shape=(n, n))
+
+
+def _exact_similarity_graph(matrix: sparse.csr_matrix, k: int) -> sparse.csr_matrix:
+    """
+    Every pairwise similarity, TEXTRANK_BLOCK_ROWS rows at a time so the
+    full n×n matrix is never materialised. O(n²) time.
+    """
+    n = matrix.shape[0]
+    transposed = matrix.T.tocsc()
+    rows, cols, weights = [], [], []
+
+    for start in range(0, n, TEXTRANK_BLOCK_ROWS):
+        block = (matrix[start:start + TEXTRANK_BLOCK_ROWS] @ transposed).toarray()
+        block_rows = np.arange(block.shape[0])
+        block[block_rows, block_rows + start] = 0.0  # no self-loops
+
+        neighbours = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        rows.append(np.repeat(block_rows + start, k))
+        cols.append(neighbours.ravel())
+        weights.append(np.take_along_axis(block, neighbours, axis=1).ravel())
+
+    return _top_k_graph(np.concatenate(rows), np.concatenate(cols), np.concatenate(weights), n, k)
+
+
+def _approximate_similarity_graph(matrix: sparse.csr_matrix, k: int) -> sparse.csr_matrix:
+    """
+    Approximate neighbours via random-hyperplane hashing: sentences are
+    sorted by their TEXTRANK_HASH_BITS-bit sign code (similar sentences
+    get similar codes) and each is compared only with the
+    TEXTRANK_WINDOW sentences after it, in TEXTRANK_HASH_TABLES
+    independent orderings. O(n·log n + n·tables·window) time.
+    """
+    n = matrix.shape[0]
+    terms = np.unique(matrix.indices)
+
+    # Fixed seed: the same document always gets the same graph
+    rng = np.random.RandomState(0)
+    planes = rng.standard_normal((len(terms), TEXTRANK_HASH_TABLES * TEXTRANK_HASH_BITS))
+    signs = (matrix[:, terms] @ planes) > 0
+
+    powers = 1 << np.arange(TEXTRANK_HASH_BITS, dtype=np.int64)
+    window = min(TEXTRANK_WINDOW, n - 1)
+    pairs = []
+
+    for table in range(TEXTRANK_HASH_TABLES):
+        bits = signs[:, table * TEXTRANK_HASH_BITS:(table + 1) * TEXTRANK_HASH_BITS]
+        order = np.argsort(bits @ powers, kind="stable")
+        ordered = matrix[order]
+
+        for offset in range(1, window + 1):
+            similarity = np.asarray(ordered[:-offset].multiply(ordered[offset:]).sum(axis=1)).ravel()
+            pairs.append((order[:-offset], order[offset:], similarity))
+
+    first = np.concatenate([a for a, _, _ in pairs])
+    second = np.concatenate([b for _, b, _ in pairs])
+    weights = np.concatenate([w for _, _, w in pairs])
+
+    # The same pair may be found in several orderings
+    low, high = np.minimum(first, second), np.maximum(first, second)
+    keys = low.astype(np.int64) * n + high
+    order = np.argsort(keys)
+    unique = order[np.concatenate([[True], np.diff(keys[order]) > 0])]
+    low, high, weights = low[unique], high[unique], weights[unique]
+
+    return _top_k_graph(
+        np.concatenate([low, high]), np.concatenate([high, low]), np.concatenate([weights, weights]), n, k
+    )
+
+
+def _similarity_graph(matrix: sparse.csr_matrix, k: int) -> sparse.csr_matrix:
+    """
+    Cosine similarity graph keeping only each sentence's k nearest
+    neighbours (O(n·k) edges). Exact up to TEXTRANK_EXACT_ROWS sentences,
+    approximate (sub-quadratic) above.
+    """
+    n = matrix.shape[0]
+    k = min(k, n - 1)
+    if n <= TEXTRANK_EXACT_ROWS:
+        return _exact_similarity_graph(matrix, k)
+    return _approximate_similarity_graph(matrix, k)
+
+
+def _score_textrank(matrix: sparse.csr_matrix, sentences: List[str]) -> np.ndarray:
+    n = matrix.shape[0]
+    graph = _similarity_graph(matrix, TEXTRANK_NEIGHBOURS)
+
+    # Symmetrise (similarity is mutual), then row-normalise into transitions
+    graph = graph.maximum(graph.T).tocsr()
+    out_weight = np.asarray(graph.sum(axis=1)).ravel()
+    dangling = out_weight == 0
+    out_weight[dangling] = 1.0
+    transitions = sparse.diags(1.0 / out_weight) @ graph
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(TEXTRANK_MAX_ITER):
+        # Dangling sentences spread their rank uniformly
+        leaked = scores[dangling].sum() / n
+        updated = (1 - TEXTRANK_DAMPING) / n + TEXTRANK_DAMPING * (transitions.T @ scores + leaked)
+        if np.abs(updated - scores).sum() < TEXTRANK_TOLERANCE:
+            return updated
+        scores = updated
+
+    return scores
+
+
+SCORERS: Dict[str, Callable[[sparse.csr_matrix, List[str]], np.ndarray]] = {
+    "tfidf": _score_tfidf,
+    "centroid": _score_centroid,
+    "textrank": _score_textrank
+}
+
+
+def _block_scores(
+    sentence_blocks: List[List[str]],
+    scorer: str,
+    model=None
+) -> List[np.ndarray]:
+    """
+    One score array per document, from a single TF-IDF matrix.
+    """
+    score = SCORERS[scorer]
+    sentences = [s for block in sentence_blocks for s in block]
+    block_sizes = np.array([len(block) for block in sentence_blocks])
+
+    matrix = (
+        model.transform(sentences) if model is not None
+        else _block_tfidf_matrix(sentences, block_sizes)
+    )
+
+    results, start = [], 0
+    for block, size in zip(sentence_blocks, block_sizes):
+        results.append(score(matrix[start:start + size], block))
+        start += size
+    return results
+
+
+def extractive_summary_batch(
+    texts: List[str],
+    ratio: float = 0.35,
+    corpus_idf: bool = EXTRACTIVE_CORPUS_IDF,
+    scorer: str = EXTRACTIVE_SCORER
+) -> List[str]:
+    """
+    Summarizes many documents in one vectorized pass.
+
+    Returns one summary per input, identical to extractive_summary(text).
+    corpus_idf=False forces per-document IDF even when a model exists.
+    """
+    if scorer not in SCORERS:
+        raise ValueError(f"Unknown extractive scorer '{scorer}'")
 
     # Clamp ratio safely
     ratio = min(max(ratio, 0.1), 0.5)
 
-    # Step 3: TF-IDF vectorization (sentence-level)
-    vectorizer = TfidfVectorizer(stop_words="english")
-    tfidf_matrix = vectorizer.fit_transform(clean_sentences)
+    cleaned = [_clean_sentences(text) for text in texts]
+    summaries = [" ".join(sentences) for sentences in cleaned]
 
-    # Step 4: Sentence scoring (length-normalized)
-    sentence_scores = np.asarray(tfidf_matrix.sum(axis=1)).ravel()
-    sentence_lengths = np.array([len(s.split()) for s in clean_sentences])
+    # If text is already short, return as-is
+    scored = [i for i, sentences in enumerate(cleaned) if len(sentences) > 3]
+    if not scored:
+        return summaries
 
-    # Normalize to avoid bias toward long sentences
-    sentence_scores = sentence_scores / np.sqrt(sentence_lengths)
+    blocks = [cleaned[i] for i in scored]
+    model = get_idf_model() if corpus_idf else None
+
+    for i, sentences, scores in zip(scored, blocks, _block_scores(blocks, scorer, model)):
+        num_sentences = max(1, int(len(sentences) * ratio))
+        selected = _select_top(scores, num_sentences)
+        summaries[i] = " ".join(sentences[j] for j in selected)
 
-    # Step 5: Rank sentences by importance
-    ranked_indices = np.argsort(sentence_scores)[::-1]
+    return summaries
 
-    # Step 6: Select top-ranked sentences
-    num_sentences = max(1, int(len(clean_sentences) * ratio))
-    selected_indices = sorted(ranked_indices[:num_sentences])
 
-    # Step 7: Preserve original order
-    summary_sentences = [clean_sentences[i] for i in selected_indices]
+def extractive_summary(
+    text: str,
+    ratio: float = 0.35,
+    corpus_idf: bool = EXTRACTIVE_CORPUS_IDF,
+    scorer: str = EXTRACTIVE_SCORER
+) -> str:
+    """
+    Performs extractive summarization using TF-IDF sentence scoring.
 
-    return " ".join(summary_sentences)
+    Args:
+        text (str): Input text
+        ratio (float): Proportion of sentences to keep (0.1 – 0.5 recommended)
+        corpus_idf (bool): Use the corpus IDF model when one has been built
+        scorer (str): "tfidf" (default), "centroid" or "textrank"
+
+    Returns:
+        str: Extracted important sentences in original order
+    """
+    return extractive_summary_batch([text], ratio, corpus_idf, scorer)[0]
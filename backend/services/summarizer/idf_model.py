@@ -0,0 +1,210 @@
+import os
+import threading
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+from services.summarizer.cache_loader import DATA_DIR
+
+# ============================================================
+# CORPUS IDF MODEL
+#
+# Document frequencies over the whole preprocessed corpus, built by
+# scripts/preprocess_dataset.py and stored next to index.json as
+# idf_model.npz (vocabulary + float32 idf + corpus size).
+#
+# The file also keeps the raw df counts and the doc_ids they cover, so
+# a preprocessing run only adds the documents it extracted itself
+# instead of re-reading the whole corpus.
+#
+# Loaded once per process (reloaded if the file changes) and used to
+# score sentences with corpus idf instead of the document's own. Terms
+# unseen in the corpus get the largest idf (df = 0), so an upload on a
+# new topic is still scored by its own words.
+# ============================================================
+
+IDF_MODEL_FILE = os.getenv("IDF_MODEL_FILE", os.path.join(DATA_DIR, "idf_model.npz"))
+IDF_MIN_DF = int(os.getenv("IDF_MIN_DF", "1"))
+
+STOP_WORDS = "english"
+
+
+class IdfModel:
+    def __init__(
+        self,
+        vocabulary: List[str],
+        idf: np.ndarray,
+        n_docs: int,
+        counts: Optional["DocumentFrequencies"] = None
+    ):
+        self.vocabulary = list(vocabulary)
+        self.idf = np.asarray(idf, dtype=np.float64)
+        self.n_docs = int(n_docs)
+        self.counts = counts
+
+        self._index = {term: i for i, term in enumerate(self.vocabulary)}
+        self.unseen_idf = float(np.log(1 + self.n_docs) + 1)  # df = 0
+
+    def __len__(self) -> int:
+        return len(self.vocabulary)
+
+    def transform(self, sentences: List[str]) -> sparse.csr_matrix:
+        """
+        l2-normalised TF-IDF rows, one per sentence.
+
+        Columns are the sentences' own terms; each is weighted by its
+        corpus idf, or unseen_idf if the corpus never saw it.
+        """
+        vectorizer = CountVectorizer(stop_words=STOP_WORDS)
+        try:
+            counts = vectorizer.fit_transform(sentences).tocoo()
+        except ValueError:  # only stop words
+            return sparse.csr_matrix((len(sentences), 1))
+
+        term_idf = np.array([
+            self.idf[i] if i is not None else self.unseen_idf
+            for i in map(self._index.get, vectorizer.get_feature_names_out())
+        ])
+        weights = counts.data * term_idf[counts.col]
+
+        norms = np.sqrt(np.bincount(counts.row, weights=weights ** 2, minlength=len(sentences)))
+        norms[norms == 0] = 1.0
+        return sparse.csr_matrix(
+            (weights / norms[counts.row], (counts.row, counts.col)),
+            shape=counts.shape
+        )
+
+    def save(self, path: str = IDF_MODEL_FILE) -> None:
+        """
+        Atomic write (temp file + rename), like the document index.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        arrays = {
+            "vocabulary": np.array(self.vocabulary, dtype=str),
+            "idf": self.idf.astype(np.float32),
+            "n_docs": np.array(self.n_docs)
+        }
+        if self.counts is not None:
+            terms = sorted(self.counts.df)
+            arrays["df_terms"] = np.array(terms, dtype=str)
+            arrays["df_counts"] = np.array([self.counts.df[t] for t in terms], dtype=np.int64)
+            arrays["doc_ids"] = np.array(sorted(self.counts.doc_ids), dtype=str)
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = IDF_MODEL_FILE) -> "IdfModel":
+        with np.load(path) as data:
+            return cls(data["vocabulary"].tolist(), data["idf"], int(data["n_docs"]))
+
+
+class DocumentFrequencies:
+    """
+    Thread-safe df accumulator; each doc_id is counted once.
+
+    Same analyzer and smoothed idf as the per-document scorer:
+    idf = ln((1 + N) / (1 + df)) + 1
+    """
+
+    def __init__(self, df: Optional[Counter] = None, doc_ids: Iterable[str] = ()):
+        self.df: Counter = Counter(df or {})
+        self.doc_ids = set(doc_ids)
+        self.n_docs = len(self.doc_ids)
+
+        self._analyze = CountVectorizer(stop_words=STOP_WORDS).build_analyzer()
+        self._lock = threading.Lock()
+
+    def add(self, text: str, doc_id: Optional[str] = None) -> bool:
+        """
+        Counts one document; False if empty or doc_id was already counted.
+        """
+        if not text:
+            return False
+
+        terms = set(self._analyze(text))
+        with self._lock:
+            if doc_id is not None:
+                if doc_id in self.doc_ids:
+                    return False
+                self.doc_ids.add(doc_id)
+            self.df.update(terms)
+            self.n_docs += 1
+        return True
+
+    def model(self, min_df: int = IDF_MIN_DF) -> Optional[IdfModel]:
+        with self._lock:
+            terms = sorted(term for term, count in self.df.items() if count >= min_df)
+            if not terms:
+                return None
+
+            counts = np.array([self.df[term] for term in terms], dtype=np.float64)
+            idf = np.log((1 + self.n_docs) / (1 + counts)) + 1
+            return IdfModel(terms, idf, self.n_docs, counts=self)
+
+
+def load_document_frequencies(path: str = IDF_MODEL_FILE) -> Optional[DocumentFrequencies]:
+    """
+    Counts saved with the model, or None (no model, or saved without them).
+    """
+    try:
+        with np.load(path) as data:
+            if "df_counts" not in data:
+                return None
+            df = Counter(dict(zip(data["df_terms"].tolist(), data["df_counts"].tolist())))
+            return DocumentFrequencies(df, data["doc_ids"].tolist())
+    except (OSError, ValueError, KeyError) as e:
+        print("IDF counts load failed:", e)
+        return None
+
+
+def build_idf_model(
+    texts: Iterable[Tuple[str, str]],
+    min_df: int = IDF_MIN_DF
+) -> Optional[IdfModel]:
+    """
+    Streams (doc_id, text) pairs once, counting each term once per document.
+    """
+    counts = DocumentFrequencies()
+    for doc_id, text in texts:
+        counts.add(text, doc_id)
+    return counts.model(min_df)
+
+
+# ============================================================
+# PROCESS-WIDE MODEL
+# ============================================================
+
+_model: Optional[IdfModel] = None
+_model_mtime: Optional[tuple] = None
+_model_lock = threading.Lock()
+
+
+def get_idf_model(path: str = IDF_MODEL_FILE) -> Optional[IdfModel]:
+    """
+    The corpus model, or None until preprocessing has built one.
+    """
+    global _model, _model_mtime
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    mtime = (path, stat.st_mtime_ns, stat.st_size)
+
+    with _model_lock:
+        if mtime != _model_mtime:
+            try:
+                _model = IdfModel.load(path)
+            except (OSError, ValueError, KeyError) as e:
+                print("IDF model load failed:", e)
+                return _model
+            _model_mtime = mtime
+        return _model
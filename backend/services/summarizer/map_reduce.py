@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from services.llm.response_cache import llm_cache
+from services.summarizer.abstractive import explain
+from services.summarizer.segmentation import sent_tokenize
+from utils.deadline import Deadline
+
+# ============================================================
+# MAP-REDUCE SUMMARIZATION
+#
+# Large inputs are split into token-bounded chunks on sentence
+# boundaries, each chunk is explained concurrently (map), and the
+# partial explanations are combined until they fit one prompt (reduce).
+#
+# Chunk boundaries are content-defined: a chunk may close after any
+# sentence whose hash hits BOUNDARY_MODULUS, so an edit only moves the
+# boundaries around it and untouched chunks keep their cache keys.
+# ============================================================
+
+CHUNK_MAX_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "2000"))
+BOUNDARY_MODULUS = 16
+MAP_MAX_WORKERS = int(os.getenv("SUMMARY_MAP_WORKERS", "4"))
+MAX_REDUCE_ROUNDS = 3
+
+CHARS_PER_TOKEN = 4
+DEGRADED_SOURCES = {"fallback", "none"}
+
+
+def _tokens(chars: int) -> int:
+    return max(1, chars // CHARS_PER_TOKEN)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap, tokenizer-free estimate (~4 characters per token)."""
+    return _tokens(len(text))
+
+
+def _is_boundary(sentence: str) -> bool:
+    digest = hashlib.md5(sentence.encode("utf-8")).digest()
+    return digest[0] % BOUNDARY_MODULUS == 0
+
+
+def _joined_length(length: int, part: str) -> int:
+    """Length of a space-joined chunk of `length` chars after appending part."""
+    return length + 1 + len(part) if length else len(part)
+
+
+def _split_oversized(sentence: str, max_tokens: int) -> List[str]:
+    words = sentence.split()
+    pieces, current, length = [], [], 0
+
+    for word in words:
+        if current and _tokens(_joined_length(length, word)) > max_tokens:
+            pieces.append(" ".join(current))
+            current, length = [], 0
+        length = _joined_length(length, word)
+        current.append(word)
+
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_text(text: str, max_tokens: int = CHUNK_MAX_TOKENS) -> List[str]:
+    """
+    Splits text into chunks of at most ~max_tokens, on sentence boundaries.
+    """
+    if not text or not text.strip():
+        return []
+
+    # Boundaries only close chunks of at least a quarter of the budget
+    min_tokens = max(1, max_tokens // 4)
+    chunks, current, length = [], [], 0  # length: chars of " ".join(current)
+
+    def close():
+        nonlocal current, length
+        if current:
+            chunks.append(" ".join(current))
+        current, length = [], 0
+
+    for sentence in sent_tokenize(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+
+        if estimate_tokens(sentence) > max_tokens:
+            close()
+            chunks.extend(_split_oversized(sentence, max_tokens))
+            continue
+
+        # Sized as joined, so separators count against the budget too
+        if _tokens(_joined_length(length, sentence)) > max_tokens:
+            close()
+
+        length = _joined_length(length, sentence)
+        current.append(sentence)
+
+        if _tokens(length) >= min_tokens and _is_boundary(sentence):
+            close()
+
+    close()
+    return chunks
+
+
+# ============================================================
+# MAP
+# ============================================================
+
+def summarize_chunk(chunk: str, mode: str, deadline: Deadline | None = None) -> Dict:
+    """
+    explain() for one chunk, cached by chunk content.
+    """
+    cached = llm_cache.get("chunk_summary", mode, chunk)
+    if cached:
+        return json.loads(cached)
+
+    result = explain(chunk, mode=mode, deadline=deadline)
+    if result.get("source") not in DEGRADED_SOURCES:
+        llm_cache.set("chunk_summary", mode, chunk, json.dumps(result))
+    return result
+
+
+def _map(chunks: List[str], mode: str, deadline: Deadline | None = None) -> List[Dict]:
+    workers = max(1, min(MAP_MAX_WORKERS, len(chunks)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda c: summarize_chunk(c, mode, deadline), chunks))
+
+
+# ============================================================
+# REDUCE
+# ============================================================
+
+def condense(
+    text: str,
+    mode: str,
+    max_tokens: int = CHUNK_MAX_TOKENS,
+    deadline: Deadline | None = None
+) -> Tuple[str, Dict]:
+    """
+    Runs map rounds until the text fits a single prompt.
+
+    Returns the text to explain and map-phase metadata. Short inputs are
+    returned unchanged. Chunks reached after the deadline degrade to
+    their extractive fallback.
+    """
+    meta = {"chunks": 1, "reduce_rounds": 0, "degraded_chunks": 0}
+
+    for _ in range(MAX_REDUCE_ROUNDS):
+        if estimate_tokens(text) <= max_tokens:
+            break
+
+        chunks = chunk_text(text, max_tokens)
+        if len(chunks) <= 1:
+            break
+
+        partials = _map(chunks, mode, deadline)
+
+        if meta["reduce_rounds"] == 0:
+            meta["chunks"] = len(chunks)
+        meta["reduce_rounds"] += 1
+        meta["degraded_chunks"] += sum(
+            1 for p in partials if p.get("source") in DEGRADED_SOURCES
+        )
+
+        text = "\n\n".join(p["text"] for p in partials if p.get("text"))
+
+    return text, meta
+
+
+def summarize_long(
+    text: str,
+    mode: str,
+    max_tokens: int = CHUNK_MAX_TOKENS,
+    deadline: Deadline | None = None
+) -> Dict:
+    """
+    Drop-in replacement for explain() that scales to large documents.
+    """
+    condensed, meta = condense(text, mode, max_tokens, deadline)
+    result = explain(condensed, mode=mode, deadline=deadline)
+
+    if meta["reduce_rounds"]:
+        result = {**result, **meta}
+        if meta["degraded_chunks"]:
+            result["confidence"] = "low"
+
+    return result
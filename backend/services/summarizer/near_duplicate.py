@@ -0,0 +1,182 @@
+import os
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.summarizer.cache_loader import DATA_DIR, JournaledMap
+
+# ============================================================
+# NEAR-DUPLICATE INDEX (MinHash + LSH)
+#
+# doc_id only matches identical normalised text; a re-exported PDF with
+# a new footer hashes differently. Each processed document also gets a
+# MinHash signature over word shingles, kept in minhash_index.json next
+# to index.json (new signatures are appended to a journal, see
+# JournaledMap). Signatures are banded (LSH) so a lookup only compares
+# against documents sharing at least one band.
+#
+# Estimated Jaccard similarity = fraction of equal signature slots.
+# ============================================================
+
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16                      # 16 bands × 4 rows
+SHINGLE_WORDS = 5
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.85"))
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_HASH_BLOCK = 4096
+
+# Fixed seed: signatures must be comparable across processes and restarts
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+
+
+def _shingles(text: str) -> set:
+    words = text.lower().split()
+    if len(words) <= SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+
+    return {
+        " ".join(words[i:i + SHINGLE_WORDS])
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+
+def minhash_signature(text: str) -> Optional[List[int]]:
+    """
+    NUM_PERMUTATIONS-slot MinHash of the text's word shingles.
+
+    Returns None for empty text.
+    """
+    shingles = _shingles(text)
+    if not shingles:
+        return None
+
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+
+    # (a·h + b) mod p, truncated to 32 bits; a, b < 2^31 and h < 2^32
+    # keep every intermediate inside uint64. Blocked to bound memory.
+    signature = np.full(NUM_PERMUTATIONS, _MAX_HASH, dtype=np.uint64)
+    for start in range(0, len(hashes), _HASH_BLOCK):
+        block = hashes[start:start + _HASH_BLOCK]
+        permuted = (np.outer(block, _PERM_A) + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+        np.minimum(signature, permuted.min(axis=0), out=signature)
+
+    return signature.tolist()
+
+
+def similarity(a: List[int], b: List[int]) -> float:
+    return float(np.mean(np.asarray(a) == np.asarray(b)))
+
+
+def _bands(signature: List[int]) -> List[Tuple]:
+    rows = NUM_PERMUTATIONS // LSH_BANDS
+    return [
+        (band, tuple(signature[band * rows:(band + 1) * rows]))
+        for band in range(LSH_BANDS)
+    ]
+
+
+def near_duplicate_path(data_dir: str = DATA_DIR) -> str:
+    return os.path.join(data_dir, "minhash_index.json")
+
+
+class NearDuplicateIndex:
+    """
+    Persistent doc_id → MinHash signature map with in-memory LSH buckets.
+
+    Picks up signatures written by other processes (e.g. preprocessing)
+    on the next lookup.
+    """
+
+    def __init__(self, path: Optional[str] = None, threshold: float = NEAR_DUP_THRESHOLD):
+        self.path = path or near_duplicate_path()
+        self.threshold = threshold
+
+        self._lock = threading.RLock()
+        self._store = JournaledMap(self.path)
+        self._buckets: Dict[Tuple, set] = {}
+
+    @property
+    def _signatures(self) -> Dict[str, List[int]]:
+        return self._store.data
+
+    def _refresh(self, changes: Optional[Tuple[bool, List[str]]] = None) -> None:
+        reloaded, changed = changes or self._store.refresh()
+        if reloaded:
+            self._buckets = {}
+        for doc_id in changed:
+            # A replaced signature may leave stale bands behind; find()
+            # re-scores candidates against the current signature anyway
+            for band in _bands(self._signatures[doc_id]):
+                self._buckets.setdefault(band, set()).add(doc_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._signatures)
+
+    def add(self, doc_id: str, signature: Optional[List[int]]) -> None:
+        if not signature:
+            return
+
+        with self._lock:
+            self._refresh()
+            if self._signatures.get(doc_id) == signature:
+                return
+
+            self._refresh(self._store.put(doc_id, signature))
+
+    def compact(self) -> None:
+        with self._lock:
+            self._refresh(self._store.compact())
+
+    def find(
+        self,
+        signature: Optional[List[int]],
+        exclude: Optional[str] = None
+    ) -> Optional[Tuple[str, float]]:
+        """
+        Most similar indexed document at or above the threshold.
+        """
+        if not signature:
+            return None
+
+        with self._lock:
+            self._refresh()
+            candidates = set()
+            for band in _bands(signature):
+                candidates |= self._buckets.get(band, set())
+            candidates.discard(exclude)
+
+            scored = [
+                (similarity(signature, self._signatures[doc_id]), doc_id)
+                for doc_id in candidates
+            ]
+
+        if not scored:
+            return None
+
+        score, doc_id = max(scored)
+        if score < self.threshold:
+            return None
+        return doc_id, score
+
+
+# Process-wide index used by the summarize route
+near_duplicate_index = NearDuplicateIndex()
+
+
+def remember_signature(doc_id: str, signature: Optional[List[int]]) -> None:
+    try:
+        near_duplicate_index.add(doc_id, signature)
+    except OSError as e:
+        print("Near-duplicate index write-back failed:", e)
@@ -0,0 +1,141 @@
+import os
+import re
+from typing import Callable, Dict, List, Optional
+
+# ============================================================
+# SENTENCE SEGMENTATION
+#
+# Pluggable segmenters, selected by SENTENCE_SEGMENTER:
+#
+# 1️⃣ regex  (default, rule-based, no downloads)
+# 2️⃣ punkt  (NLTK Punkt; model data is fetched on first use only)
+# ============================================================
+
+SENTENCE_SEGMENTER = os.getenv("SENTENCE_SEGMENTER", "regex").lower()
+
+SEGMENTERS: Dict[str, Callable[[str], List[str]]] = {}
+
+
+def register_segmenter(name: str, segment: Callable[[str], List[str]]) -> None:
+    SEGMENTERS[name] = segment
+
+
+# ============================================================
+# REGEX SEGMENTER
+# ============================================================
+
+# Terminal punctuation (+ closing quotes/brackets), whitespace, then
+# something that can start a sentence — or a blank line.
+_BOUNDARY = re.compile(
+    r"[.!?]+[\"'”’)\]]*\s+(?=[\"'“‘(\[]?[A-Z0-9])"
+    r"|\n[ \t]*\n\s*"
+)
+
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc",
+    "e.g", "i.e", "cf", "al", "fig", "figs", "eq", "no", "vol", "ch",
+    "sec", "approx", "inc", "ltd", "co", "u.s", "u.k", "jan", "feb",
+    "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec"
+}
+
+
+def _is_abbreviation(text: str, end: int) -> bool:
+    """
+    True when the '.' at text[end] closes an abbreviation or an initial.
+    """
+    start = end
+    while start > 0 and not text[start - 1].isspace():
+        start -= 1
+
+    word = text[start:end].lstrip("\"'“‘([").lower()
+    if not word:
+        return False
+
+    # Single-letter initials: "J. Smith", "A. thaliana"
+    if len(word) == 1 and word.isalpha():
+        return True
+
+    return word in ABBREVIATIONS
+
+
+def regex_segment(text: str) -> List[str]:
+    sentences = []
+    start = 0
+
+    for match in _BOUNDARY.finditer(text):
+        boundary = match.group()
+        if boundary.startswith(".") and _is_abbreviation(text, match.start()):
+            continue
+
+        # Keep punctuation/closing quotes with the sentence
+        end = match.start() + len(boundary.rstrip())
+        sentence = text[start:end].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+
+    return sentences
+
+
+# ============================================================
+# PUNKT SEGMENTER (optional)
+# ============================================================
+
+_punkt_download_attempted = False
+
+
+def punkt_segment(text: str) -> List[str]:
+    """
+    NLTK Punkt. Model data is downloaded once, on first use, if missing.
+    """
+    global _punkt_download_attempted
+
+    import nltk
+    from nltk.tokenize import sent_tokenize as nltk_sent_tokenize
+
+    try:
+        return nltk_sent_tokenize(text)
+    except LookupError:
+        if _punkt_download_attempted:
+            raise
+        _punkt_download_attempted = True
+        # Newer NLTK releases ship the model as punkt_tab
+        nltk.download("punkt", quiet=True)
+        nltk.download("punkt_tab", quiet=True)
+        return nltk_sent_tokenize(text)
+
+
+register_segmenter("regex", regex_segment)
+register_segmenter("punkt", punkt_segment)
+
+
+# ============================================================
+# PUBLIC API
+# ============================================================
+
+def get_segmenter(name: Optional[str] = None) -> Callable[[str], List[str]]:
+    name = (name or SENTENCE_SEGMENTER).lower()
+    if name not in SEGMENTERS:
+        raise ValueError(f"Unknown sentence segmenter '{name}'")
+    return SEGMENTERS[name]
+
+
+def sent_tokenize(text: str, segmenter: Optional[str] = None) -> List[str]:
+    """
+    Splits text into sentences with the configured segmenter.
+
+    Punkt falls back to the regex segmenter if its model is unavailable.
+    """
+    if not text or not text.strip():
+        return []
+
+    segment = get_segmenter(segmenter)
+    try:
+        return segment(text)
+    except LookupError as e:
+        print("Sentence segmenter unavailable, using regex:", e)
+        return regex_segment(text)
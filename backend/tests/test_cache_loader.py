@@ -0,0 +1,139 @@
+# backend/tests/test_cache_loader.py
+
+import json
+import os
+
+from services.summarizer.cache_loader import DocumentIndex
+
+
+# --------------------------------------------------
+# HELPERS
+# --------------------------------------------------
+
+def _write(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def _write_doc(tmp_path, doc_id, text):
+    processed = tmp_path / f"{doc_id}.json"
+    _write(processed, {"doc_id": doc_id, "summaries": {"basic": {"text": text}}})
+    return str(processed)
+
+
+# --------------------------------------------------
+# TESTS
+# --------------------------------------------------
+
+def test_missing_index_returns_none(tmp_path):
+    index = DocumentIndex(str(tmp_path / "index.json"))
+
+    assert index.get("abc") is None
+    assert len(index) == 0
+
+
+def test_lookup_by_doc_id(tmp_path):
+    index_file = tmp_path / "index.json"
+    _write(index_file, {"abc": {"processed_path": _write_doc(tmp_path, "abc", "hello")}})
+
+    index = DocumentIndex(str(index_file))
+
+    assert index.get("abc")["summaries"]["basic"]["text"] == "hello"
+    assert index.get("missing") is None
+
+
+def test_processed_documents_are_parsed_once(tmp_path):
+    index_file = tmp_path / "index.json"
+    _write(index_file, {"abc": {"processed_path": _write_doc(tmp_path, "abc", "hello")}})
+
+    index = DocumentIndex(str(index_file))
+
+    assert index.get("abc") is index.get("abc")
+
+
+def test_index_reloads_when_file_changes(tmp_path):
+    index_file = tmp_path / "index.json"
+    _write(index_file, {"abc": {"processed_path": _write_doc(tmp_path, "abc", "hello")}})
+
+    index = DocumentIndex(str(index_file))
+    assert index.get("new") is None
+
+    _write(index_file, {
+        "abc": {"processed_path": str(tmp_path / "abc.json")},
+        "new": {"processed_path": _write_doc(tmp_path, "new", "fresh")}
+    })
+    stat = os.stat(index_file)
+    os.utime(index_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert index.get("new")["summaries"]["basic"]["text"] == "fresh"
+
+
+def test_lru_evicts_oldest_document(tmp_path):
+    index_file = tmp_path / "index.json"
+    _write(index_file, {
+        doc_id: {"processed_path": _write_doc(tmp_path, doc_id, doc_id)}
+        for doc_id in ("a", "b", "c")
+    })
+
+    index = DocumentIndex(str(index_file), cache_size=2)
+    first_a = index.get("a")
+    index.get("b")
+    index.get("c")
+
+    assert index.get("a") is not first_a
+
+
+def test_save_summary_round_trip(tmp_path):
+    index = DocumentIndex(str(tmp_path / "index.json"))
+
+    index.save_summary("abc", "basic", {"text": "short", "source": "gpt"})
+    index.save_summary(
+        "abc", "overview", {"text": "big picture", "source": "gpt"},
+        concept_data={"key_concepts": ["ATP"], "source": "openai", "confidence": "high"}
+    )
+
+    reloaded = DocumentIndex(str(tmp_path / "index.json")).get("abc")
+
+    assert reloaded["summaries"]["basic"]["text"] == "short"
+    assert reloaded["summaries"]["overview"]["text"] == "big picture"
+    assert reloaded["concepts"]["list"] == ["ATP"]
+    assert os.path.dirname(index.get_entry("abc")["processed_path"]) == index.processed_dir
+
+
+def test_index_path_does_not_depend_on_cwd(tmp_path, monkeypatch):
+    import importlib
+    from services.summarizer import cache_loader
+
+    monkeypatch.delenv("DOC_INDEX_FILE", raising=False)
+    monkeypatch.delenv("DATA_DIR", raising=False)
+    monkeypatch.chdir(tmp_path)
+    reloaded = importlib.reload(cache_loader)
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    assert reloaded.INDEX_FILE == os.path.join(backend_dir, "data", "index.json")
+
+
+def test_put_entry_appends_to_journal_and_compacts(tmp_path):
+    index_file = tmp_path / "index.json"
+    _write(index_file, {"abc": {"processed_path": "abc.json"}})
+    base_mtime = os.stat(index_file).st_mtime_ns
+
+    writer = DocumentIndex(str(index_file))
+    reader = DocumentIndex(str(index_file))
+    assert len(reader) == 1
+
+    writer.put_entry("abc", {"raw_fingerprint": "raw-abc"})
+    writer.put_entry("def", {"processed_path": "def.json"})
+
+    # index.json untouched; other instances replay the journal tail
+    assert os.stat(index_file).st_mtime_ns == base_mtime
+    assert reader.get_entry("abc") == {"processed_path": "abc.json", "raw_fingerprint": "raw-abc"}
+    assert reader.find_by_raw_fingerprint("raw-abc") == "abc"
+    assert len(reader) == 2
+
+    writer.compact()
+
+    with open(index_file) as f:
+        assert set(json.load(f)) == {"abc", "def"}
+    assert os.path.getsize(tmp_path / "index.journal.jsonl") == 0
+    assert reader.entries() == writer.entries()
@@ -0,0 +1,81 @@
+# backend/tests/test_deadline.py
+
+import pytest
+
+from utils.deadline import Deadline, is_expired
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_timeout_shrinks_to_remaining_budget():
+    clock = FakeClock()
+    deadline = Deadline(10, clock=clock)
+
+    assert deadline.timeout(60) == 10
+    clock.now = 7
+    assert deadline.timeout(60) == 3
+    assert deadline.timeout(1) == 1
+    assert not deadline.expired
+
+    clock.now = 12
+    assert deadline.remaining() == 0.0
+    assert deadline.expired and is_expired(deadline)
+
+
+def test_no_budget_never_expires():
+    for deadline in (Deadline(None), Deadline(0)):
+        assert deadline.remaining() is None
+        assert deadline.timeout(60) == 60
+        assert not deadline.expired
+    assert not is_expired(None)
+
+
+def test_expired_deadline_degrades_explain_without_llm_calls(monkeypatch):
+    pytest.importorskip("dotenv")
+    from services.summarizer import abstractive
+
+    def unexpected(*args, **kwargs):
+        raise AssertionError("LLM called after the deadline")
+
+    monkeypatch.setattr(abstractive.llm_router, "call", unexpected)
+
+    clock = FakeClock()
+    deadline = Deadline(5, clock=clock)
+    clock.now = 6
+
+    result = abstractive.explain("First. Second. Third. Fourth.", "basic", deadline=deadline)
+
+    assert result["source"] == "fallback"
+    assert result["text"].startswith("First")
+
+
+def test_stream_gets_remaining_budget_and_stops_when_it_runs_out(monkeypatch):
+    pytest.importorskip("dotenv")
+    from services.llm.router import LLMRouter
+    from services.summarizer import abstractive
+
+    clock = FakeClock()
+    deadline = Deadline(10, clock=clock)
+    timeouts = []
+
+    def slow_stream(text, mode, timeout=None):
+        timeouts.append(timeout)
+        for word in ("one ", "two ", "three "):
+            clock.now += 6
+            yield word
+
+    monkeypatch.setattr(abstractive, "llm_router", LLMRouter(clock=clock))
+    monkeypatch.setattr(abstractive, "_explain_candidates", lambda *args: [("ollama", None)])
+    monkeypatch.setattr(abstractive, "_stream_ollama", slow_stream)
+
+    events = list(abstractive.explain_stream("Some text.", "basic", deadline=deadline))
+
+    assert timeouts == [10]
+    assert [e["text"] for e in events if e["type"] == "token"] == ["one ", "two "]
+    assert events[-1]["truncated"] and events[-1]["text"] == "one two"
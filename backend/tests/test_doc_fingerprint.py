@@ -0,0 +1,29 @@
+# backend/tests/test_doc_fingerprint.py
+
+import hashlib
+
+from utils.doc_fingerprint import DocFingerprinter, generate_doc_id
+
+
+def _reference_id(text):
+    normalized = " ".join(text.lower().split())
+    return hashlib.sha256(normalized.encode()).hexdigest()[:16]
+
+
+SAMPLE = "  The MITOCHONDRIA\tis the\n\npowerhouse of the CELL.  ΟΔΟΣ ends  "
+
+
+def test_matches_reference_normalization():
+    assert generate_doc_id(SAMPLE) == _reference_id(SAMPLE)
+    assert generate_doc_id("") == _reference_id("")
+    assert generate_doc_id("   \n ") == _reference_id("   \n ")
+
+
+def test_any_chunking_gives_same_id():
+    expected = _reference_id(SAMPLE)
+
+    for size in range(1, len(SAMPLE) + 1):
+        fingerprinter = DocFingerprinter()
+        for i in range(0, len(SAMPLE), size):
+            fingerprinter.update(SAMPLE[i:i + size])
+        assert fingerprinter.hexdigest() == expected, size
@@ -0,0 +1,149 @@
+# backend/tests/test_extractive.py
+
+import re
+
+import numpy as np
+import pytest
+
+from services.summarizer import extractive
+from services.summarizer.extractive import _select_top, extractive_summary, extractive_summary_batch
+
+
+def _split_sentences(text):
+    return [s for s in re.split(r"(?<=[.!?])\s+", text) if s]
+
+
+DOCS = [
+    "Enzymes speed up reactions in the cell. "
+    "Each enzyme binds a specific substrate at its active site. "
+    "Temperature and pH change how fast enzymes work. "
+    "Denatured enzymes lose the shape of their active site. "
+    "Inhibitors compete with the substrate for the active site. "
+    "Cofactors help some enzymes bind their substrate.",
+    "Short text with only one sentence here.",
+    "Glucose is broken down during glycolysis in the cytoplasm. "
+    "Pyruvate then enters the mitochondria for further oxidation. "
+    "The Krebs cycle releases carbon dioxide as a waste product. "
+    "Electron transport builds a proton gradient across the membrane. "
+    "ATP synthase uses the gradient to make most of the ATP."
+]
+
+
+def test_select_top_matches_stable_ranking_on_ties():
+    scores = np.array([0.5, 0.9, 0.5, 0.5, 0.1])
+
+    for k in range(1, 5):
+        stable = sorted(np.argsort(scores, kind="stable")[::-1][:k].tolist())
+        assert _select_top(scores, k).tolist() == stable
+    assert _select_top(scores, 2).tolist() == [1, 3]
+    assert _select_top(scores, 9).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_batch_matches_single_document(monkeypatch):
+    monkeypatch.setattr(extractive, "sent_tokenize", _split_sentences)
+
+    batch = extractive_summary_batch(DOCS)
+
+    assert batch == [extractive_summary(doc) for doc in DOCS]
+    assert batch[1] == DOCS[1]
+    assert extractive_summary_batch(["", "   "]) == ["", ""]
+
+
+def test_corpus_idf_model_round_trip(tmp_path, monkeypatch):
+    from services.summarizer import idf_model
+
+    model = idf_model.build_idf_model((str(i), doc) for i, doc in enumerate(DOCS))
+    path = str(tmp_path / "idf_model.npz")
+    model.save(path)
+
+    loaded = idf_model.get_idf_model(path)
+    assert loaded.vocabulary == model.vocabulary
+    assert loaded.n_docs == len(DOCS)
+    assert np.allclose(loaded.idf, model.idf)
+
+    # Corpus-idf scoring: one score per sentence
+    monkeypatch.setattr(extractive, "sent_tokenize", _split_sentences)
+    monkeypatch.setattr(extractive, "get_idf_model", lambda: loaded)
+
+    summary = extractive_summary(DOCS[0])
+    assert summary and summary != DOCS[0]
+    assert extractive_summary_batch(DOCS) == [extractive_summary(doc) for doc in DOCS]
+
+
+def test_terms_outside_corpus_still_score():
+    from services.summarizer import idf_model
+
+    model = idf_model.build_idf_model((str(i), doc) for i, doc in enumerate(DOCS))
+    sentences = _split_sentences(
+        "Medieval castles guarded river crossings and trade routes. "
+        "Stone keeps replaced wooden towers after frequent sieges. "
+        "Moats and drawbridges slowed attackers approaching the walls. "
+        "Garrisons stored grain to survive months of blockade. "
+        "Knights trained squires inside the castle courtyard."
+    )
+    assert not set(model.vocabulary) & {
+        w.lower().strip(".") for s in sentences for w in s.split()
+    }
+
+    corpus = extractive._block_scores([sentences], "tfidf", model)[0]
+    per_document = extractive._block_scores([sentences], "tfidf")[0]
+
+    assert (corpus > 0.5).all()
+    assert np.allclose(corpus / corpus.max(), per_document / per_document.max(), atol=0.1)
+
+
+def test_idf_counts_update_incrementally(tmp_path):
+    from services.summarizer import idf_model
+
+    path = str(tmp_path / "idf_model.npz")
+    idf_model.build_idf_model((str(i), doc) for i, doc in enumerate(DOCS[:2])).save(path)
+
+    counts = idf_model.load_document_frequencies(path)
+    assert counts.add(DOCS[2], "2")
+    assert not counts.add(DOCS[0], "0")  # already counted
+
+    full = idf_model.build_idf_model((str(i), doc) for i, doc in enumerate(DOCS))
+    incremental = counts.model()
+    assert incremental.vocabulary == full.vocabulary
+    assert incremental.n_docs == full.n_docs == len(DOCS)
+    assert np.allclose(incremental.idf, full.idf)
+
+
+def test_graph_scorers_select_from_document(monkeypatch):
+    monkeypatch.setattr(extractive, "sent_tokenize", _split_sentences)
+    sentences = _split_sentences(DOCS[0])
+
+    for scorer in ("centroid", "textrank"):
+        picked = _split_sentences(extractive_summary(DOCS[0], corpus_idf=False, scorer=scorer))
+        assert picked and set(picked) <= set(sentences)
+
+    with pytest.raises(ValueError):
+        extractive_summary(DOCS[0], scorer="lexrank")
+
+
+def test_idf_model_path_does_not_depend_on_cwd(tmp_path, monkeypatch):
+    import importlib
+    import os
+    from services.summarizer import idf_model
+
+    monkeypatch.delenv("IDF_MODEL_FILE", raising=False)
+    monkeypatch.delenv("DATA_DIR", raising=False)
+    monkeypatch.chdir(tmp_path)
+    reloaded = importlib.reload(idf_model)
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    assert reloaded.IDF_MODEL_FILE == os.path.join(backend_dir, "data", "idf_model.npz")
+
+
+def test_approximate_similarity_graph_finds_duplicates():
+    from scipy import sparse
+
+    rng = np.random.RandomState(3)
+    base = sparse.random(200, 500, density=0.02, format="csr", random_state=rng)
+    base = sparse.csr_matrix(base.multiply(1 / np.sqrt(base.multiply(base).sum(axis=1))))
+    matrix = sparse.vstack([base, base]).tocsr()  # sentence i repeats as i + 200
+
+    graph = extractive._approximate_similarity_graph(matrix, 3)
+
+    assert (np.diff(graph.indptr) <= 3).all()
+    assert all(graph[i, i + 200] > 0.99 for i in range(200))
@@ -0,0 +1,134 @@
+# backend/tests/test_llm_router.py
+
+import threading
+import time
+
+import pytest
+
+from services.llm.router import CLOSED, HALF_OPEN, OPEN, LLMRouter, ProvidersExhausted
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _fail():
+    raise RuntimeError("boom")
+
+
+def test_breaker_opens_skips_and_recovers_after_cooldown():
+    clock = FakeClock()
+    router = LLMRouter(hedge_after=0, clock=clock, failure_threshold=2, cooldown=30)
+    calls = []
+
+    def primary():
+        calls.append("primary")
+        raise RuntimeError("down")
+
+    for _ in range(2):
+        assert router.call([("a", primary), ("b", lambda: "ok")]) == ("b", "ok")
+    assert router.health("a").state == OPEN
+
+    # Open circuit: primary is not called at all
+    assert router.call([("a", primary), ("b", lambda: "ok")]) == ("b", "ok")
+    assert calls == ["primary", "primary"]
+
+    # After the cooldown a single probe is let through and closes the circuit
+    clock.now = 31
+    assert router.health("a").state == HALF_OPEN
+    assert router.call([("a", lambda: "back")]) == ("a", "back")
+    assert router.health("a").state == CLOSED
+
+
+def test_routes_to_fastest_provider_once_sampled():
+    clock = FakeClock()
+    router = LLMRouter(hedge_after=0, clock=clock, min_samples=2)
+
+    for name, latency in (("slow", 5.0), ("fast", 0.5)):
+        for _ in range(2):
+            health = router.health(name)
+            health.record_success(latency)
+
+    # Sampled providers swap places; the unsampled one keeps its slot
+    assert router.order(["slow", "fast", "new"]) == ["fast", "slow", "new"]
+    assert router.order(["slow", "new", "fast"]) == ["fast", "new", "slow"]
+    assert router.order(["x", "y"]) == ["x", "y"]
+
+
+def test_hedges_slow_primary_and_rejects_do_not_trip_breaker():
+    router = LLMRouter(hedge_after=0.05, hedge_min=0.0)
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        return "slow"
+
+    try:
+        assert router.call([("slow", slow), ("fast", lambda: "fast")]) == ("fast", "fast")
+    finally:
+        release.set()
+
+    with pytest.raises(ProvidersExhausted) as exc:
+        router.call([("empty", lambda: ""), ("broken", _fail)], accept=bool)
+
+    assert exc.value.errors["empty"] == "rejected"
+    assert router.health("empty").snapshot()["error_rate"] == 0.0
+    assert router.health("broken").snapshot()["error_rate"] == 1.0
+
+    # Rejected results are not latency samples either
+    assert router.health("empty").snapshot()["p50"] is None
+
+
+def test_rejected_half_open_probe_is_released():
+    clock = FakeClock()
+    router = LLMRouter(hedge_after=0, clock=clock, failure_threshold=1, cooldown=30)
+    router.call([("a", _fail), ("b", lambda: "ok")])
+    clock.now = 31
+
+    with pytest.raises(ProvidersExhausted):
+        router.call([("a", lambda: "")], accept=bool)
+
+    assert router.call([("a", lambda: "back")]) == ("a", "back")
+    assert router.health("a").state == CLOSED
+
+
+def test_no_hedging_once_half_the_workers_are_busy():
+    router = LLMRouter(hedge_after=0.02, hedge_min=0.0, max_workers=2)
+    release = threading.Event()
+    hedged = []
+
+    def primary():
+        time.sleep(0.2)
+        return "primary"
+
+    def hedge():
+        hedged.append(1)
+        return "hedge"
+
+    try:
+        # e.g. an abandoned call still holding a worker
+        busy = router._submit("other", lambda: release.wait(5), None)
+        result = router.call([("primary", primary), ("hedge", hedge)])
+    finally:
+        release.set()
+    busy.result()
+
+    assert result == ("primary", "primary")
+    assert hedged == []
+
+
+def test_stream_outcomes_feed_breaker_and_latency():
+    clock = FakeClock()
+    router = LLMRouter(clock=clock, failure_threshold=1, min_samples=1)
+
+    assert router.health("s").acquire()
+    router.record("s", clock(), True)
+    assert router.health("s").latency(0.5) == 0.0
+
+    router.record("s", clock(), False)
+    assert router.health("s").state == OPEN
+    assert not router.health("s").acquire()
@@ -0,0 +1,99 @@
+# backend/tests/test_map_reduce.py
+
+import re
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from services.llm.response_cache import ResponseCache
+from services.summarizer import map_reduce
+from services.summarizer.map_reduce import chunk_text, condense, estimate_tokens, summarize_chunk
+
+
+def _split_sentences(text):
+    return [s for s in re.split(r"(?<=[.!?])\s+", text) if s]
+
+
+def _document(n, edited=None):
+    sentences = [
+        f"Sentence {i} describes step {i * 7 % 13} of the process in some detail."
+        + " It adds context." * (i % 4)
+        for i in range(n)
+    ]
+    if edited is not None:
+        sentences[edited] = "This sentence was rewritten by the author after review."
+    return " ".join(sentences)
+
+
+@pytest.fixture
+def stub_explain(monkeypatch):
+    """explain() stub: keeps a chunk's first sentence; "FAIL" chunks degrade."""
+    calls = []
+
+    def explain(text, mode, deadline=None):
+        calls.append(text)
+        source = "fallback" if "FAIL" in text else "gemini"
+        return {"text": _split_sentences(text)[0], "source": source, "confidence": "high"}
+
+    monkeypatch.setattr(map_reduce, "sent_tokenize", _split_sentences)
+    monkeypatch.setattr(map_reduce, "llm_cache", ResponseCache(backend=None))
+    monkeypatch.setattr(map_reduce, "explain", explain)
+    return calls
+
+
+def test_chunks_stay_within_token_bound(monkeypatch):
+    monkeypatch.setattr(map_reduce, "sent_tokenize", _split_sentences)
+    text = _document(300) + " " + "oversized " * 400 + "end."
+
+    for max_tokens in (40, 120, 500):
+        chunks = chunk_text(text, max_tokens)
+        assert chunks
+        assert all(estimate_tokens(chunk) <= max_tokens for chunk in chunks)
+        assert " ".join(chunks).split() == text.split()
+
+
+def test_boundaries_survive_an_earlier_edit(monkeypatch):
+    monkeypatch.setattr(map_reduce, "sent_tokenize", _split_sentences)
+
+    original = chunk_text(_document(400), 500)
+    edited = chunk_text(_document(400, edited=3), 500)
+
+    # Only the chunks around the edit change; later ones keep their text
+    # (and so their cache keys)
+    assert len(original) > 10
+    assert original[0] != edited[0]
+    assert len(set(original) - set(edited)) <= 2
+    assert original[-5:] == edited[-5:]
+
+
+def test_condense_counts_rounds_and_degraded_chunks(stub_explain):
+    text = _document(200)
+    text = text.replace("Sentence 5 ", "FAIL Sentence 5 ")
+
+    condensed, meta = condense(text, "basic", max_tokens=120)
+
+    assert meta["chunks"] == len(chunk_text(text, 120))
+    assert meta["reduce_rounds"] == 2
+    assert meta["degraded_chunks"] >= 1
+    assert estimate_tokens(condensed) <= 120
+
+    short, meta = condense("Short input.", "basic", max_tokens=120)
+    assert short == "Short input."
+    assert meta == {"chunks": 1, "reduce_rounds": 0, "degraded_chunks": 0}
+
+
+def test_summarize_chunk_reuses_cache_by_content(stub_explain):
+    chunk = "Cells divide by mitosis. Each daughter cell gets a copy."
+
+    first = summarize_chunk(chunk, "basic")
+    assert summarize_chunk(chunk, "basic") == first
+    assert len(stub_explain) == 1
+
+    summarize_chunk(chunk, "detailed")  # different mode, different entry
+    assert len(stub_explain) == 2
+
+    # Degraded results are never cached
+    summarize_chunk("FAIL " + chunk, "basic")
+    summarize_chunk("FAIL " + chunk, "basic")
+    assert len(stub_explain) == 4
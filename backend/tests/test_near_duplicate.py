@@ -0,0 +1,49 @@
+# backend/tests/test_near_duplicate.py
+
+from services.summarizer.near_duplicate import NearDuplicateIndex, minhash_signature
+
+LECTURE = " ".join(
+    f"Section {i}: enzymes lower the activation energy of reaction {i} "
+    f"and are not consumed by the reaction they catalyse."
+    for i in range(60)
+)
+
+
+def test_reexport_with_new_footer_is_found(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "minhash_index.json"), threshold=0.8)
+    index.add("lecture", minhash_signature(LECTURE + " Page footer: Spring 2023"))
+
+    match = index.find(minhash_signature(LECTURE + " Page footer: Fall 2024 (revised)"))
+
+    assert match is not None
+    assert match[0] == "lecture"
+    assert match[1] >= 0.8
+
+
+def test_unrelated_document_is_not_matched(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "minhash_index.json"), threshold=0.8)
+    index.add("lecture", minhash_signature(LECTURE))
+
+    other = "The French Revolution began in 1789 and reshaped European politics. " * 20
+
+    assert index.find(minhash_signature(other)) is None
+
+
+def test_signatures_persist_across_instances(tmp_path):
+    path = str(tmp_path / "minhash_index.json")
+    NearDuplicateIndex(path).add("lecture", minhash_signature(LECTURE))
+
+    reloaded = NearDuplicateIndex(path)
+
+    assert len(reloaded) == 1
+    assert reloaded.find(minhash_signature(LECTURE)) == ("lecture", 1.0)
+
+
+def test_signatures_from_other_writers_are_picked_up(tmp_path):
+    path = str(tmp_path / "minhash_index.json")
+    reader = NearDuplicateIndex(path)
+    assert reader.find(minhash_signature(LECTURE)) is None
+
+    NearDuplicateIndex(path).add("lecture", minhash_signature(LECTURE))
+
+    assert reader.find(minhash_signature(LECTURE)) == ("lecture", 1.0)
@@ -0,0 +1,185 @@
+# backend/tests/test_ollama_async.py
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("dotenv")
+
+from services.llm.ollama_async import AsyncOllamaClient, OllamaError, generate_sync, stream_sync
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    """
+    Minimal /api/generate: echoes the prompt, word by word when streaming.
+    Prompts starting with "slow" wait SLOW seconds per word / response.
+    """
+
+    SLOW = 0.3
+
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+    payloads = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        cls = type(self)
+        with cls.lock:
+            cls.payloads.append(payload)
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            time.sleep(0.05)
+            self._respond(payload)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def _respond(self, payload):
+        if payload["model"] != "stub":
+            self._send(404, {"error": f"model '{payload['model']}' not found"})
+            return
+
+        delay = self.SLOW if payload["prompt"].startswith("slow") else 0
+
+        if not payload["stream"]:
+            time.sleep(delay)
+            self._send(200, {"response": f" echo: {payload['prompt']} ", "done": True})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        for word in payload["prompt"].split():
+            time.sleep(delay)
+            self.wfile.write(json.dumps({"response": word + " ", "done": False}).encode() + b"\n")
+        self.wfile.write(json.dumps({"response": "", "done": True}).encode() + b"\n")
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def ollama_url():
+    StubOllama.active = StubOllama.max_active = 0
+    StubOllama.payloads = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_generate_pins_model_and_bounds_concurrency(ollama_url):
+    client = AsyncOllamaClient(ollama_url, "stub", parallel=2, keep_alive="10m")
+
+    async def run():
+        try:
+            return await client.generate_many([f"p{i}" for i in range(6)])
+        finally:
+            await client.aclose()
+
+    results = asyncio.run(run())
+
+    assert results == [f"echo: p{i}" for i in range(6)]
+    assert StubOllama.max_active <= 2
+    assert all(p["keep_alive"] == "10m" and p["model"] == "stub" for p in StubOllama.payloads)
+
+
+def test_stream_sync_yields_tokens_in_order(ollama_url):
+    client = AsyncOllamaClient(ollama_url, "stub")
+
+    pieces = list(stream_sync("cell membrane transport", client=client))
+
+    assert pieces == ["cell ", "membrane ", "transport "]
+
+
+def test_errors_are_structured(ollama_url):
+    async def run(client):
+        try:
+            await client.generate("hi")
+        finally:
+            await client.aclose()
+
+    with pytest.raises(OllamaError) as missing_model:
+        asyncio.run(run(AsyncOllamaClient(ollama_url, "missing")))
+    assert missing_model.value.kind == "model"
+    assert missing_model.value.status == 404
+    assert "not found" in str(missing_model.value)
+
+    with pytest.raises(OllamaError) as unreachable:
+        asyncio.run(run(AsyncOllamaClient("http://127.0.0.1:9", "stub", timeout=2)))
+    assert unreachable.value.kind == "connect"
+    assert unreachable.value.retryable
+
+    with pytest.raises(OllamaError) as unconfigured:
+        asyncio.run(run(AsyncOllamaClient(None, None)))
+    assert unconfigured.value.kind == "config"
+
+
+def test_closing_stream_sync_cancels_the_request(ollama_url):
+    client = AsyncOllamaClient(ollama_url, "stub", parallel=1)
+    words = " ".join(["slow"] * 20)  # ~6s if streamed to the end
+
+    pieces = stream_sync(words, client=client)
+    assert next(pieces) == "slow "
+    pieces.close()
+
+    # The only slot is free again: a second request is not stuck behind the stream
+    assert generate_sync("after", timeout=2, client=client) == "echo: after"
+
+
+def test_timeouts_are_translated(ollama_url):
+    async def run(client, call):
+        try:
+            return await call(client)
+        finally:
+            await client.aclose()
+
+    async def consume(client):
+        return [piece async for piece in client.stream("slow slow slow")]
+
+    # Whole-call budget (asyncio.wait_for)
+    with pytest.raises(OllamaError) as budget:
+        asyncio.run(run(
+            AsyncOllamaClient(ollama_url, "stub"),
+            lambda client: client.generate("slow", timeout=0.1)
+        ))
+    assert budget.value.kind == "timeout"
+    assert budget.value.retryable
+
+    # httpx read timeout while streaming
+    with pytest.raises(OllamaError) as read:
+        asyncio.run(run(AsyncOllamaClient(ollama_url, "stub", timeout=0.1), consume))
+    assert read.value.kind == "timeout"
+
+
+def test_semaphore_bounds_concurrent_streams(ollama_url):
+    client = AsyncOllamaClient(ollama_url, "stub", parallel=1)
+    results = {}
+
+    def consume(i):
+        results[i] = "".join(stream_sync(f"slow {i}", client=client))
+
+    threads = [threading.Thread(target=consume, args=(i,)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert results == {i: f"slow {i} " for i in range(3)}
+    assert StubOllama.max_active == 1
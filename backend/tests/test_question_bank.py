@@ -0,0 +1,101 @@
+# backend/tests/test_question_bank.py
+
+from services.question_bank import MemoryQuestionStore, QuestionBank
+
+
+def _mcq(concept, source="llm_batch", variant=0):
+    return {
+        "question": f"Which term matches {concept}? (variant {variant})",
+        "options": [concept, "alpha", "beta", "gamma"],
+        "answer": concept,
+        "difficulty": "beginner",
+        "source": source
+    }
+
+
+def test_draw_serves_stored_mcqs_once_per_user():
+    bank = QuestionBank(MemoryQuestionStore())
+    slot = ("osmosis", "beginner")
+
+    bank.add("doc", [(*slot, _mcq("osmosis")), (*slot, _mcq("osmosis", variant=1))])
+
+    first, _ = bank.draw("doc", [slot], user_id="u1")
+    bank.mark_served("u1", "doc", first)
+    second, low = bank.draw("doc", [slot], user_id="u1")
+    bank.mark_served("u1", "doc", second)
+    third, _ = bank.draw("doc", [slot], user_id="u1")
+
+    assert first[0]["source"] == "bank"
+    assert first[0]["bank_id"] != second[0]["bank_id"]
+    assert sorted(first[0]["options"]) == sorted(_mcq("osmosis")["options"])
+    assert low == [slot]
+    assert third == [None]
+
+    # Another user still gets the stored questions
+    other, _ = bank.draw("doc", [slot], user_id="u2")
+    assert other[0] is not None
+
+
+def test_template_fallbacks_are_not_banked():
+    bank = QuestionBank(MemoryQuestionStore())
+    template = _mcq("osmosis", source="template")
+
+    stored = bank.add("doc", [("osmosis", "beginner", template)])
+
+    assert stored == 0
+    assert "bank_id" not in template
+    assert bank.draw("doc", [("osmosis", "beginner")])[0] == [None]
+
+
+def test_repeated_question_text_is_stored_once():
+    bank = QuestionBank(MemoryQuestionStore())
+    slot = ("osmosis", "beginner")
+    first = _mcq("osmosis")
+
+    assert bank.add("doc", [(*slot, first)]) == 1
+
+    # e.g. a provider replaying the same MCQ for a top-up
+    replay = {**_mcq("osmosis"), "question": "  which TERM matches osmosis? (variant 0)"}
+    again = [replay, _mcq("osmosis", variant=1), _mcq("osmosis", variant=1)]
+    assert bank.add("doc", [(*slot, mcq) for mcq in again]) == 1
+
+    assert replay["bank_id"] == first["bank_id"]
+    assert len(bank.store.questions("doc")) == 2
+
+
+def test_refill_runs_once_per_document_and_banks_results():
+    bank = QuestionBank(MemoryQuestionStore())
+    slots = [("osmosis", "beginner"), ("diffusion", "advanced")]
+    queued = []
+
+    assert bank.schedule_refill("doc", slots, lambda s: [_mcq(c) for c, _ in s], queued.append)
+    assert not bank.schedule_refill("doc", slots, lambda s: [], queued.append)
+
+    assert queued[0]() == 2
+    drawn, _ = bank.draw("doc", slots)
+    assert all(mcq is not None for mcq in drawn)
+
+    # Finished refill releases the document
+    assert bank.schedule_refill("doc", slots, lambda s: [], queued.append)
+
+
+def test_memory_store_is_bounded():
+    store = MemoryQuestionStore(max_per_doc=3, max_docs=2, max_served=2)
+    item = {"concept": "osmosis", "difficulty": "beginner", "mcq": {}, "validated": True}
+
+    ids = store.add("doc", [item] * 5)
+    assert [q["id"] for q in store.questions("doc")] == ids[-3:]  # oldest evicted
+
+    store.add("other", [item])
+    store.questions("doc")  # "doc" is now the most recently used
+    store.add("third", [item])
+    assert store.questions("other") == []
+    assert len(store.questions("doc")) == 3
+
+    store.mark_served("u1", "doc", ids)
+    assert store.served_ids("u1", "doc") == set(ids[-3:])
+
+    store.mark_served("u2", "doc", ids[:1])
+    store.mark_served("u3", "doc", ids[:1])
+    assert store.served_ids("u1", "doc") == set()  # least recently used set evicted
+    assert store.served_ids("u3", "doc") == {ids[0]}
@@ -0,0 +1,203 @@
+# backend/tests/test_quiz_generator.py
+
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from services import quiz_generator
+from services.llm.response_cache import ResponseCache
+from services.quiz_generator import (
+    LLMCallStats,
+    generate_mcqs_batched,
+    generate_mcqs_concurrently,
+    llm_generate_mcq_batch
+)
+from utils.deadline import Deadline
+
+CONCEPTS = ["osmosis", "diffusion", "mitosis", "meiosis"]
+SUMMARY = "Cells move water by osmosis and divide by mitosis or meiosis."
+
+
+def _mcq(concept, answer=None, **extra):
+    return {
+        "question": f"Which process is {concept}?",
+        "options": [concept, "alpha", "beta", "gamma"],
+        "answer": answer or concept,
+        **extra
+    }
+
+
+class FakeGroq:
+    """
+    chat.completions.create stub: `respond(prompt)` returns the JSON
+    payload (or raises); every call reports 10 + 5 tokens.
+    """
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.prompts = []
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, messages, **kwargs):
+        prompt = messages[0]["content"]
+        with self._lock:
+            self.prompts.append(prompt)
+        content = json.dumps(self.respond(prompt))
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5)
+        )
+
+
+def _single_topic(prompt):
+    match = re.search(r"Topic MUST be exactly: (.+)", prompt)
+    return match.group(1).strip() if match else None
+
+
+@pytest.fixture
+def groq(monkeypatch):
+    """Installs a FakeGroq (Groq only: no Mistral / Ollama, fresh cache)."""
+    def install(respond):
+        fake = FakeGroq(respond)
+        monkeypatch.setattr(quiz_generator, "get_groq_client", lambda: fake)
+        monkeypatch.setattr(quiz_generator, "get_mistral_client", lambda: None)
+        monkeypatch.setattr(quiz_generator, "ollama", SimpleNamespace(configured=False))
+        monkeypatch.setattr(quiz_generator, "llm_cache", ResponseCache(backend=None))
+        return fake
+    return install
+
+
+def _partly_valid_batch(prompt):
+    """
+    Batch: items out of order, one wrong answer, one missing.
+    Single: valid for diffusion, still wrong for meiosis.
+    """
+    topic = _single_topic(prompt)
+    if topic is None:
+        return {"questions": [
+            {"index": 2, **_mcq("mitosis")},
+            {"index": 0, **_mcq("osmosis")},
+            {"index": 1, **_mcq("diffusion", answer="osmosis")},
+        ]}
+    if topic == "diffusion":
+        return _mcq("diffusion")
+    return _mcq(topic, answer="not the topic")
+
+
+def test_batch_maps_items_by_index_and_validates_each(groq):
+    groq(_partly_valid_batch)
+
+    results = llm_generate_mcq_batch(CONCEPTS, "beginner", SUMMARY)
+
+    assert [r and r["answer"] for r in results] == ["osmosis", None, "mitosis", None]
+    assert all(r["source"] == "llm_batch" for r in results if r)
+    assert sorted(results[2]["options"]) == sorted(_mcq("mitosis")["options"])
+
+
+def test_batched_generation_retries_failures_singly_in_order(groq):
+    fake = groq(_partly_valid_batch)
+    stats = LLMCallStats()
+
+    quiz, retried = generate_mcqs_batched({"beginner": CONCEPTS}, SUMMARY, stats)
+
+    assert retried == 2
+    assert [m["answer"] for m in quiz["beginner"]] == CONCEPTS
+    assert [m["source"] for m in quiz["beginner"]] == [
+        "llm_batch", "llm_single", "llm_batch", "template"
+    ]
+    assert sorted(map(_single_topic, fake.prompts[1:])) == ["diffusion", "meiosis"]
+    assert stats.as_dict() == {
+        "calls": 3, "prompt_tokens": 30, "completion_tokens": 15, "total_tokens": 45
+    }
+
+
+def test_concurrent_results_keep_slot_order_and_survive_a_failure(groq):
+    def respond(prompt):
+        topic = _single_topic(prompt)
+        # Earlier slots finish last
+        time.sleep(0.05 * (len(CONCEPTS) - CONCEPTS.index(topic)))
+        if topic == "diffusion":
+            raise RuntimeError("provider error")
+        return _mcq(topic)
+
+    groq(respond)
+    slots = [(concept, "beginner") for concept in CONCEPTS]
+
+    mcqs = generate_mcqs_concurrently(slots, SUMMARY, max_workers=4)
+
+    assert [m["answer"] for m in mcqs] == CONCEPTS
+    assert [m["source"] for m in mcqs] == ["llm_single", "template", "llm_single", "llm_single"]
+
+
+def test_no_provider_slot_within_the_deadline_falls_back(groq, monkeypatch):
+    fake = groq(lambda prompt: _mcq(_single_topic(prompt)))
+    slot = threading.BoundedSemaphore(1)
+    monkeypatch.setitem(quiz_generator._provider_slots, "groq", slot)
+
+    slot.acquire()  # every slot busy with other quizzes
+    try:
+        mcqs = generate_mcqs_concurrently(
+            [("osmosis", "beginner")], SUMMARY, deadline=Deadline(0.7)
+        )
+    finally:
+        slot.release()
+
+    assert mcqs[0]["source"] == "template"
+    assert mcqs[0]["answer"] == "osmosis"
+    assert fake.prompts == []
+
+
+def test_quiz_is_served_from_the_bank_and_refilled(monkeypatch):
+    from services.question_bank import MemoryQuestionStore, QuestionBank
+
+    concepts = [f"concept {i}" for i in range(15)]
+    generated, queued = [], []
+
+    def generate(slots, summary, batch=True, stats=None, deadline=None, use_cache=True):
+        generated.append((len(slots), use_cache))
+        return [
+            _mcq(concept, source="llm_batch", question=f"{concept}, variant {len(generated)}?")
+            for concept, _ in slots
+        ], 0
+
+    monkeypatch.setattr(quiz_generator, "get_concepts_adaptive", lambda summary, deadline=None: concepts)
+    monkeypatch.setattr(quiz_generator, "generate_mcqs_for_slots", generate)
+    monkeypatch.setattr(quiz_generator.refill_jobs, "submit", queued.append)
+    bank = QuestionBank(MemoryQuestionStore())
+
+    def quiz(user_id):
+        result = quiz_generator.generate_quiz_from_summary(SUMMARY, user_id=user_id, bank=bank)
+        mcqs = [mcq for level in result["quiz"].values() for mcq in level]
+        return mcqs, result["meta"]["question_bank"]
+
+    # 1️⃣ Empty bank: every slot topped up (fresh, uncached) and banked
+    first, meta = quiz("u1")
+    assert meta == {"enabled": True, "served": 0, "generated": 15, "refill_queued": False}
+    assert [m["answer"] for m in first] == concepts
+    assert generated == [(15, False)]
+
+    # 2️⃣ Another user draws the banked MCQs; the drained slots are refilled
+    second, meta = quiz("u2")
+    assert meta == {"enabled": True, "served": 15, "generated": 0, "refill_queued": True}
+    assert [m["answer"] for m in second] == concepts
+    assert all(m["source"] == "bank" for m in second)
+    assert {m["bank_id"] for m in second} == {m["bank_id"] for m in first}
+    assert bank.store.served_ids("u2", quiz_generator.generate_doc_id(SUMMARY)) == {
+        m["bank_id"] for m in second
+    }
+
+    assert len(queued) == 1
+    assert queued[0]() == 15
+    assert generated[-1] == (15, False)
+
+    # 3️⃣ u2 gets the refilled variants, never the ones already served
+    third, meta = quiz("u2")
+    assert meta["served"] == 15
+    assert not {m["bank_id"] for m in third} & {m["bank_id"] for m in second}
@@ -0,0 +1,68 @@
+# backend/tests/test_quiz_jobs.py
+
+import threading
+
+from services.quiz_jobs import JobQueue
+
+
+def _wait_finished(queue, job_id, timeout=5.0):
+    for _ in range(int(timeout / 0.01)):
+        job = queue.get(job_id)
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_submit_returns_immediately_and_reports_result():
+    queue = JobQueue(max_workers=1)
+    release = threading.Event()
+
+    job_id = queue.submit(lambda: release.wait(5) and {"quiz_id": "q1"}, job_id="q1")
+
+    assert job_id == "q1"
+    assert queue.get(job_id)["status"] in ("queued", "running")
+
+    release.set()
+    job = _wait_finished(queue, job_id)
+
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"quiz_id": "q1"}
+    queue.shutdown()
+
+
+def test_failure_is_captured():
+    queue = JobQueue(max_workers=1)
+
+    def boom():
+        raise RuntimeError("no provider")
+
+    job = _wait_finished(queue, queue.submit(boom))
+
+    assert job["status"] == "failed"
+    assert job["error"] == "no provider"
+    queue.shutdown()
+
+
+def test_finished_jobs_expire():
+    queue = JobQueue(max_workers=1, ttl=-1)
+
+    job_id = queue.submit(lambda: 42)
+    queue.shutdown(wait=True)
+
+    assert queue.get(job_id) is None
+    assert queue.get("missing") is None
+
+
+def test_busy_refill_queue_does_not_delay_quiz_jobs():
+    from services.quiz_jobs import quiz_jobs, refill_jobs
+
+    release = threading.Event()
+    refill_ids = [refill_jobs.submit(release.wait, 5) for _ in range(8)]
+    try:
+        job = _wait_finished(quiz_jobs, quiz_jobs.submit(lambda: "quiz"), timeout=1.0)
+        assert job["result"] == "quiz"
+    finally:
+        release.set()
+    for job_id in refill_ids:
+        _wait_finished(refill_jobs, job_id)
@@ -0,0 +1,128 @@
+# backend/tests/test_response_cache.py
+
+import time
+
+from services.llm.response_cache import (
+    ResponseCache,
+    SQLiteCacheBackend,
+    MemoryLRUBackend,
+    make_cache_key
+)
+
+
+# --------------------------------------------------
+# FIXTURES
+# --------------------------------------------------
+
+def _cache(tmp_path, **kwargs):
+    backend = SQLiteCacheBackend(str(tmp_path / "llm_cache.sqlite3"))
+    return ResponseCache(backend=backend, **kwargs)
+
+
+# --------------------------------------------------
+# TESTS
+# --------------------------------------------------
+
+def test_key_depends_on_every_component():
+    base = make_cache_key("groq", "m", "prompt", {"temperature": 0})
+
+    assert base == make_cache_key("groq", "m", "prompt", {"temperature": 0})
+    assert base != make_cache_key("mistral", "m", "prompt", {"temperature": 0})
+    assert base != make_cache_key("groq", "m2", "prompt", {"temperature": 0})
+    assert base != make_cache_key("groq", "m", "prompt!", {"temperature": 0})
+    assert base != make_cache_key("groq", "m", "prompt", {"temperature": 0.25})
+
+
+def test_get_or_call_calls_provider_once(tmp_path):
+    cache = _cache(tmp_path)
+    calls = []
+
+    def call():
+        calls.append(1)
+        return '{"concepts": ["ATP"]}'
+
+    first = cache.get_or_call("groq", "m", "p", call)
+    second = cache.get_or_call("groq", "m", "p", call)
+
+    assert first == second
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_use_cache_false_always_calls_provider(tmp_path):
+    cache = _cache(tmp_path)
+    cache.set("groq", "m", "p", "old variant")
+    answers = iter(["fresh 1", "fresh 2"])
+
+    assert cache.get_or_call("groq", "m", "p", lambda: next(answers), use_cache=False) == "fresh 1"
+    assert cache.get_or_call("groq", "m", "p", lambda: next(answers), use_cache=False) == "fresh 2"
+    assert cache.get("groq", "m", "p") == "old variant"
+    assert cache.stats()["calls"] == 2
+
+
+def test_disk_tier_survives_new_process_cache(tmp_path):
+    _cache(tmp_path).set("gemini", "m", "p", "cached text")
+
+    fresh = _cache(tmp_path)
+
+    assert fresh.get("gemini", "m", "p") == "cached text"
+    assert fresh.stats()["disk_hits"] == 1
+
+
+def test_invalid_responses_are_not_cached(tmp_path):
+    cache = _cache(tmp_path)
+
+    cache.get_or_call("groq", "m", "p", lambda: "not json", validate=lambda c: c.startswith("{"))
+
+    assert cache.get("groq", "m", "p") is None
+
+
+def test_ttl_expiry(tmp_path):
+    cache = _cache(tmp_path, ttl=0.05)
+    cache.set("openai", "m", "p", "value")
+
+    time.sleep(0.1)
+
+    assert cache.get("openai", "m", "p") is None
+
+
+def test_memory_lru_evicts_least_recent():
+    lru = MemoryLRUBackend(max_entries=2)
+    lru.set("a", "1", None)
+    lru.set("b", "2", None)
+    lru.get("a")
+    lru.set("c", "3", None)
+
+    assert lru.get("a") == "1"
+    assert lru.get("b") is None
+
+
+def test_disk_tier_size_eviction(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "c.sqlite3"), max_entries=3)
+
+    for i in range(5):
+        backend.set(f"k{i}", str(i), None)
+
+    assert len(backend) == 3
+    assert backend.get("k0") is None
+    assert backend.get("k4") == "4"
+
+
+def test_disk_tier_overwrite_does_not_evict(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    backend = SQLiteCacheBackend(path, max_entries=3)
+
+    for i in range(3):
+        backend.set(f"k{i}", str(i), None)
+    backend.set("k0", "updated", None)
+
+    assert len(backend) == 3
+    assert backend.get("k0") == "updated"
+    assert backend.get("k1") == "1"
+
+    # A reopened backend starts from the rows already on disk
+    reopened = SQLiteCacheBackend(path, max_entries=3)
+    reopened.set("k3", "3", None)
+    assert len(reopened) == 3
+    assert reopened.get("k2") is None  # least recently accessed
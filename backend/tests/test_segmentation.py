@@ -0,0 +1,45 @@
+# backend/tests/test_segmentation.py
+
+import pytest
+
+from services.summarizer.segmentation import get_segmenter, regex_segment, sent_tokenize
+
+
+def test_splits_on_terminal_punctuation():
+    text = "Cells divide by mitosis. Do they always? No! Sometimes meiosis occurs."
+
+    assert regex_segment(text) == [
+        "Cells divide by mitosis.",
+        "Do they always?",
+        "No!",
+        "Sometimes meiosis occurs."
+    ]
+
+
+def test_keeps_abbreviations_initials_and_decimals_together():
+    text = (
+        "Dr. Smith measured 3.5 mL, e.g. for the U.S. trial. "
+        "J. Watson agreed. The end."
+    )
+
+    assert regex_segment(text) == [
+        "Dr. Smith measured 3.5 mL, e.g. for the U.S. trial.",
+        "J. Watson agreed.",
+        "The end."
+    ]
+
+
+def test_closing_quotes_and_blank_lines():
+    text = 'He said "Stop." Then left.\n\nHeading without period\nNext line.'
+
+    assert regex_segment(text) == [
+        'He said "Stop."',
+        "Then left.",
+        "Heading without period\nNext line."
+    ]
+
+
+def test_unknown_segmenter_is_rejected():
+    assert sent_tokenize("   ") == []
+    with pytest.raises(ValueError):
+        get_segmenter("nope")
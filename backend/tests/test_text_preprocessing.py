@@ -0,0 +1,59 @@
+# backend/tests/test_text_preprocessing.py
+
+from utils.text_preprocessing import apply_page_budget
+
+
+def _pages(consumed):
+    for i, text in enumerate(["page one", "", "page three", "page four"]):
+        consumed.append(i)
+        yield text
+
+
+def test_no_budget_skips_only_empty_pages():
+    assert list(apply_page_budget(["a", " ", "b"])) == ["a", "b"]
+
+
+def test_max_pages_stops_consuming_early():
+    consumed = []
+
+    result = list(apply_page_budget(_pages(consumed), max_pages=2))
+
+    assert result == ["page one"]
+    assert consumed == [0, 1]
+
+
+def test_max_pages_counts_empty_pages():
+    assert list(apply_page_budget(["", "a", "", "b", "c"], max_pages=2)) == ["a"]
+
+
+def test_max_chars_truncates_last_page():
+    result = list(apply_page_budget(["abcd", "efgh", "ijkl"], max_chars=6))
+
+    assert result == ["abcd", "ef"]
+
+
+def test_split_range_covers_pages_in_order():
+    from services.ingestion.pdf_loader import _split_range
+
+    ranges = _split_range(10, 3)
+
+    assert ranges == [(0, 4), (4, 7), (7, 10)]
+    assert _split_range(2, 4) == [(0, 1), (1, 2)]
+
+
+def test_file_objects_are_viewed_without_copying(tmp_path):
+    import io
+    from services.ingestion.pdf_loader import _zero_copy_view
+
+    assert bytes(_zero_copy_view(io.BytesIO(b"%PDF-1.4"))) == b"%PDF-1.4"
+
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"%PDF-1.4 body")
+    with open(path, "rb") as f:
+        assert bytes(_zero_copy_view(f)) == b"%PDF-1.4 body"
+
+    class Unseekable:
+        def read(self):
+            return b""
+
+    assert _zero_copy_view(Unseekable()) is None
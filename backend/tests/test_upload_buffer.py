@@ -0,0 +1,63 @@
+# backend/tests/test_upload_buffer.py
+
+import io
+import os
+
+from services.ingestion.upload import UPLOAD_CHUNK_SIZE, UploadBuffer, decode_text
+from utils.text_preprocessing import extract_text_from_input
+
+
+class _Upload:
+    """Minimal FileStorage stand-in."""
+
+    def __init__(self, filename, data):
+        self.filename = filename
+        self.stream = io.BytesIO(data)
+
+
+def test_txt_falls_back_without_rereading_stream():
+    upload = _Upload("notes.txt", "café – résumé".encode("cp1252"))
+
+    assert extract_text_from_input(file=upload) == "café – résumé"
+
+
+def test_utf8_character_split_across_chunks():
+    text = "a" * (UPLOAD_CHUNK_SIZE - 1) + "étude"
+
+    with UploadBuffer(text.encode("utf-8")) as buffer:
+        assert decode_text(buffer) == text
+
+
+def test_large_stream_is_spooled_and_cleaned_up():
+    data = b"x" * 4096
+
+    buffer = UploadBuffer(io.BytesIO(data), spool_threshold=1024)
+    path = buffer.path
+
+    assert path and os.path.exists(path)
+    assert bytes(buffer.view) == data
+
+    buffer.close()
+    assert not os.path.exists(path)
+
+
+def test_real_file_is_mapped_in_place(tmp_path):
+    target = tmp_path / "doc.txt"
+    target.write_bytes(b"hello world")
+
+    with open(target, "rb") as f, UploadBuffer(f) as buffer:
+        assert buffer.path == str(target)
+        assert decode_text(buffer) == "hello world"
+
+
+def test_in_memory_spooled_file_is_not_rolled_over():
+    import tempfile
+
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024)
+    spooled.write(b"small upload")
+
+    with UploadBuffer(spooled) as buffer:
+        assert bytes(buffer.view) == b"small upload"
+        assert buffer.path is None
+
+    assert spooled._rolled is False
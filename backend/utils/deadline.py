@@ -0,0 +1,75 @@
+import os
+import time
+from typing import Callable, Optional
+
+# ============================================================
+# REQUEST DEADLINE
+#
+# One overall time budget per request, created by the route and passed
+# down (explicitly — work fans out over thread pools) to every LLM call:
+#
+# - timeout(cap)  shrinks a call's own timeout to the remaining budget
+# - expired       callers skip the LLM and use their deterministic
+#                 fallback (first sentences / noun phrases / template MCQ)
+#
+# Deadline(None) never expires; deadline=None parameters mean the same.
+# ============================================================
+
+SUMMARIZE_DEADLINE = float(os.getenv("SUMMARIZE_DEADLINE", "45"))  # seconds, 0 = none
+QUIZ_DEADLINE = float(os.getenv("QUIZ_DEADLINE", "90"))            # seconds, 0 = none
+
+# Below this much budget an LLM call is not worth starting
+DEADLINE_MIN_CALL = float(os.getenv("DEADLINE_MIN_CALL", "0.5"))
+
+
+class Deadline:
+    def __init__(
+        self,
+        budget: Optional[float],
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.budget = budget if budget and budget > 0 else None
+        self.clock = clock
+        self._expires_at = None if self.budget is None else clock() + self.budget
+
+    def remaining(self) -> Optional[float]:
+        """
+        Seconds left (never negative), or None without a budget.
+        """
+        if self._expires_at is None:
+            return None
+        return max(0.0, self._expires_at - self.clock())
+
+    @property
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining < DEADLINE_MIN_CALL
+
+    def timeout(self, cap: Optional[float] = None) -> Optional[float]:
+        """
+        Per-call timeout: the smaller of cap and the remaining budget
+        (callers check `expired` before starting a call).
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return cap
+        return remaining if cap is None else min(cap, remaining)
+
+    def as_dict(self) -> dict:
+        remaining = self.remaining()
+        return {
+            "budget": self.budget,
+            "remaining": None if remaining is None else round(remaining, 3),
+            "expired": self.expired
+        }
+
+
+def is_expired(deadline: Optional[Deadline]) -> bool:
+    return deadline is not None and deadline.expired
+
+
+def call_timeout(deadline: Optional[Deadline], cap: Optional[float] = None) -> Optional[float]:
+    """
+    deadline.timeout(cap), or cap when no deadline was passed.
+    """
+    return cap if deadline is None else deadline.timeout(cap)
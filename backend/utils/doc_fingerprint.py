@@ -1,4 +1,65 @@
 import hashlib
+from typing import Iterable
+
+FINGERPRINT_LENGTH = 16
+FINGERPRINT_CHUNK_CHARS = 64 * 1024
+
+
+class DocFingerprinter:
+    """
+    Incremental generate_doc_id().
+
+    Text is fed in arbitrary chunks; whitespace runs collapse to one space
+    and case is folded token by token, so the digest is identical to
+    hashing " ".join(text.lower().split()) in one go. A token cut by a
+    chunk boundary is carried over to the next update().
+    """
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+        self._pending = ""
+        self._started = False
+
+    def _write(self, normalized: str) -> None:
+        if not normalized:
+            return
+        if self._started:
+            self._hash.update(b" ")
+        self._hash.update(normalized.encode())
+        self._started = True
+
+    def update(self, chunk: str) -> None:
+        if not chunk:
+            return
+
+        text = self._pending + chunk
+        tokens = text.split()
+
+        # Trailing token may continue in the next chunk
+        if tokens and not text[-1].isspace():
+            self._pending = tokens.pop()
+        else:
+            self._pending = ""
+
+        # Whitespace never changes under lower(), so folding the joined
+        # tokens equals folding each one
+        self._write(" ".join(tokens).lower())
+
+    def hexdigest(self) -> str:
+        final = self._hash.copy()
+        if self._pending:
+            if self._started:
+                final.update(b" ")
+            final.update(self._pending.lower().encode())
+        return final.hexdigest()[:FINGERPRINT_LENGTH]
+
+
+def fingerprint_chunks(chunks: Iterable[str]) -> str:
+    fingerprinter = DocFingerprinter()
+    for chunk in chunks:
+        fingerprinter.update(chunk)
+    return fingerprinter.hexdigest()
+
 
 def generate_doc_id(text: str) -> str:
     """
@@ -7,5 +68,20 @@ def generate_doc_id(text: str) -> str:
     Same text → same doc_id
     Different text → different doc_id
     """
-    normalized = " ".join(text.lower().split())
-    return hashlib.sha256(normalized.encode()).hexdigest()[:16]
+    return fingerprint_chunks(
+        text[i:i + FINGERPRINT_CHUNK_CHARS]
+        for i in range(0, len(text), FINGERPRINT_CHUNK_CHARS)
+    )
+
+
+def raw_fingerprint(chunks: Iterable[bytes]) -> str:
+    """
+    Fingerprint of the uploaded bytes, before any parsing.
+
+    Byte-identical re-uploads map to the same value; it is stored as an
+    alias of the content doc_id so cache hits can skip extraction.
+    """
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()[:FINGERPRINT_LENGTH]
@@ -1,5 +1,44 @@
 import os
-from typing import Optional
+from typing import Iterable, Iterator, Optional
+
+# Page / character budgets for PDF extraction (0 = unlimited)
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "0"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "0"))
+
+SUPPORTED_EXTENSIONS = (".pdf", ".txt", ".docx")
+
+
+def apply_page_budget(
+    pages: Iterable[str],
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None
+) -> Iterator[str]:
+    """
+    Lazily enforces page / character budgets over a page-text iterator.
+
+    - max_pages counts physical pages (empty ones included), matching the
+      page ranges the PDF backends are asked to parse
+    - Empty pages are skipped in the output
+    - The page that crosses max_chars is truncated, then iteration stops
+    """
+    if max_pages is not None and max_pages > 0:
+        pages = (page for _, page in zip(range(max_pages), pages))
+
+    chars_left = max_chars or None
+
+    for page_text in pages:
+        if not page_text or not page_text.strip():
+            continue
+
+        if chars_left is not None:
+            if len(page_text) >= chars_left:
+                yield page_text[:chars_left]
+                return
+            chars_left -= len(page_text)
+
+        yield page_text
+
+
 def extract_text_from_input(text: Optional[str] = None, file=None) -> str:
     """
     Extracts clean text from:
@@ -18,56 +57,85 @@ def extract_text_from_input(text: Optional[str] = None, file=None) -> str:
     if file is None:
         raise ValueError("No text or file provided")
 
+    from services.ingestion.upload import UploadBuffer
+
+    # Caller already buffered the upload (e.g. to fingerprint the raw bytes)
+    if isinstance(file, UploadBuffer):
+        return _extract_from_buffer(file, (file.filename or "").lower())
+
     filename = (
     file.filename.lower()
     if hasattr(file, "filename")
     else os.path.basename(file.name).lower()
 )
 
+    if not filename.endswith(SUPPORTED_EXTENSIONS):
+        raise ValueError("Unsupported file type")
+
+    # One read of the upload; parsers share the mapped buffer
+    with UploadBuffer(file) as buffer:
+        return _extract_from_buffer(buffer, filename)
 
+
+def _extract_from_buffer(buffer, filename: str) -> str:
     if filename.endswith(".pdf"):
-        return _extract_from_pdf(file)
+        return _extract_from_pdf(buffer)
 
     if filename.endswith(".txt"):
-        return _extract_from_txt(file)
+        return _extract_from_txt(buffer)
 
     if filename.endswith(".docx"):
-        return _extract_from_docx(file)
+        return _extract_from_docx(buffer)
 
     raise ValueError("Unsupported file type")
-def _extract_from_pdf(file) -> str:
-    from PyPDF2 import PdfReader
 
-    reader = PdfReader(file)
-    pages_text = []
 
-    for page in reader.pages:
-        page_text = page.extract_text()
-        if page_text:
-            pages_text.append(page_text)
+def iter_pdf_text(
+    file,
+    max_pages: Optional[int] = PDF_MAX_PAGES,
+    max_chars: Optional[int] = PDF_MAX_CHARS,
+    workers: Optional[int] = None
+) -> Iterator[str]:
+    """
+    Yields page texts one at a time, within the given budgets.
+
+    Uses the PDF ingestion engine (PyMuPDF when installed, else PyPDF2).
+    workers > 1 opts into multi-process extraction for large PDFs;
+    None uses PDF_PARALLEL_WORKERS.
+    """
+    from services.ingestion.pdf_loader import PDF_PARALLEL_WORKERS, iter_pdf_pages_parallel
+
+    workers = PDF_PARALLEL_WORKERS if workers is None else workers
 
-    text = "\n".join(pages_text).strip()
+    yield from iter_pdf_pages_parallel(
+        file, workers=workers, max_pages=max_pages, max_chars=max_chars
+    )
+
+
+def _extract_from_pdf(buffer) -> str:
+    text = "\n".join(iter_pdf_text(buffer.source())).strip()
 
     if not text:
         raise ValueError("No readable text found in PDF")
 
     return text
-def _extract_from_txt(file) -> str:
-    try:
-        content = file.read().decode("utf-8")
-    except Exception:
-        content = file.read().decode("latin-1")
 
-    text = content.strip()
+
+def _extract_from_txt(buffer) -> str:
+    from services.ingestion.upload import decode_text
+
+    text = decode_text(buffer).strip()
 
     if not text:
         raise ValueError("Text file is empty")
 
     return text
-def _extract_from_docx(file) -> str:
+
+
+def _extract_from_docx(buffer) -> str:
     from docx import Document
 
-    document = Document(file)
+    document = Document(buffer.path or buffer.open())
     paragraphs = [
         p.text.strip()
         for p in document.paragraphs